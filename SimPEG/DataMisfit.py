@@ -1,5 +1,6 @@
 from __future__ import print_function
 import numpy as np
+import weakref
 from SimPEG import Utils
 from SimPEG import Survey
 
@@ -107,19 +108,50 @@ class l2_DataMisfit(BaseDataMisfit):
     @Wd.setter
     def Wd(self, value):
         self._Wd = value
+        self._WrCache = None
+
+    def weightedResidual(self, m, f):
+        """weightedResidual(m, f)
+
+            The weighted residual, Wd*(dpred - dobs), for the fields f.
+            It is kept with the predicted data of the survey for the last
+            fields passed in, so eval and evalDeriv share a single residual
+            until the model changes.
+
+            :param numpy.array m: geophysical model
+            :param Fields f: fields
+            :rtype: numpy.array
+            :return: Wd*(dpred - dobs)
+        """
+        survey = self.survey
+        cached = getattr(self, '_WrCache', None)
+        if (
+            cached is not None and cached[0]() is f and
+            cached[1] is survey.dobs and
+            cached[2] is getattr(survey, '_dpredCache', None)
+        ):
+            return cached[3]
+
+        R = self.Wd * survey.residual(m, f=f)
+        dpredCache = getattr(survey, '_dpredCache', None)
+        if dpredCache is None:
+            self._WrCache = None
+        else:
+            self._WrCache = (weakref.ref(f), survey.dobs, dpredCache, R)
+        return R
 
     @Utils.timeIt
     def eval(self, m, f=None):
         "eval(m, f=None)"
         if f is None: f = self.prob.fields(m)
-        R = self.Wd * self.survey.residual(m, f)
+        R = self.weightedResidual(m, f)
         return 0.5*np.vdot(R, R)
 
     @Utils.timeIt
     def evalDeriv(self, m, f=None):
         "evalDeriv(m, f=None)"
         if f is None: f = self.prob.fields(m)
-        return self.prob.Jtvec(m, self.Wd * (self.Wd * self.survey.residual(m, f=f)), f=f)
+        return self.prob.Jtvec(m, self.Wd * self.weightedResidual(m, f), f=f)
 
     @Utils.timeIt
     def eval2Deriv(self, m, v, f=None):
@@ -449,6 +449,9 @@ class Update_IRLS(InversionDirective):
             if np.abs(1.-val) > self.beta_tol:
                 self.invProb.beta = self.invProb.beta * self.survey.nD*0.5 / self.invProb.phi_d
 
+            # Rebuild bfgsH0 (when next used) for the new regularization weights
+            self.invProb.updateBfgsH0()
+
 
 class Update_lin_PreCond(InversionDirective):
     """
@@ -464,7 +467,7 @@ class Update_lin_PreCond(InversionDirective):
 
         if getattr(self.opt, 'approxHinv', None) is None:
             # Update the pre-conditioner
-            diagA = np.sum(self.prob.G**2., axis=0) + self.invProb.beta*(self.reg.W.T*self.reg.W).diagonal()
+            diagA = self.prob.GtGdiag() + self.invProb.beta*(self.reg.W.T*self.reg.W).diagonal()
 
             PC = Utils.sdiag((self.mapping.deriv(None).T * diagA)**-1.)
             self.opt.approxHinv = PC
@@ -476,7 +479,7 @@ class Update_lin_PreCond(InversionDirective):
 
         if getattr(self.opt, 'approxHinv', None) is not None:
             # Update the pre-conditioner
-            diagA = np.sum(self.prob.G**2., axis=0) + self.invProb.beta*(self.reg.W.T*self.reg.W).diagonal()
+            diagA = self.prob.GtGdiag() + self.invProb.beta*(self.reg.W.T*self.reg.W).diagonal()
 
             PC = Utils.sdiag((self.mapping.deriv(None).T * diagA)**-1.)
             self.opt.approxHinv = PC
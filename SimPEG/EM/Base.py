@@ -64,6 +64,20 @@ class BaseEMProblem(Problem.BaseProblem):
             self.__makeASymmetric = True
         return self.__makeASymmetric
 
+    def getATinv(self, Ainv):
+        """
+        Solver for the adjoint system from the solver of A, sharing its
+        factorization: Ainv itself if A is symmetric, otherwise the
+        transposed solver :code:`Ainv.T`.
+
+        :param Ainv: solver of the system matrix A
+        :rtype: Solver
+        :return: ATinv
+        """
+        if self._makeASymmetric is True:
+            return Ainv
+        return Ainv.T
+
     ####################################################
     # Mass Matrices
     ####################################################
@@ -9,6 +9,7 @@ from SimPEG.EM.Utils import omega
 import numpy as np
 import scipy.sparse as sp
 from scipy.constants import mu_0
+from functools import partial
 
 
 class BaseFDEMProblem(BaseEMProblem):
@@ -62,7 +63,8 @@ class BaseFDEMProblem(BaseEMProblem):
 
     def fields(self, m=None):
         """
-        Solve the forward problem for the fields.
+        Solve the forward problem for the fields. The frequencies are
+        solved independently, by :code:`nWorkers` workers.
 
         :param numpy.array m: inversion model (nP,)
         :rtype: numpy.array
@@ -74,16 +76,26 @@ class BaseFDEMProblem(BaseEMProblem):
 
         f = self.fieldsPair(self.mesh, self.survey)
 
-        for freq in self.survey.freqs:
-            A = self.getA(freq)
-            rhs = self.getRHS(freq)
-            Ainv = self.Solver(A, **self.solverOpts)
-            u = Ainv * rhs
+        freqs = self.survey.freqs
+        for freq, u in zip(freqs, self.parallelMap(self._fieldsFreq, freqs)):
             Srcs = self.survey.getSrcByFreq(freq)
             f[Srcs, self._solutionType] = u
-            Ainv.clean()
         return f
 
+    def _fieldsFreq(self, freq):
+        """
+        Solution for the sources at a single frequency
+
+        :param float freq: frequency
+        :rtype: numpy.array
+        :return: u (nE or nF, nSrc)
+        """
+        Ainv = self.getAinv(freq, self.getA, freq)
+        rhs = self.getRHS(freq)
+        u = Ainv * rhs
+        self.cleanAinv(freq, Ainv)
+        return u
+
     def Jvec(self, m, v, f=None):
         """
         Sensitivity times a vector.
@@ -102,25 +114,35 @@ class BaseFDEMProblem(BaseEMProblem):
         self.model = m
 
         # Jv = self.dataPair(self.survey)
+        Jv = self.parallelMap(
+            partial(self._JvecFreq, v=v, f=f), self.survey.freqs
+        )
+        return np.hstack([Jv_rx for Jv_freq in Jv for Jv_rx in Jv_freq])
+
+    def _JvecFreq(self, freq, v, f):
+        """
+        Sensitivity times a vector for the receivers at a single frequency
+
+        :rtype: list
+        :return: Jv for each receiver of each source at freq
+        """
         Jv = []
 
-        for freq in self.survey.freqs:
-            A = self.getA(freq)
-            # create the concept of Ainv (actually a solve)
-            Ainv = self.Solver(A, **self.solverOpts)
+        # create the concept of Ainv (actually a solve)
+        Ainv = self.getAinv(freq, self.getA, freq)
 
-            for src in self.survey.getSrcByFreq(freq):
-                u_src = f[src, self._solutionType]
-                dA_dm_v = self.getADeriv(freq, u_src, v)
-                dRHS_dm_v = self.getRHSDeriv(freq, src, v)
-                du_dm_v = Ainv * (- dA_dm_v + dRHS_dm_v)
+        for src in self.survey.getSrcByFreq(freq):
+            u_src = f[src, self._solutionType]
+            dA_dm_v = self.getADeriv(freq, u_src, v)
+            dRHS_dm_v = self.getRHSDeriv(freq, src, v)
+            du_dm_v = Ainv * (- dA_dm_v + dRHS_dm_v)
 
-                for rx in src.rxList:
-                    Jv.append(
-                        rx.evalDeriv(src, self.mesh, f, du_dm_v=du_dm_v, v=v)
-                    )
-            Ainv.clean()
-        return np.hstack(Jv)
+            for rx in src.rxList:
+                Jv.append(
+                    rx.evalDeriv(src, self.mesh, f, du_dm_v=du_dm_v, v=v)
+                )
+        self.cleanAinv(freq, Ainv)
+        return Jv
 
     def Jtvec(self, m, v, f=None):
         """
@@ -144,41 +166,57 @@ class BaseFDEMProblem(BaseEMProblem):
 
         Jtv = np.zeros(m.size)
 
-        for freq in self.survey.freqs:
-            AT = self.getA(freq).T
-            ATinv = self.Solver(AT, **self.solverOpts)
+        for Jtv_freq in self.parallelMap(
+            partial(self._JtvecFreq, v=v, f=f), self.survey.freqs
+        ):
+            Jtv += Jtv_freq
 
-            for src in self.survey.getSrcByFreq(freq):
-                u_src = f[src, self._solutionType]
+        return Utils.mkvc(Jtv)
 
-                for rx in src.rxList:
-                    df_duT, df_dmT = rx.evalDeriv(
-                        src, self.mesh, f, v=v[src, rx], adjoint=True
-                    )
+    def _JtvecFreq(self, freq, v, f):
+        """
+        Sensitivity transpose times a vector for the receivers at a single
+        frequency
 
-                    ATinvdf_duT = ATinv * df_duT
+        :rtype: numpy.array
+        :return: contribution of freq to Jtv (nP,)
+        """
+        Jtv = np.zeros(self.model.size)
 
-                    dA_dmT = self.getADeriv(
-                        freq, u_src, ATinvdf_duT, adjoint=True
-                    )
-                    dRHS_dmT = self.getRHSDeriv(
-                        freq, src, ATinvdf_duT, adjoint=True
-                    )
-                    du_dmT = -dA_dmT + dRHS_dmT
+        # the adjoint solves reuse the factorization of A
+        Ainv = self.getAinv(freq, self.getA, freq)
+        ATinv = self.getATinv(Ainv)
 
-                    df_dmT = df_dmT + du_dmT
+        for src in self.survey.getSrcByFreq(freq):
+            u_src = f[src, self._solutionType]
 
-                    # TODO: this should be taken care of by the reciever?
-                    if rx.component is 'real':
-                        Jtv +=   np.array(df_dmT, dtype=complex).real
-                    elif rx.component is 'imag':
-                        Jtv += - np.array(df_dmT, dtype=complex).real
-                    else:
-                        raise Exception('Must be real or imag')
+            for rx in src.rxList:
+                df_duT, df_dmT = rx.evalDeriv(
+                    src, self.mesh, f, v=v[src, rx], adjoint=True
+                )
 
-            ATinv.clean()
+                ATinvdf_duT = ATinv * df_duT
 
-        return Utils.mkvc(Jtv)
+                dA_dmT = self.getADeriv(
+                    freq, u_src, ATinvdf_duT, adjoint=True
+                )
+                dRHS_dmT = self.getRHSDeriv(
+                    freq, src, ATinvdf_duT, adjoint=True
+                )
+                du_dmT = -dA_dmT + dRHS_dmT
+
+                df_dmT = df_dmT + du_dmT
+
+                # TODO: this should be taken care of by the reciever?
+                if rx.component == 'real':
+                    Jtv +=   np.array(df_dmT, dtype=complex).real
+                elif rx.component == 'imag':
+                    Jtv += - np.array(df_dmT, dtype=complex).real
+                else:
+                    raise Exception('Must be real or imag')
+
+        self.cleanAinv(freq, Ainv)
+        return Jtv
 
     def getSourceTerm(self, freq):
         """
@@ -190,10 +228,10 @@ class BaseFDEMProblem(BaseEMProblem):
         :return: (s_m, s_e) (nE or nF, nSrc)
         """
         Srcs = self.survey.getSrcByFreq(freq)
-        if self._formulation is 'EB':
+        if self._formulation == 'EB':
             s_m = np.zeros((self.mesh.nF, len(Srcs)), dtype=complex)
             s_e = np.zeros((self.mesh.nE, len(Srcs)), dtype=complex)
-        elif self._formulation is 'HJ':
+        elif self._formulation == 'HJ':
             s_m = np.zeros((self.mesh.nE, len(Srcs)), dtype=complex)
             s_e = np.zeros((self.mesh.nF, len(Srcs)), dtype=complex)
 
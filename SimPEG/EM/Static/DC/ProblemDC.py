@@ -19,20 +19,39 @@ class BaseDCProblem(BaseEMProblem):
     """
     surveyPair = Survey
     fieldsPair = FieldsDC
-    Ainv = None
+
+    #: Keep the factorization of the current model for Jvec and Jtvec, see
+    #: :code:`SimPEG.Problem.BaseProblem.maxFactorMemory`
+    maxFactorMemory = None
+
+    @property
+    def Ainv(self):
+        """
+        Factorization of the system matrix for the current model, shared by
+        fields, Jvec and Jtvec. None if it has not been computed yet or was
+        dropped because the model changed.
+
+        It can be handed to an IP problem, e.g. :code:`Ainv=problemDC.Ainv`
+        after :code:`problemDC.fields(sigmaInf)`. The IP problem keeps its
+        reference, but the next model update of the DC problem drops the
+        factorization from its cache and calls its :code:`clean`. It then
+        stays usable only with solvers whose :code:`clean` does not free the
+        factors (e.g. SolverLU); with others (e.g. Pardiso) the DC model
+        should not change while the IP problem uses it.
+        """
+        cache = self.factorCache
+        cache.setModel(self.model)
+        return cache.peek('A')
 
     def fields(self, m=None):
         if m is not None:
             self.model = m
 
-        if self.Ainv is not None:
-            self.Ainv.clean()
-
         f = self.fieldsPair(self.mesh, self.survey)
-        A = self.getA()
-        self.Ainv = self.Solver(A, **self.solverOpts)
+        Ainv = self.getAinv('A', self.getA)
         RHS = self.getRHS()
-        u = self.Ainv * RHS
+        u = Ainv * RHS
+        self.cleanAinv('A', Ainv)
         Srcs = self.survey.srcList
         f[Srcs, self._solutionType] = u
         return f
@@ -47,19 +66,20 @@ class BaseDCProblem(BaseEMProblem):
         # Jv = self.dataPair(self.survey)  # same size as the data
         Jv = []
 
-        A = self.getA()
+        Ainv = self.getAinv('A', self.getA)
 
         for src in self.survey.srcList:
             u_src = f[src, self._solutionType]  # solution vector
             dA_dm_v = self.getADeriv(u_src, v)
             dRHS_dm_v = self.getRHSDeriv(src, v)
-            du_dm_v = self.Ainv * (- dA_dm_v + dRHS_dm_v)
+            du_dm_v = Ainv * (- dA_dm_v + dRHS_dm_v)
 
             for rx in src.rxList:
                 df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
                 df_dm_v = df_dmFun(src, du_dm_v, v, adjoint=False)
                 Jv.append(rx.evalDeriv(src, self.mesh, f, df_dm_v))
                 # Jv[src, rx] = rx.evalDeriv(src, self.mesh, f, df_dm_v)
+        self.cleanAinv('A', Ainv)
         # return Utils.mkvc(Jv)
         return np.hstack(Jv)
 
@@ -74,23 +94,41 @@ class BaseDCProblem(BaseEMProblem):
             v = self.dataPair(self.survey, v)
 
         Jtv = np.zeros(m.size)
-        AT = self.getA()
+        Srcs = self.survey.srcList
 
-        for src in self.survey.srcList:
-            u_src = f[src, self._solutionType]
+        # adjoint sources of all receivers, summed per source
+        df_duT = None
+        for isrc, src in enumerate(Srcs):
             for rx in src.rxList:
                 # wrt f, need possibility wrt m
                 PTv = rx.evalDeriv(src, self.mesh, f, v[src, rx], adjoint=True)
                 df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
                                     None)
-                df_duT, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
-
-                ATinvdf_duT = self.Ainv * df_duT
-
-                dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
-                dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
-                du_dmT = -dA_dmT + dRHS_dmT
-                Jtv += (df_dmT + du_dmT).astype(float)
+                df_duT_rx, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
+                Jtv = np.array(df_dmT + Jtv, dtype=float)
+                if isinstance(df_duT_rx, Zero):
+                    continue
+                df_duT_rx = Utils.mkvc(df_duT_rx)
+                if df_duT is None:
+                    df_duT = np.zeros((df_duT_rx.size, len(Srcs)))
+                df_duT[:, isrc] += df_duT_rx
+
+        if df_duT is None:
+            return Utils.mkvc(Jtv)
+
+        # one solve for all of the sources
+        Ainv = self.getAinv('A', self.getA)
+        ATinvdf_duT = Ainv * df_duT
+        self.cleanAinv('A', Ainv)
+        ATinvdf_duT = ATinvdf_duT.reshape(df_duT.shape, order='F')
+
+        for isrc, src in enumerate(Srcs):
+            u_src = f[src, self._solutionType]
+            dA_dmT = self.getADeriv(u_src, ATinvdf_duT[:, isrc], adjoint=True)
+            dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT[:, isrc],
+                                        adjoint=True)
+            du_dmT = -dA_dmT + dRHS_dmT
+            Jtv += np.array(du_dmT, dtype=float)
 
         return Utils.mkvc(Jtv)
 
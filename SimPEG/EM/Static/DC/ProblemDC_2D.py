@@ -8,6 +8,7 @@ from SimPEG.EM.Base import BaseEMProblem
 from .SurveyDC import Survey_ky
 from .FieldsDC_2D import Fields_ky, Fields_ky_CC, Fields_ky_N
 import numpy as np
+from functools import partial
 from SimPEG.Utils import Zero
 from .BoundaryUtils import getxBCyBC_CC
 
@@ -21,70 +22,110 @@ class BaseDCProblem_2D(BaseEMProblem):
     fieldsPair = Fields_ky  # SimPEG.EM.Static.Fields_2D
     nky = 15
     kys = np.logspace(-4, 1, nky)
-    Ainv = [None for i in range(nky)]
+    Ainv = None  #: Factorizations at the wavenumbers, set by fields
     nT = nky  # Only for using TimeFields
 
     def fields(self, m):
         if m is not None:
             self.model = m
 
-        if self.Ainv[0] is not None:
-            for i in range(self.nky):
-                self.Ainv[i].clean()
+        if self.Ainv is not None:
+            for Ainv in self.Ainv:
+                Ainv.clean()
 
         f = self.fieldsPair(self.mesh, self.survey)
         Srcs = self.survey.srcList
-        for iky in range(self.nky):
-            ky = self.kys[iky]
-            A = self.getA(ky)
-            self.Ainv[iky] = self.Solver(A, **self.solverOpts)
-            RHS = self.getRHS(ky)
-            u = self.Ainv[iky] * RHS
+        # the wavenumbers are independent: factor and solve them in parallel
+        solutions = self._mapKy(self._fieldsKy)
+        self.Ainv = [Ainv for Ainv, u in solutions]
+        for iky, (Ainv, u) in enumerate(solutions):
             f[Srcs, self._solutionType, iky] = u
         return f
 
-    def Jvec(self, m, v, f=None):
-
-        if f is None:
-            f = self.fields(m)
-
-        self.model = m
+    def _fieldsKy(self, iky):
+        """
+        Factor and solve the system at the wavenumber kys[iky]
 
-        # TODO: This is not a good idea !! should change that as a list
-        Jv = self.dataPair(self.survey)  # same size as the data
-        Jv0 = self.dataPair(self.survey)
+        :rtype: tuple
+        :return: (Ainv, u)
+        """
+        ky = self.kys[iky]
+        A = self.getA(ky)
+        Ainv = self.Solver(A, **self.solverOpts)
+        RHS = self.getRHS(ky)
+        u = Ainv * RHS
+        return Ainv, u
+
+    def _mapKy(self, fun):
+        """
+        [fun(iky) for iky in range(nky)] over the nWorkers of the problem.
+        The factorizations are kept on the problem (Ainv), so the workers
+        are always threads.
+        """
+        return Utils.parallelMap(fun, range(self.nky), nWorkers=self.nWorkers)
 
+    @property
+    def _kyWeights(self):
+        """
+        Weights of the trapezoidal integration over the wavenumbers of the
+        inverse Fourier transform (including 1/pi)
+        """
         # Assume y=0.
         # This needs some thoughts to implement in general when src is dipole
         dky = np.diff(self.kys)
         dky = np.r_[dky[0], dky]
         y = 0.
 
-        # TODO: this loop is pretty slow .. (Parellize)
-        for iky in range(self.nky):
-            ky = self.kys[iky]
-            A = self.getA(ky)
-            for src in self.survey.srcList:
-                u_src = f[src, self._solutionType, iky]  # solution vector
-                dA_dm_v = self.getADeriv(ky, u_src, v)
-                dRHS_dm_v = self.getRHSDeriv(ky, src, v)
-                du_dm_v = self.Ainv[iky] * (- dA_dm_v + dRHS_dm_v)
-                for rx in src.rxList:
-                    df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
-                                       None)
-                    df_dm_v = df_dmFun(iky, src, du_dm_v, v, adjoint=False)
-                    # Trapezoidal intergration
-                    Jv1_temp = 1./np.pi*rx.evalDeriv(ky, src, self.mesh, f,
-                                                     df_dm_v)
-                    if iky == 0:
-                        # First assigment
-                        Jv[src, rx] = Jv1_temp*dky[iky]*np.cos(ky*y)
-                    else:
-                        Jv[src, rx] += Jv1_temp*dky[iky]/2.*np.cos(ky*y)
-                        Jv[src, rx] += Jv0[src, rx]*dky[iky]/2.*np.cos(ky*y)
-                    Jv0[src, rx] = Jv1_temp.copy()
+        w = np.zeros(self.nky)
+        w[0] = dky[0]*np.cos(self.kys[0]*y)
+        for iky in range(1, self.nky):
+            w[iky] += dky[iky]/2.*np.cos(self.kys[iky]*y)
+            w[iky-1] += dky[iky]/2.*np.cos(self.kys[iky]*y)
+        return w/np.pi
+
+    def Jvec(self, m, v, f=None):
+
+        if f is None:
+            f = self.fields(m)
+
+        self.model = m
+
+        Jv_ky = self._mapKy(partial(self._JvecKy, v=v, f=f))
+        Jv = sum(w*Jv_iky for w, Jv_iky in zip(self._kyWeights, Jv_ky))
         return Utils.mkvc(Jv)
 
+    def _JvecKy(self, iky, v, f):
+        """
+        Sensitivity times a vector at the wavenumber kys[iky], with one
+        multi-source solve.
+
+        :rtype: numpy.ndarray
+        :return: Jv at ky (nD,)
+        """
+        ky = self.kys[iky]
+        Srcs = self.survey.srcList
+
+        # solve for all sources at once
+        dRHS = np.hstack([
+            Utils.mkvc(
+                - self.getADeriv(ky, f[src, self._solutionType, iky], v) +
+                self.getRHSDeriv(ky, src, v), 2
+            )
+            for src in Srcs
+        ])
+        du_dm_v = self.Ainv[iky] * dRHS
+        du_dm_v = du_dm_v.reshape(dRHS.shape, order='F')
+
+        Jv = []
+        for isrc, src in enumerate(Srcs):
+            for rx in src.rxList:
+                df_dmFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
+                                   None)
+                df_dm_v = df_dmFun(iky, src, du_dm_v[:, isrc], v,
+                                   adjoint=False)
+                Jv.append(rx.evalDeriv(ky, src, self.mesh, f, df_dm_v))
+        return np.hstack(Jv)
+
     def Jtvec(self, m, v, f=None):
         if f is None:
             f = self.fields(m)
@@ -95,49 +136,56 @@ class BaseDCProblem_2D(BaseEMProblem):
         if not isinstance(v, self.dataPair):
             v = self.dataPair(self.survey, v)
 
-        Jtv = np.zeros(m.size, dtype=float)
+        Jtv_ky = self._mapKy(partial(self._JtvecKy, v=v, f=f))
+        Jtv = sum(w*Jtv_iky for w, Jtv_iky in zip(self._kyWeights, Jtv_ky))
+        return Utils.mkvc(Jtv)
 
-        # Assume y=0.
-        # This needs some thoughts to implement in general when src is dipole
-        dky = np.diff(self.kys)
-        dky = np.r_[dky[0], dky]
-        y = 0.
+    def _JtvecKy(self, iky, v, f):
+        """
+        Sensitivity transpose times a vector at the wavenumber kys[iky].
+        The adjoint sources of all receivers are solved together.
 
-        for src in self.survey.srcList:
+        :rtype: numpy.ndarray
+        :return: Jtv at ky (nP,)
+        """
+        ky = self.kys[iky]
+        Srcs = self.survey.srcList
+
+        Jtv = np.zeros(self.model.size, dtype=float)
+        df_duT = None
+
+        for isrc, src in enumerate(Srcs):
             for rx in src.rxList:
-                Jtv_temp1 = np.zeros(m.size, dtype=float)
-                Jtv_temp0 = np.zeros(m.size, dtype=float)
-
-                # TODO: this loop is pretty slow .. (Parellize)
-                for iky in range(self.nky):
-                    u_src = f[src, self._solutionType, iky]
-                    ky = self.kys[iky]
-                    AT = self.getA(ky)
-                    # wrt f, need possibility wrt m
-                    PTv = rx.evalDeriv(ky, src, self.mesh, f, v[src, rx],
-                                       adjoint=True)
-                    df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
-                                        None)
-                    df_duT, df_dmT = df_duTFun(iky, src, None, PTv,
-                                               adjoint=True)
-
-                    ATinvdf_duT = self.Ainv[iky] * df_duT
-
-                    dA_dmT = self.getADeriv(ky, u_src, ATinvdf_duT,
-                                            adjoint=True)
-                    dRHS_dmT = self.getRHSDeriv(ky, src, ATinvdf_duT,
-                                                adjoint=True)
-                    du_dmT = -dA_dmT + dRHS_dmT
-                    Jtv_temp1 = 1./np.pi*(df_dmT + du_dmT).astype(float)
-                    # Trapezoidal intergration
-                    if iky == 0:
-                        # First assigment
-                        Jtv += Jtv_temp1*dky[iky]*np.cos(ky*y)
-                    else:
-                        Jtv += Jtv_temp1*dky[iky]/2.*np.cos(ky*y)
-                        Jtv += Jtv_temp0*dky[iky]/2.*np.cos(ky*y)
-                    Jtv_temp0 = Jtv_temp1.copy()
-        return Utils.mkvc(Jtv)
+                # wrt f, need possibility wrt m
+                PTv = rx.evalDeriv(ky, src, self.mesh, f, v[src, rx],
+                                   adjoint=True)
+                df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField),
+                                    None)
+                df_duT_rx, df_dmT = df_duTFun(iky, src, None, PTv,
+                                              adjoint=True)
+                Jtv = np.array(df_dmT + Jtv, dtype=float)
+                if isinstance(df_duT_rx, Zero):
+                    continue
+                df_duT_rx = Utils.mkvc(df_duT_rx)
+                if df_duT is None:
+                    df_duT = np.zeros((df_duT_rx.size, len(Srcs)))
+                df_duT[:, isrc] += df_duT_rx
+
+        if df_duT is None:
+            return Jtv
+
+        ATinvdf_duT = self.Ainv[iky] * df_duT
+        ATinvdf_duT = ATinvdf_duT.reshape(df_duT.shape, order='F')
+
+        for isrc, src in enumerate(Srcs):
+            u_src = f[src, self._solutionType, iky]
+            dA_dmT = self.getADeriv(ky, u_src, ATinvdf_duT[:, isrc],
+                                    adjoint=True)
+            dRHS_dmT = self.getRHSDeriv(ky, src, ATinvdf_duT[:, isrc],
+                                        adjoint=True)
+            du_dmT = -dA_dmT + dRHS_dmT
+            Jtv += np.array(du_dmT, dtype=float)
+        return Jtv
 
     def getSourceTerm(self, ky):
         """
@@ -90,19 +90,37 @@ class BaseIPProblem(BaseEMProblem):
             v = self.dataPair(self.survey, v)
 
         Jtv = np.zeros(m.size)
-        AT = self.getA()
+        Srcs = self.survey.srcList
 
-        for src in self.survey.srcList:
-            u_src = f[src, self._solutionType]
+        # adjoint sources of all receivers, summed per source
+        df_duT = None
+        for isrc, src in enumerate(Srcs):
             for rx in src.rxList:
                 PTv = rx.evalDeriv(src, self.mesh, f, v[src, rx], adjoint=True)  # wrt f, need possibility wrt m
                 df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
-                df_duT, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
-                ATinvdf_duT = self.Ainv * df_duT
-                dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
-                dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
+                df_duT_rx, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
+                Jtv = np.array(df_dmT + Jtv, dtype=float)
+                if isinstance(df_duT_rx, Zero):
+                    continue
+                df_duT_rx = Utils.mkvc(df_duT_rx)
+                if df_duT is None:
+                    df_duT = np.zeros((df_duT_rx.size, len(Srcs)))
+                df_duT[:, isrc] += df_duT_rx
+
+        if df_duT is not None:
+            # one solve for all of the sources
+            ATinvdf_duT = self.Ainv * df_duT
+            ATinvdf_duT = ATinvdf_duT.reshape(df_duT.shape, order='F')
+
+            for isrc, src in enumerate(Srcs):
+                u_src = f[src, self._solutionType]
+                dA_dmT = self.getADeriv(u_src, ATinvdf_duT[:, isrc],
+                                        adjoint=True)
+                dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT[:, isrc],
+                                            adjoint=True)
                 du_dmT = -dA_dmT + dRHS_dmT
-                Jtv += (df_dmT + du_dmT).astype(float)
+                Jtv += np.array(du_dmT, dtype=float)
+
         # Conductivity ((d u / d log sigma).T)
         if self._formulation == 'EB':
             return -Utils.mkvc(Jtv)
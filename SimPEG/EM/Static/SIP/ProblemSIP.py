@@ -164,22 +164,46 @@ class BaseSIPProblem(BaseEMProblem):
             v = self.dataPair(self.survey, v)
 
         Jtv = np.zeros(m.size)
-
-        for tind in range(len(self.survey.times)):
-            t = self.survey.times[tind]
-            for src in self.survey.srcList:
-                u_src = f[src, self._solutionType]
+        Srcs = self.survey.srcList
+        times = self.survey.times
+        nSrc = len(Srcs)
+
+        # adjoint sources of all receivers, summed per source and time
+        # (column tind*nSrc + isrc)
+        df_duT = None
+        for tind in range(len(times)):
+            t = times[tind]
+            for isrc, src in enumerate(Srcs):
                 for rx in src.rxList:
-                    timeindex = rx.getTimeP(self.survey.times)
+                    timeindex = rx.getTimeP(times)
                     if timeindex[tind]:
                         PTv = rx.evalDeriv(src, self.mesh, f, v[src, rx, t], adjoint=True)  # wrt f, need possibility wrt m
                         df_duTFun = getattr(f, '_{0!s}Deriv'.format(rx.projField), None)
-                        df_duT, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
-                        ATinvdf_duT = self.Ainv * df_duT
-                        dA_dmT = self.getADeriv(u_src, ATinvdf_duT, adjoint=True)
-                        dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT, adjoint=True)
-                        du_dmT = -dA_dmT + dRHS_dmT
-                        Jtv += self.EtaDeriv(self.survey.times[tind], du_dmT, adjoint=True) + self.TauiDeriv(self.survey.times[tind], du_dmT, adjoint=True)
+                        df_duT_rx, df_dmT = df_duTFun(src, None, PTv, adjoint=True)
+                        if isinstance(df_duT_rx, Utils.Zero):
+                            continue
+                        df_duT_rx = Utils.mkvc(df_duT_rx)
+                        if df_duT is None:
+                            df_duT = np.zeros(
+                                (df_duT_rx.size, len(times)*nSrc)
+                            )
+                        df_duT[:, tind*nSrc + isrc] += df_duT_rx
+
+        if df_duT is not None:
+            # one solve for all of the sources and times
+            ATinvdf_duT = self.Ainv * df_duT
+            ATinvdf_duT = ATinvdf_duT.reshape(df_duT.shape, order='F')
+
+            for tind in range(len(times)):
+                for isrc, src in enumerate(Srcs):
+                    col = tind*nSrc + isrc
+                    if not np.any(df_duT[:, col]):
+                        continue
+                    u_src = f[src, self._solutionType]
+                    dA_dmT = self.getADeriv(u_src, ATinvdf_duT[:, col], adjoint=True)
+                    dRHS_dmT = self.getRHSDeriv(src, ATinvdf_duT[:, col], adjoint=True)
+                    du_dmT = -dA_dmT + dRHS_dmT
+                    Jtv += self.EtaDeriv(times[tind], du_dmT, adjoint=True) + self.TauiDeriv(times[tind], du_dmT, adjoint=True)
 
         # Conductivity ((d u / d log sigma).T)
         if self._formulation == 'EB':
@@ -1,4 +1,5 @@
 from __future__ import division
+import tempfile
 import numpy as np
 import scipy.sparse as sp
 import SimPEG
@@ -35,6 +36,58 @@ class FieldsTDEM(SimPEG.Problem.TimeFields):
     knownFields = {}
     dtype = float
 
+    def _initStore(self, name):
+        """
+        Storage of the time history of the solution. If it does not fit in
+        the maxFieldsMemory of the problem, it is kept in a memory-mapped
+        temporary file or checkpointed (see prob.fieldsStorage).
+        """
+        prob = self.survey.prob
+        maxMemory = getattr(prob, 'maxFieldsMemory', None)
+        if (
+            name in self._fields or maxMemory is None or
+            name != prob._fieldType + 'Solution'
+        ):
+            return super(FieldsTDEM, self)._initStore(name)
+
+        shape = self._storageShape(self.knownFields[name])
+        dtype = self.dtype[name] if type(self.dtype) is dict else self.dtype
+        stepBytes = shape[0] * shape[1] * np.dtype(dtype).itemsize
+        if stepBytes * shape[2] <= maxMemory:
+            return super(FieldsTDEM, self)._initStore(name)
+
+        if prob.fieldsStorage == 'memmap':
+            field = np.memmap(
+                tempfile.TemporaryFile(), dtype=dtype, mode='w+', shape=shape
+            )
+        elif prob.fieldsStorage == 'checkpoint':
+            nT = shape[2]
+            # memory of the checkpoints and of one recomputed interval
+            fits = [
+                k for k in range(2, nT + 1)
+                if (-(-nT // k) + k) * stepBytes <= maxMemory
+            ]
+            interval = fits[0] if fits else int(np.ceil(np.sqrt(nT)))
+            field = CheckpointStorage(prob, shape, dtype, interval)
+        else:
+            raise ValueError(
+                "fieldsStorage must be 'checkpoint' or 'memmap', not "
+                "{0!s}".format(prob.fieldsStorage)
+            )
+        self._fields[name] = field
+        return field
+
+    def _timeBlocks(self):
+        """
+        Slices of the time steps to read the solution over: the intervals
+        of a checkpointed solution (see :code:`CheckpointStorage`), else
+        all of the time steps at once
+        """
+        field = self._fields.get(self.survey.prob._fieldType + 'Solution')
+        if isinstance(field, CheckpointStorage):
+            return field.segments
+        return [slice(None)]
+
     def _GLoc(self, fieldType):
         """Grid location of the fieldType"""
         return self.aliasFields[fieldType][1]
@@ -106,6 +159,135 @@ class FieldsTDEM(SimPEG.Problem.TimeFields):
         )
 
 
+class CheckpointStorage(object):
+    """
+    Array-like storage of the solution history (nP, nSrc, nT+1) of a TDEM
+    problem that only keeps every interval-th time step (the checkpoints).
+    The other time steps are recomputed from the previous checkpoint when
+    they are accessed; the last recomputed interval is kept.
+
+    The time steps must be set in order, as in :code:`prob.fields`.
+    Sweeping through the time steps forward (Jvec) or backward (Jtvec)
+    recomputes each interval once, for all of the sources. The data
+    (:code:`survey.eval` and dpred) are projected interval by interval,
+    so they also cost at most one sweep. Accessing all of the times of a
+    source directly (e.g. :code:`f[src, 'b', :]`) recomputes the whole
+    history, for each source, every time; the result is not kept.
+
+    Each recomputed interval gets the factorizations of its time steps
+    from :code:`prob.getAinv`: with maxFactorMemory=0 they are factored
+    again for every interval.
+    """
+
+    def __init__(self, prob, shape, dtype, interval):
+        self.prob = prob
+        self.shape = shape
+        self.dtype = dtype
+        self.interval = interval
+        self.model = np.array(prob.model, copy=True)
+
+        nP, nSrc, nT = shape
+        self.checkpoints = np.zeros(
+            (nP, nSrc, (nT - 1) // interval + 1), dtype=dtype
+        )
+        self._segment = None  # interval held in _block
+        self._block = np.zeros((nP, nSrc, interval), dtype=dtype)
+        self._valid = np.zeros(interval, dtype=bool)
+
+    @property
+    def segments(self):
+        """Slices of the time steps of each interval"""
+        nT, interval = self.shape[2], self.interval
+        return [
+            slice(t0, min(t0 + interval, nT))
+            for t0 in range(0, nT, interval)
+        ]
+
+    @property
+    def nbytes(self):
+        """Memory (in bytes) of the checkpoints and the recomputed interval"""
+        return self.checkpoints.nbytes + self._block.nbytes
+
+    def __setitem__(self, key, val):
+        _, srcInd, tInd = key
+        if not isinstance(tInd, (int, np.integer)):
+            raise NotImplementedError(
+                'Checkpointed fields are set one time step at a time.'
+            )
+        segment, j = divmod(int(tInd), self.interval)
+        if segment != self._segment:
+            self._segment = segment
+            self._valid[:] = False
+        self._block[:, srcInd, j] = val
+        self._valid[j] = True
+        if j == 0:
+            self.checkpoints[:, srcInd, segment] = val
+
+    def __getitem__(self, key):
+        _, srcInd, timeInd = key
+        if isinstance(timeInd, (int, np.integer)):
+            return self._step(int(timeInd))[:, srcInd]
+
+        # filled one time step at a time, without other copies of the history
+        steps = np.arange(self.shape[2])[timeInd].ravel()
+        out = None
+        for i, t in enumerate(steps):
+            step = self._step(int(t))[:, srcInd]
+            if out is None:
+                out = np.empty(step.shape + (steps.size,), dtype=self.dtype)
+            out[..., i] = step
+        if out is None:
+            out = np.empty(
+                self._step(0)[:, srcInd].shape + (0,), dtype=self.dtype
+            )
+        return out
+
+    def _step(self, tInd):
+        segment, j = divmod(tInd, self.interval)
+        if j == 0:
+            return self.checkpoints[:, :, segment]
+        if segment != self._segment or not self._valid[j]:
+            self._recompute(segment)
+        return self._block[:, :, j]
+
+    def _recompute(self, segment):
+        """Time step from the checkpoint through the interval segment"""
+        prob = self.prob
+        if (
+            prob.model is None or np.shape(prob.model) != self.model.shape or
+            np.any(prob.model != self.model)
+        ):
+            raise Exception(
+                'The model of the problem changed, the checkpointed fields '
+                'can not be recomputed.'
+            )
+
+        t0 = segment * self.interval
+        nSteps = min(self.interval, self.shape[2] - t0)
+        block = self._block
+        block[:, :, 0] = self.checkpoints[:, :, segment]
+
+        Ainv = None
+        for j in range(1, nSteps):
+            tInd = t0 + j - 1
+            dt = prob.timeSteps[tInd]
+            if Ainv is not None and dt != prob.timeSteps[tInd - 1]:
+                prob.cleanAinv(prob.timeSteps[tInd - 1], Ainv)
+                Ainv = None
+            if Ainv is None:
+                Ainv = prob.getAinv(dt, prob.getAdiag, tInd)
+            sol = Ainv * (
+                prob.getRHS(tInd+1) - prob.getAsubdiag(tInd) * block[:, :, j-1]
+            )
+            block[:, :, j] = sol.reshape(block.shape[:2], order='F')
+        if Ainv is not None:
+            prob.cleanAinv(prob.timeSteps[t0 + nSteps - 2], Ainv)
+
+        self._segment = segment
+        self._valid[:] = False
+        self._valid[:nSteps] = True
+
+
 class Fields_Derivs(FieldsTDEM):
     """
         A fields object for satshing derivs
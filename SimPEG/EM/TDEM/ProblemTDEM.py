@@ -16,10 +16,27 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
     We start with the first order form of Maxwell's equations, eliminate and
     solve the second order form. For the time discretization, we use backward
     Euler.
+
+    Each distinct time-step size has its own system matrix. fields, Jvec
+    and Jtvec share their factorizations through the factorCache (keyed by
+    dt) when maxFactorMemory is set.
     """
     surveyPair = SurveyTDEM  #: A SimPEG.EM.TDEM.SurveyTDEM Class
     fieldsPair = FieldsTDEM  #: A SimPEG.EM.TDEM.FieldsTDEM Class
 
+    #: Memory (bytes) for the time history of the solution. None keeps every
+    #: time step in memory, otherwise a history that does not fit is stored
+    #: as set by fieldsStorage.
+    maxFieldsMemory = None
+
+    #: 'checkpoint' keeps every k-th time step (k chosen to fit
+    #: maxFieldsMemory) and recomputes the others when Jvec and Jtvec need
+    #: them; 'memmap' keeps the history in a memory-mapped temporary file.
+    #: Jvec, Jtvec and dpred then each cost up to one more forward sweep,
+    #: with factorizations unless maxFactorMemory keeps them (see
+    #: :code:`SimPEG.EM.TDEM.FieldsTDEM.CheckpointStorage`).
+    fieldsStorage = 'checkpoint'
+
     def __init__(self, mesh, **kwargs):
         BaseEMProblem.__init__(self, mesh, **kwargs)
 
@@ -60,14 +77,13 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
             if Ainv is not None and (
                 tInd > 0 and dt != self.timeSteps[tInd - 1]
             ):
-                Ainv.clean()
+                self.cleanAinv(self.timeSteps[tInd - 1], Ainv)
                 Ainv = None
 
             if Ainv is None:
-                A = self.getAdiag(tInd)
-                if self.verbose:
+                if self.verbose and dt not in self.factorCache:
                     print('Factoring...   (dt = {:e})'.format(dt))
-                Ainv = self.Solver(A, **self.solverOpts)
+                Ainv = self.getAinv(dt, self.getAdiag, tInd)
                 if self.verbose:
                     print('Done')
 
@@ -88,7 +104,7 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
             F[:, self._fieldType+'Solution', tInd+1] = sol
         if self.verbose:
             print('{}\nDone calculating fields(m)\n{}'.format('*'*50, '*'*50))
-        Ainv.clean()
+        self.cleanAinv(self.timeSteps[-1], Ainv)
         return F
 
     def Jvec(self, m, v, f=None):
@@ -144,15 +160,17 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
             # same
             if Adiaginv is not None and (tInd > 0 and dt !=
                                          self.timeSteps[tInd - 1]):
-                Adiaginv.clean()
+                self.cleanAinv(self.timeSteps[tInd - 1], Adiaginv)
                 Adiaginv = None
 
             if Adiaginv is None:
-                A = self.getAdiag(tInd)
-                Adiaginv = self.Solver(A, **self.solverOpts)
+                Adiaginv = self.getAinv(dt, self.getAdiag, tInd)
 
             Asubdiag = self.getAsubdiag(tInd)
 
+            # derivative terms of all sources: nu x nSrc
+            JRHS = np.empty_like(dun_dm_v)
+
             for i, src in enumerate(self.survey.srcList):
 
                 # here, we are lagging by a timestep, so filling in as we go
@@ -177,13 +195,13 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                     tInd, f[src, ftype, tInd], v
                 )
 
-                JRHS = dRHS_dm_v - dAsubdiag_dm_v - dA_dm_v
+                JRHS[:, i] = Utils.mkvc(
+                    dRHS_dm_v - dAsubdiag_dm_v - dA_dm_v
+                )
 
-                # step in time and overwrite
-                if tInd != len(self.timeSteps+1):
-                    dun_dm_v[:, i] = Adiaginv * (
-                        JRHS - Asubdiag * dun_dm_v[:, i]
-                    )
+            # step all sources in time and overwrite
+            dun_dm_v = Adiaginv * (JRHS - Asubdiag * dun_dm_v)
+            dun_dm_v = dun_dm_v.reshape(JRHS.shape, order='F')
 
         Jv = []
         for src in self.survey.srcList:
@@ -194,7 +212,7 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                         )
                     )
                 )
-        Adiaginv.clean()
+        self.cleanAinv(self.timeSteps[-1], Adiaginv)
         # del df_dm_v, dun_dm_v, Asubdiag
         # return Utils.mkvc(Jv)
         return np.hstack(Jv)
@@ -251,7 +269,7 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
             # #for PT_v (don't need to preserve over sources)
             # initialize size
             df_duT_v[src, '{}Deriv'.format(self._fieldType), :] = (
-                np.zeros_like(f[src, self._fieldType, :])
+                np.zeros((len(f[src, ftype, 0]), self.nT+1))
             )
 
             for rx in src.rxList:
@@ -291,30 +309,39 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
                 tInd <= self.nT and
                 self.timeSteps[tInd] != self.timeSteps[tInd+1]
             ):
-                AdiagTinv.clean()
+                self.cleanAinv(self.timeSteps[tInd+1], Adiaginv)
                 AdiagTinv = None
 
-            # refactor if we need to
+            # refactor if we need to, the adjoint solves reuse the
+            # factorization of Adiag
             if AdiagTinv is None:  # and tInd > -1:
-                Adiag = self.getAdiag(tInd)
-                AdiagTinv = self.Solver(Adiag.T, **self.solverOpts)
+                Adiaginv = self.getAinv(
+                    self.timeSteps[tInd], self.getAdiag, tInd
+                )
+                AdiagTinv = self.getATinv(Adiaginv)
 
             if tInd < self.nT - 1:
                 Asubdiag = self.getAsubdiag(tInd+1)
 
-            for isrc, src in enumerate(self.survey.srcList):
+            # adjoint sources of all sources: nu x nSrc
+            df_duT_v_tInd = np.vstack([
+                Utils.mkvc(
+                    df_duT_v[src, '{}Deriv'.format(self._fieldType), tInd+1]
+                )
+                for src in self.survey.srcList
+            ]).T
 
-                # solve against df_duT_v
-                if tInd >= self.nT-1:
-                    # last timestep (first to be solved)
-                    ATinv_df_duT_v[isrc, :] = AdiagTinv * df_duT_v[
-                        src, '{}Deriv'.format(self._fieldType), tInd+1]
-                elif tInd > -1:
-                    ATinv_df_duT_v[isrc, :] = AdiagTinv * (
-                        Utils.mkvc(df_duT_v[
-                            src, '{}Deriv'.format(self._fieldType), tInd+1
-                        ]
-                    ) - Asubdiag.T * Utils.mkvc(ATinv_df_duT_v[isrc, :]))
+            # solve against df_duT_v for all sources at once
+            if tInd >= self.nT-1:
+                # last timestep (first to be solved)
+                rhs = df_duT_v_tInd
+            else:
+                rhs = df_duT_v_tInd - Asubdiag.T * ATinv_df_duT_v.T
+            ATinv_df_duT_v = (AdiagTinv * rhs).reshape(
+                rhs.shape, order='F'
+            ).T
+
+            for isrc, src in enumerate(self.survey.srcList):
 
                 if tInd < self.nT:
                     dAsubdiagT_dm_v = self.getAsubdiagDeriv(
@@ -339,7 +366,7 @@ class BaseTDEMProblem(Problem.BaseTimeProblem, BaseEMProblem):
 
         # del df_duT_v, ATinv_df_duT_v, A, Asubdiag
         if AdiagTinv is not None:
-            AdiagTinv.clean()
+            self.cleanAinv(self.timeSteps[0], Adiaginv)
 
         return Utils.mkvc(JTv).astype(float)
 
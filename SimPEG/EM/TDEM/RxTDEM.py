@@ -1,5 +1,6 @@
 import SimPEG
 from SimPEG import Utils
+import numpy as np
 import scipy.sparse as sp
 
 
@@ -86,21 +87,41 @@ class BaseRx(SimPEG.Survey.BaseTimeRx):
         # else:
         return timeMesh.getInterpolationMat(self.times, self.projTLoc(f))
 
-    def eval(self, src, mesh, timeMesh, f):
+    def eval(self, src, mesh, timeMesh, f, timeInd=None):
         """
         Project fields to receivers to get data.
 
         :param SimPEG.EM.TDEM.SrcTDEM.BaseSrc src: TDEM source
         :param BaseMesh mesh: mesh used
         :param Fields f: fields object
+        :param slice timeInd: if given, only the part of the data from the
+            fields at these time steps (see :code:`Survey.eval`)
         :rtype: numpy.ndarray
         :return: fields projected to recievers
         """
+        if timeInd is not None:
+            return self._evalTimes(src, mesh, timeMesh, f, self.projField,
+                                   timeInd)
 
         P = self.getP(mesh, timeMesh, f)
         f_part = Utils.mkvc(f[src, self.projField, :])
         return P*f_part
 
+    def _evalTimes(self, src, mesh, timeMesh, f, field, timeInd):
+        """
+        Part of the data from the field at the time steps timeInd (a
+        slice): the data are the sum of these parts over the time steps.
+        The field is not read if no receiver time depends on these steps.
+        """
+        Pt = sp.csc_matrix(self.getTimeP(timeMesh, f))[:, timeInd]
+        Ps = self.getSpatialP(mesh, f)
+        if Pt.nnz == 0:
+            return np.zeros(Pt.shape[0]*Ps.shape[0])
+        f_part = f[src, field, timeInd].reshape(
+            (Ps.shape[1], Pt.shape[1]), order='F'
+        )
+        return Utils.mkvc((Pt * (Ps * f_part).T).T)
+
     def evalDeriv(self, src, mesh, timeMesh, f, v, adjoint=False):
         """
         Derivative of projected fields with respect to the inversion model times a vector.
@@ -164,10 +185,14 @@ class Point_dbdt(BaseRx):
         self.projField = 'dbdt'
         super(Point_dbdt, self).__init__(locs, times, orientation)
 
-    def eval(self, src, mesh, timeMesh, f):
+    def eval(self, src, mesh, timeMesh, f, timeInd=None):
 
         if self.projField in f.aliasFields:
-            return super(Point_dbdt, self).eval(src, mesh, timeMesh, f)
+            return super(Point_dbdt, self).eval(src, mesh, timeMesh, f,
+                                                timeInd=timeInd)
+
+        if timeInd is not None:
+            return self._evalTimes(src, mesh, timeMesh, f, 'b', timeInd)
 
         P = self.getP(mesh, timeMesh, f)
         f_part = Utils.mkvc(f[src, 'b', :])
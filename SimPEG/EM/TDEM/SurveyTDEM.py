@@ -27,9 +27,29 @@ class Survey(SimPEG.Survey.BaseSurvey):
 
     def eval(self, u):
         data = SimPEG.Survey.Data(self)
+        timeBlocks = u._timeBlocks()
+        if len(timeBlocks) == 1:
+            for src in self.srcList:
+                for rx in src.rxList:
+                    data[src, rx] = rx.eval(
+                        src, self.mesh, self.prob.timeMesh, u
+                    )
+            return data
+
+        # Checkpointed fields: project all of the sources from each interval
+        # of time steps in turn, so that each interval is recomputed once
+        parts = {}
+        for timeInd in timeBlocks:
+            for src in self.srcList:
+                for rx in src.rxList:
+                    part = rx.eval(
+                        src, self.mesh, self.prob.timeMesh, u, timeInd=timeInd
+                    )
+                    key = (src, rx)
+                    parts[key] = part if key not in parts else parts[key] + part
         for src in self.srcList:
             for rx in src.rxList:
-                data[src, rx] = rx.eval(src, self.mesh, self.prob.timeMesh, u)
+                data[src, rx] = parts[(src, rx)]
         return data
 
     def evalDeriv(self, u, v=None, adjoint=False):
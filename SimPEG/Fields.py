@@ -241,7 +241,10 @@ class TimeFields(Fields):
             return
         if val.size != np.array(shape).prod():
             raise ValueError('Incorrect size for data.')
-        correctShape = field[:, srcInd, timeInd].shape
+        # shape of field[:, srcInd, timeInd], without reading the field
+        correctShape = (field.shape[0],) + np.empty(
+            field.shape[1:], dtype=bool
+        )[srcInd, timeInd].shape
         field[:, srcInd, timeInd] = val.reshape(correctShape, order='F')
 
     def _getField(self, name, ind):
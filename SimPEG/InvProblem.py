@@ -34,6 +34,16 @@ class BaseInvProblem(Props.BaseSimPEG):
     #: List of strings, e.g. ['_MeSigma', '_MeSigmaI']
     deleteTheseOnModelUpdate = []
 
+    #: Solver for bfgsH0, the inverse of the regularization Hessian. None
+    #: uses the Solver and solverOpts of the problem if it factorizes, and
+    #: SolverLU otherwise. A factorizing solver is reused while the Hessian
+    #: is unchanged, SolverILU or SolverDiag are cheaper approximations on
+    #: large models.
+    bfgsH0Solver = None
+
+    #: Solver options for bfgsH0Solver as a kwarg dict
+    bfgsH0Opts = {}
+
     model = Props.Model("Inversion model.")
 
     @properties.observer('model')
@@ -76,9 +86,56 @@ class BaseInvProblem(Props.BaseSimPEG):
 
         self.model = m0
 
-        print("""SimPEG.InvProblem is setting bfgsH0 to the inverse of the eval2Deriv.
-                    ***Done using same Solver and solverOpts as the problem***""")
-        self.opt.bfgsH0 = self.prob.Solver(self.reg.eval2Deriv(self.model), **self.prob.solverOpts)
+        print("""SimPEG.InvProblem will set bfgsH0 to the inverse of the eval2Deriv.
+                    ***Done using bfgsH0Solver (default: a factorizing Solver of the problem, or SolverLU), when first used***""")
+        self.updateBfgsH0()
+
+    def updateBfgsH0(self):
+        """updateBfgsH0()
+
+            Drop opt.bfgsH0 so that it is rebuilt for the current model (by
+            getBfgsH0) the first time the optimization applies it. Nothing
+            is done if opt.approxHinv is set, as bfgsH0 is then not used.
+        """
+        if getattr(self.opt, '_approxHinv', None) is not None:
+            return
+        self.opt.bfgsH0 = None
+
+    def getBfgsH0(self):
+        """getBfgsH0()
+
+            The inverse of the regularization Hessian at the current model,
+            with bfgsH0Solver. If None, the Solver of the problem is used
+            when it factorizes and SolverLU otherwise, so that applying
+            bfgsH0 does not solve the system again. The Hessian is compared
+            with the one that was last factorized and the factorization is
+            reused while it is unchanged.
+
+            :rtype: Solver
+            :return: bfgsH0
+        """
+        H = sp.csr_matrix(self.reg.eval2Deriv(self.model))
+        H.sum_duplicates()
+
+        H0 = getattr(self, '_bfgsH0', None)
+        Hlast = getattr(self, '_bfgsH0Hessian', None)
+        if (
+            H0 is None or Hlast is None or
+            H.shape != Hlast.shape or H.nnz != Hlast.nnz or
+            not np.array_equal(H.indptr, Hlast.indptr) or
+            not np.array_equal(H.indices, Hlast.indices) or
+            not np.array_equal(H.data, Hlast.data)
+        ):
+            if H0 is not None and hasattr(H0, 'clean'):
+                H0.clean()
+            if self.bfgsH0Solver is not None:
+                H0 = self.bfgsH0Solver(H, **self.bfgsH0Opts)
+            elif getattr(self.prob.Solver, 'factorize', True):
+                H0 = self.prob.Solver(H, **self.prob.solverOpts)
+            else:
+                H0 = Utils.SolverUtils.SolverLU(H)
+            self._bfgsH0, self._bfgsH0Hessian = H0, H
+        return H0
 
     @property
     def warmstart(self):
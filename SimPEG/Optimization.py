@@ -661,6 +661,10 @@ class BFGS(Minimize, Remember):
     name  = 'BFGS'
     nbfgs = 10
 
+    #: dtype of the stored BFGS pairs, np.float32 halves their memory
+    #: (the two-loop recursion is still accumulated in float64)
+    bfgsDtype = np.float64
+
     def __init__(self, **kwargs):
         Minimize.__init__(self, **kwargs)
 
@@ -669,10 +673,19 @@ class BFGS(Minimize, Remember):
         """
             Approximate Hessian used in preconditioning the problem.
 
-            Must be a SimPEG.Solver
+            Must be a SimPEG.Solver. If it is not set, it is taken from the
+            parent (the inverse problem) when it is first used, or is the
+            identity.
         """
         if getattr(self,'_bfgsH0',None) is None:
-            self._bfgsH0 = SolverDiag(sp.identity(self.xc.size))
+            parent = getattr(self, 'parent', None)
+            if (
+                hasattr(parent, 'getBfgsH0') and
+                getattr(parent, 'model', None) is not None
+            ):
+                self._bfgsH0 = parent.getBfgsH0()
+            else:
+                self._bfgsH0 = SolverDiag(sp.identity(self.xc.size))
         return self._bfgsH0
 
     @bfgsH0.setter
@@ -680,28 +693,42 @@ class BFGS(Minimize, Remember):
         self._bfgsH0 = value
 
     def _startup_BFGS(self,x0):
+        # The pairs are kept in a ring buffer with one contiguous row per
+        # pair, _bfgscnt is the number of pairs stored so far minus one.
         self._bfgscnt = -1
-        self._bfgsY   = np.zeros((x0.size, self.nbfgs))
-        self._bfgsS   = np.zeros((x0.size, self.nbfgs))
+        self._bfgsY   = np.zeros((self.nbfgs, x0.size), dtype=self.bfgsDtype)
+        self._bfgsS   = np.zeros((self.nbfgs, x0.size), dtype=self.bfgsDtype)
+        self._bfgsRho = np.zeros(self.nbfgs)
         if not np.any([p is IterationPrinters.comment for p in self.printers]):
             self.printers.append(IterationPrinters.comment)
 
     def bfgs(self, d):
-        n  = self._bfgscnt
-        nn = ktop = min(self._bfgsS.shape[1],n)
-        return self.bfgsrec(ktop,n,nn,self._bfgsS,self._bfgsY,d)
-
-    def bfgsrec(self,k,n,nn,S,Y,d):
-        """BFGS recursion"""
-        if k < 0:
-            d = self.bfgsH0 * d   #Assume that bfgsH0 is a SimPEG.Solver
-        else:
-            khat    = 0 if nn is 0 else np.mod(n-nn+k,nn)
-            gamma   = np.vdot(S[:,khat],d)/np.vdot(Y[:,khat],S[:,khat])
-            d       = d - gamma*Y[:,khat]
-            d       = self.bfgsrec(k-1,n,nn,S,Y,d)
-            d       = d + (gamma - np.vdot(Y[:,khat],d)/np.vdot(Y[:,khat],S[:,khat]))*S[:,khat]
-        return d
+        """bfgs(d)
+
+            Apply the L-BFGS approximation of the inverse Hessian to d with
+            the two-loop recursion over the stored pairs.
+
+            :param numpy.array d: vector
+            :rtype: numpy.array
+            :return: H^{-1} d
+        """
+        nPairs = min(self._bfgscnt + 1, self.nbfgs)
+        # newest to oldest
+        order = np.mod(self._bfgscnt - np.arange(nPairs), self.nbfgs)
+        S, Y, rho = self._bfgsS, self._bfgsY, self._bfgsRho
+
+        q = np.array(d, dtype=np.result_type(d, np.float64))
+        alpha = np.empty(nPairs, dtype=q.dtype)
+        for i, k in enumerate(order):
+            alpha[i] = rho[k] * np.vdot(S[k], q)
+            q -= alpha[i] * Y[k]
+
+        r = np.array(Utils.mkvc(self.bfgsH0 * q), dtype=q.dtype)  #Assume that bfgsH0 is a SimPEG.Solver
+
+        for i in range(nPairs - 1, -1, -1):
+            k = order[i]
+            r += (alpha[i] - rho[k] * np.vdot(Y[k], r)) * S[k]
+        return r
 
     def findSearchDirection(self):
         return self.bfgs(-self.g)
@@ -712,14 +739,16 @@ class BFGS(Minimize, Remember):
             return
 
         yy = self.g - self.g_last;
-        ss = self.xc - xt;
+        ss = self.xc - self.x_last;
         self.g_last = self.g
 
-        if yy.dot(ss) > 0:
+        ys = np.vdot(yy, ss)
+        if ys > 0:
             self._bfgscnt += 1
             ktop = np.mod(self._bfgscnt,self.nbfgs)
-            self._bfgsY[:,ktop] = yy
-            self._bfgsS[:,ktop] = ss
+            self._bfgsY[ktop] = yy
+            self._bfgsS[ktop] = ss
+            self._bfgsRho[ktop] = 1. / ys
             self.comment = ''
         else:
             self.comment = 'Skip BFGS'
@@ -16,6 +16,9 @@ class LinearSurvey(Survey.BaseSurvey):
 
     @property
     def nD(self):
+        if getattr(self.prob, 'forwardOnly', False):
+            # do not form G to count the data
+            return len(self.prob.rtype)*self.nRx
         return self.prob.G.shape[0]
 
     @property
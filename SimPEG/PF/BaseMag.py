@@ -121,6 +121,10 @@ class LinearSurvey(Survey.BaseSurvey):
 
     @property
     def nD(self):
+        if getattr(self.prob, 'forwardOnly', False):
+            # do not form G to count the data
+            nComp = 1 if self.prob.rtype == 'tmi' else 3
+            return nComp*self.nRx
         return self.prob.G.shape[0]
 
     @property
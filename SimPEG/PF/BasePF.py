@@ -0,0 +1,1050 @@
+from __future__ import print_function
+from functools import partial
+import hashlib
+import multiprocessing
+import os
+import numpy as np
+import scipy.sparse as sp
+from scipy.fftpack import next_fast_len
+from scipy.sparse.linalg import LinearOperator
+from scipy.spatial import cKDTree
+from SimPEG import Problem, Utils
+
+
+class BaseIntegral(Problem.LinearProblem):
+    """
+    Base class of the potential field problems in integral form.
+
+    The rows of the sensitivity (one per receiver and component) are
+    computed for blocks of receivers at a time: chunkSize receivers, or by
+    default as many as fit in maxBlockMemory. The blocks are spread over
+    nWorkers workers of the workerPool, see
+    :code:`SimPEG.Utils.parallelMap`. With forwardOnly, each block of rows
+    is multiplied by the model(s) as soon as it is computed, so G is never
+    formed. The progress is handed to progressCallback, if set.
+
+    If Gfile is set, G is written block by block to that file (.npy) and
+    memory-mapped instead of held in memory. Products with G then stream
+    over blocks of rows of at most maxBlockMemory bytes. A G stored by an
+    earlier run is reopened if the mesh, active cells, receivers and
+    inducing field are unchanged.
+
+    If compressTol is set, G is stored compressed instead, see
+    :code:`CompressedG`. This takes precedence over Gfile.
+
+    If cutoffRadius is set, only the cells within cutoffRadius of each
+    receiver (found with a KD-tree over the cell centres) enter its row of
+    G, which is then a sparse CSR matrix. The far field of the other cells
+    is added back with farFieldSize, see :code:`CutoffG`. This takes
+    precedence over compressTol and Gfile.
+
+    If convolution is set and the problem has the structure for it (see
+    :code:`ToeplitzG`), G is never stored and its products are evaluated
+    with FFTs. This takes precedence over all of the above.
+
+    A dense G is stored with the given dtype: float32 halves its memory.
+    The kernels are evaluated in float64 and products with a float32 G
+    are accumulated in float64.
+    """
+
+    #: Number of receivers in each block of sensitivity rows, None sizes
+    #: the blocks to maxBlockMemory
+    chunkSize = None
+
+    #: Number of receiver-by-cell float64 arrays held while the rows of a
+    #: block are evaluated, used to size the blocks
+    nTemporaries = 32
+
+    #: Called as progressCallback(nDone, nTotal) as the receivers are
+    #: done, None prints the progress
+    progressCallback = None
+
+    #: File (.npy) to keep G on disk, None keeps G in memory
+    Gfile = None
+
+    #: Memory (bytes) of a block of rows of G, as evaluated or read from
+    #: disk at a time
+    maxBlockMemory = 2**28
+
+    #: Relative accuracy of each row of a wavelet-compressed G, None
+    #: stores G uncompressed
+    compressTol = None
+
+    #: Precision of a dense G (in memory or in Gfile): float64 | float32
+    dtype = np.float64
+
+    #: Distance (m) beyond which cells are left out of the rows of a
+    #: sparse G, None keeps all of the cells
+    cutoffRadius = None
+
+    #: Size (m) of the coarse cells aggregating the far field beyond
+    #: cutoffRadius, None drops the far field
+    farFieldSize = None
+
+    #: Evaluate G with FFTs on regular meshes and receiver grids
+    convolution = False
+
+    def __init__(self, mesh, **kwargs):
+        Problem.BaseProblem.__init__(self, mesh, **kwargs)
+
+    def Jvec(self, m, v, f=None):
+        return self.Gvec(v)
+
+    def Jtvec(self, m, v, f=None):
+        return self.Gtvec(v)
+
+    def Gvec(self, v):
+        """G times v, streamed over blocks of rows if G is on disk"""
+        G = self.G
+        if not self._streamG(G):
+            return G.dot(v)
+        out = np.empty(G.shape[0])
+        for rows in self._rowBlocks(G):
+            out[rows] = dot64(G[rows], v)
+        return out
+
+    def Gtvec(self, v):
+        """G.T times v, streamed over blocks of rows if G is on disk"""
+        G = self.G
+        if not self._streamG(G):
+            return G.T.dot(v)
+        out = np.zeros(G.shape[1])
+        for rows in self._rowBlocks(G):
+            out += dot64(G[rows].T, v[rows])
+        return out
+
+    def GtGdiag(self):
+        """Diagonal of G.T*G (squared column norms of G)"""
+        G = self.G
+        if isinstance(G, (CompressedG, CutoffG, ToeplitzG)):
+            return G.colNorm2()
+        if sp.issparse(G):
+            return np.asarray(G.multiply(G).sum(axis=0), dtype=float).ravel()
+        if not self._streamG(G):
+            return np.sum(G**2., axis=0)
+        out = np.zeros(G.shape[1])
+        for rows in self._rowBlocks(G):
+            out += np.sum(np.asarray(G[rows], dtype=np.float64)**2., axis=0)
+        return out
+
+    def _streamG(self, G):
+        """Whether products with G go over blocks of rows"""
+        return isinstance(G, np.memmap) or (
+            isinstance(G, np.ndarray) and G.dtype != np.float64
+        )
+
+    def _rowBlocks(self, G):
+        """Slices of the rows of G that fit in maxBlockMemory"""
+        nRow = max(int(self.maxBlockMemory // (G.shape[1]*G.itemsize)), 1)
+        return [
+            slice(start, min(start + nRow, G.shape[0]))
+            for start in range(0, G.shape[0], nRow)
+        ]
+
+    def _GKey(self, *args):
+        """Hash of the mesh and of the arrays (or strings) that define G"""
+        sha = hashlib.sha1()
+        args = list(args) + [np.dtype(self.dtype).str]
+        for arr in list(self.mesh.h) + [self.mesh.x0] + args:
+            sha.update(np.ascontiguousarray(arr).tobytes())
+        return sha.hexdigest()
+
+    def _loadG(self, key):
+        """G stored in Gfile for the key, None if there is none"""
+        if self.Gfile is None or self.compressTol is not None:
+            return None
+        keyFile = self.Gfile + '.key'
+        if not (os.path.isfile(self.Gfile) and os.path.isfile(keyFile)):
+            return None
+        with open(keyFile, 'r') as fid:
+            if fid.read().strip() != key:
+                return None
+        print("Loading forward operator from " + self.Gfile)
+        return np.load(self.Gfile, mmap_mode='r')
+
+    def _allocateG(self, shape, xyz=None):
+        """
+        Storage of G: in memory, compressed, or memory-mapped in Gfile
+
+        :param tuple shape: shape of G
+        :param numpy.ndarray xyz: cell centres, used to order the cells of
+            a compressed G
+        """
+        if self.compressTol is not None:
+            order = None
+            if xyz is not None:
+                order = mortonOrder(xyz)
+                nBlock = shape[1] // len(order)
+                order = np.hstack([order + ii*len(order)
+                                   for ii in range(nBlock)])
+            return CompressedG(shape, self.compressTol, order=order)
+        if self.Gfile is None:
+            return np.zeros(shape, dtype=self.dtype)
+        # invalidate a stored G until the new one is complete
+        keyFile = self.Gfile + '.key'
+        if os.path.isfile(keyFile):
+            os.remove(keyFile)
+        return np.lib.format.open_memmap(
+            self.Gfile, mode='w+', dtype=self.dtype, shape=shape
+        )
+
+    def _saveG(self, G, key):
+        """Flush a memory-mapped G and record its key"""
+        if isinstance(G, CompressedG):
+            G.finalize()
+            return G
+        if not isinstance(G, np.memmap):
+            return G
+        G.flush()
+        with open(self.Gfile + '.key', 'w') as fid:
+            fid.write(key)
+        return np.load(self.Gfile, mmap_mode='r')
+
+    @property
+    def geometry(self):
+        """Geometry of the active cells, see :code:`activeGeometry`"""
+        return activeGeometry(self.mesh, getattr(self, 'actInd', None))
+
+    def distWgt(self, R, R0):
+        """
+        Distance weighting of the active cells for the receivers of the
+        survey, see :code:`calcDistWgt`. Cached for the current mesh,
+        active cells and receivers.
+
+        :param float R: decay factor (mag=3, grav=2)
+        :param float R0: small factor added to the distances
+        :rtype: numpy.ndarray
+        """
+        geometry = self.geometry
+        rxLoc = self.survey.srcField.rxList[0].locs
+
+        key = self._GKey(geometry.inds, rxLoc, np.r_[R, R0])
+        cached = getattr(self, '_distWgt', None)
+        if cached is None or cached[0] != key:
+            wr = calcDistWgt(geometry.xyz, geometry.h, rxLoc, R, R0,
+                             nWorkers=self.nWorkers,
+                             pool=self.workerPool)
+            self._distWgt = (key, wr)
+        return self._distWgt[1]
+
+    def _toeplitzG(self, rowFun, rxLoc, nRow, nComp=1, M=None, tol=1e-6):
+        """
+        G as a ToeplitzG if the cells and receivers allow it, else None
+
+        :param callable rowFun: rowFun(ind, Xn=, Yn=, Zn=, rxLoc=[, M=]) rows
+            of the receivers ind for the given cells, as in calcRows
+        :param numpy.ndarray rxLoc: receiver locations (ndata-by-3)
+        :param int nRow: number of rows (components) per receiver
+        :param int nComp: number of columns per cell
+        :param numpy.ndarray M: magnetization of the cells (nC-by-3), or
+            None if rowFun takes none
+        """
+        mesh = self.mesh
+        if getattr(mesh, '_meshType', None) != 'TENSOR' or mesh.dim != 3:
+            return None
+        if M is not None and not np.allclose(M, M[0]):
+            return None
+
+        ijk = self.geometry.ijk
+        lo = [ind.min() for ind in ijk]
+        hi = [ind.max() for ind in ijk]
+        shape = tuple(h - l + 1 for l, h in zip(lo, hi))
+        cells = tuple(ind - l for ind, l in zip(ijk, lo))
+
+        # Uniform cells in x and y, receivers at constant height on a
+        # grid of the cell size (or a multiple of it)
+        rxGrid = []
+        for hh, l, h, x in zip([mesh.hx, mesh.hy], lo, hi, rxLoc.T):
+            if not np.allclose(hh[l:h+1], hh[l], rtol=tol):
+                return None
+            step = (x - x.min()) / hh[l]
+            if not np.allclose(step, np.round(step), atol=tol):
+                return None
+            rxGrid.append(np.round(step).astype(int))
+        if np.ptp(rxLoc[:, 2]) > tol * mesh.hx[lo[0]]:
+            return None
+
+        # Kernels of one cell per layer, for all receiver-cell offsets
+        nodes = [mesh.vectorNx, mesh.vectorNy, mesh.vectorNz]
+        nZ = shape[2]
+        offsets = [
+            np.arange(-(n - 1), g.max() + 1) for n, g in zip(shape, rxGrid)
+        ]
+        ox, oy = np.meshgrid(offsets[0], offsets[1], indexing='ij')
+        rxOffset = np.c_[
+            rxLoc[:, 0].min() + ox.ravel() * mesh.hx[lo[0]],
+            rxLoc[:, 1].min() + oy.ravel() * mesh.hy[lo[1]],
+            np.full(ox.size, rxLoc[0, 2])
+        ]
+        geometry = {
+            'Xn': np.repeat(nodes[0][None, lo[0]:lo[0]+2], nZ, axis=0),
+            'Yn': np.repeat(nodes[1][None, lo[1]:lo[1]+2], nZ, axis=0),
+            'Zn': np.c_[nodes[2][lo[2]:hi[2]+1], nodes[2][lo[2]+1:hi[2]+2]],
+            'rxLoc': rxOffset
+        }
+        if M is not None:
+            geometry['M'] = np.repeat(M[:1], nZ, axis=0)
+
+        blocks = self._rxBlocks(rxOffset.shape[0], nZ)
+        rows = self.parallelMap(partial(rowFun, **geometry), blocks)
+        kernel = np.stack(
+            [np.vstack([block[ii] for block in rows]) for ii in range(nRow)]
+        ).reshape((nRow, ox.shape[0], ox.shape[1], nComp, nZ))
+
+        return ToeplitzG(
+            kernel.transpose((0, 3, 1, 2, 4)), shape, cells, rxGrid
+        )
+
+    def _cutoffG(self, rowFun, Xn, Yn, Zn, rxLoc, nRow, nComp=1, M=None):
+        """
+        G restricted to the cells within cutoffRadius of each receiver, a
+        CSR matrix, or a CutoffG if the far field is aggregated
+        (farFieldSize)
+
+        :param callable rowFun: rowFun(ind, Xn=, Yn=, Zn=, rxLoc=[, M=]) rows
+            of the receivers ind for the given cells, as in calcRows
+        :param numpy.ndarray Xn: lower and upper x of the cells (nC-by-2)
+        :param numpy.ndarray rxLoc: receiver locations (ndata-by-3)
+        :param int nRow: number of rows (components) per receiver
+        :param int nComp: number of columns per cell
+        :param numpy.ndarray M: magnetization of the cells (nC-by-3), or
+            None if rowFun takes none
+        """
+        nC = Xn.shape[0]
+        ndata = rxLoc.shape[0]
+        tree = cKDTree(np.c_[Xn.mean(1), Yn.mean(1), Zn.mean(1)])
+
+        far = None
+        if self.farFieldSize is not None:
+            far = aggregateCells(Xn, Yn, Zn, self.farFieldSize, M=M)
+            nB = far['A'].shape[0]
+
+        blockFun = partial(
+            cutoffBlock, rowFun=rowFun, tree=tree, rxLoc=rxLoc,
+            radius=self.cutoffRadius, Xn=Xn, Yn=Yn, Zn=Zn, nRow=nRow,
+            nComp=nComp, M=M, far=far
+        )
+
+        nearRows, nearCols, nearVals = [], [], []
+        if far is not None:
+            farG = np.zeros((nRow*ndata, nComp*nB), dtype=self.dtype)
+
+        def store(ind, out):
+            nearRows.append(out[0])
+            nearCols.append(out[1])
+            nearVals.append(out[2])
+            if far is not None:
+                for jj in range(nRow):
+                    farG[ind + jj*ndata] = out[3][jj]
+
+        self._evalBlocks(blockFun, ndata, store, nC)
+
+        nearG = sp.csr_matrix(
+            (np.hstack(nearVals + [np.zeros(0)]).astype(self.dtype),
+             (np.hstack(nearRows + [np.zeros(0, dtype=int)]),
+              np.hstack(nearCols + [np.zeros(0, dtype=int)]))),
+            shape=(nRow*ndata, nComp*nC)
+        )
+        if far is None:
+            return nearG
+        return CutoffG(
+            nearG, farG, sp.block_diag([far['A']]*nComp, format='csr')
+        )
+
+    def _rxBlocks(self, ndata, nC):
+        """
+        Indices of the receivers of each block: chunkSize receivers, or by
+        default as many as fit in maxBlockMemory with nTemporaries
+        receiver-by-cell arrays of float64
+        """
+        chunkSize = self.chunkSize
+        if chunkSize is None:
+            chunkSize = self.maxBlockMemory // (max(nC, 1)*self.nTemporaries*8)
+        chunkSize = max(int(chunkSize), 1)
+        return [
+            np.arange(start, min(start + chunkSize, ndata))
+            for start in range(0, ndata, chunkSize)
+        ]
+
+    def _evalBlocks(self, rowFun, ndata, store, nC):
+        """
+        Evaluate rowFun for all of the receiver blocks and hand the results
+        to store(ind, rows). At most one block per worker is held in memory
+        at a time. The workers are started once for all of the blocks.
+
+        :param callable rowFun: rows of a block of receiver indices
+        :param int ndata: number of receivers
+        :param callable store: store(ind, rows) for each block
+        :param int nC: number of cells, to size the blocks
+        """
+        blocks = self._rxBlocks(ndata, nC)
+        nGroup = max(self.nWorkers or multiprocessing.cpu_count(), 1)
+        nGroup = min(nGroup, len(blocks))
+
+        workers = None
+        if nGroup > 1:
+            workers = Utils.openPool(nGroup, self.workerPool)
+
+        count = -1
+        try:
+            for start in range(0, len(blocks), nGroup):
+                group = blocks[start:start + nGroup]
+                if workers is None:
+                    rows = [rowFun(ind) for ind in group]
+                else:
+                    rows = Utils.parallelMap(rowFun, group, pool=workers)
+                for ind, out in zip(group, rows):
+                    store(ind, out)
+                if self.progressCallback is None:
+                    count = progress(group[-1][-1], count, ndata)
+                else:
+                    self.progressCallback(group[-1][-1] + 1, ndata)
+        except:
+            if workers is not None:
+                workers.terminate()
+            raise
+        if workers is not None:
+            workers.close()
+            workers.join()
+
+        if self.progressCallback is None:
+            print("Done 100% ...forward operator completed!!\n")
+
+
+def dot64(A, x, nSum=4096):
+    """
+    A*x for a dense A of any precision, accumulated in float64
+
+    The products are computed in the precision of A over blocks of nSum
+    columns, and the blocks are summed in float64.
+    """
+    if A.dtype == np.float64:
+        return A.dot(x)
+    x = np.asarray(x, dtype=A.dtype)
+    out = np.zeros(A.shape[0])
+    for start in range(0, A.shape[1], nSum):
+        out += A[:, start:start+nSum].dot(x[start:start+nSum])
+    return out
+
+
+def activeIndices(actInd, nC):
+    """
+    Indices of the active cells
+
+    :param numpy.ndarray actInd: active cells, as a boolean mask or indices
+        (None: all of the cells)
+    :param int nC: number of cells of the mesh
+    :rtype: numpy.ndarray
+    """
+    if actInd is None:
+        return np.arange(nC)
+    actInd = np.asarray(actInd)
+    if actInd.dtype == 'bool':
+        return np.where(actInd)[0]
+    return actInd.astype(int)
+
+
+def activeGeometry(mesh, actInd=None):
+    """
+    Geometry of the active cells of a tensor mesh (see
+    :code:`ActiveGeometry`), computed once and shared by all of the
+    problems and drivers using the same mesh and active cells.
+
+    :param discretize.TensorMesh mesh: mesh
+    :param numpy.ndarray actInd: active cells, as a boolean mask or indices
+    :rtype: ActiveGeometry
+    """
+    inds = activeIndices(actInd, mesh.nC)
+    key = hashlib.sha1(np.ascontiguousarray(inds).tobytes()).hexdigest()
+    geometry = getattr(mesh, '_activeGeometry', None)
+    if geometry is None or geometry.key != key:
+        geometry = ActiveGeometry(mesh, inds, key=key)
+        mesh._activeGeometry = geometry
+    return geometry
+
+
+class ActiveGeometry(object):
+    """
+    Active cells of a tensor mesh: their indices, projector and corners,
+    each computed once on first use.
+
+    The corners are taken from the node vectors at the (i, j, k) of the
+    active cells, without forming grids over the whole mesh.
+    """
+
+    def __init__(self, mesh, inds, key=None):
+        self.mesh = mesh
+        self.inds = inds
+        self.key = key
+
+    @property
+    def nC(self):
+        """Number of active cells"""
+        return len(self.inds)
+
+    @property
+    def ijk(self):
+        """(i, j, k) of the active cells"""
+        if getattr(self, '_ijk', None) is None:
+            self._ijk = np.unravel_index(self.inds, self.mesh.vnC, order='F')
+        return self._ijk
+
+    @property
+    def P(self):
+        """Projector from the active cells to the mesh (nC-by-nActive)"""
+        if getattr(self, '_P', None) is None:
+            self._P = sp.csr_matrix(
+                (np.ones(self.nC), (self.inds, np.arange(self.nC))),
+                shape=(self.mesh.nC, self.nC)
+            )
+        return self._P
+
+    def _corners(self, dim):
+        nodes = [self.mesh.vectorNx, self.mesh.vectorNy, self.mesh.vectorNz]
+        ind = self.ijk[dim]
+        return np.c_[nodes[dim][ind], nodes[dim][ind + 1]]
+
+    @property
+    def Xn(self):
+        """Lower and upper x of the active cells"""
+        if getattr(self, '_Xn', None) is None:
+            self._Xn = self._corners(0)
+        return self._Xn
+
+    @property
+    def Yn(self):
+        """Lower and upper y of the active cells"""
+        if getattr(self, '_Yn', None) is None:
+            self._Yn = self._corners(1)
+        return self._Yn
+
+    @property
+    def Zn(self):
+        """Lower and upper z of the active cells"""
+        if getattr(self, '_Zn', None) is None:
+            self._Zn = self._corners(2)
+        return self._Zn
+
+    @property
+    def xyz(self):
+        """Centres of the active cells"""
+        return np.c_[self.Xn.mean(1), self.Yn.mean(1), self.Zn.mean(1)]
+
+    @property
+    def h(self):
+        """Sizes of the active cells"""
+        return np.c_[np.diff(self.Xn), np.diff(self.Yn), np.diff(self.Zn)]
+
+
+def calcDistWgt(xyz, h, rxLoc, R, R0, chunkSize=None, nWorkers=1,
+                pool='thread'):
+    """
+    Distance weighting of the cells for the magnetic and gravity inverse
+    problems: the root sum of squares over the receivers of the distance
+    decay (R + R0)**-R, averaged over 8 points inside each cell, and
+    normalized to a maximum of 1.
+
+    The receivers are processed in blocks of chunkSize (by default, blocks
+    of about 2**22 receiver-cell pairs) by nWorkers workers, see
+    :code:`SimPEG.Utils.parallelMap`.
+
+    :param numpy.ndarray xyz: cell centres (nC-by-3)
+    :param numpy.ndarray h: cell sizes (nC-by-3)
+    :param numpy.ndarray rxLoc: receiver locations (ndata-by-3)
+    :param float R: decay factor (mag=3, grav=2)
+    :param float R0: small factor added to the distances
+    :rtype: numpy.ndarray
+    :return: wr (nC)
+    """
+    ndata = rxLoc.shape[0]
+    if chunkSize is None:
+        chunkSize = max(2**22 // xyz.shape[0], 1)
+    blocks = [
+        np.arange(start, min(start + chunkSize, ndata))
+        for start in range(0, ndata, chunkSize)
+    ]
+
+    print("Begin calculation of distance weighting for R= " + str(R))
+
+    rowFun = partial(distWgtBlock, xyz=xyz, h=h, rxLoc=rxLoc, R=R, R0=R0)
+    wr = np.sum(
+        Utils.parallelMap(rowFun, blocks, nWorkers=nWorkers, pool=pool),
+        axis=0
+    )
+
+    wr = np.sqrt(wr)/8.
+    wr = np.sqrt(wr/(np.max(wr)))
+
+    print("Done 100% ...distance weighting completed!!\n")
+
+    return wr
+
+
+def distWgtBlock(ind, xyz, h, rxLoc, R, R0):
+    """
+    Sum over the receivers rxLoc[ind, :] of the squared distance decay of
+    the cells, see :code:`calcDistWgt`
+    """
+    p = 1/np.sqrt(3)
+    rx = rxLoc[ind, :]
+
+    # squared distances along each axis to the two points of each cell
+    d2 = [
+        [((xyz[:, kk] + sign * h[:, kk] * p)[None, :] - rx[:, kk, None])**2.
+         for sign in (-1., 1.)]
+        for kk in range(3)
+    ]
+
+    temp = np.zeros((rx.shape[0], xyz.shape[0]))
+    for dx in d2[0]:
+        for dy in d2[1]:
+            for dz in d2[2]:
+                temp += (np.sqrt(dx + dy + dz) + R0)**-R
+
+    return np.sum(temp**2., axis=0)
+
+
+def cutoffBlock(ind, rowFun, tree, rxLoc, radius, Xn, Yn, Zn, nRow,
+                nComp=1, M=None, far=None):
+    """
+    Near field (and far field) rows of the receivers rxLoc[ind, :] for a
+    sparse G, see :code:`BaseIntegral._cutoffG`
+
+    Each receiver keeps the cells within radius of it (or, with a far
+    field, the coarse cells holding them). The near field of the whole
+    block is evaluated with a single call of rowFun.
+
+    :param numpy.ndarray ind: receiver indices
+    :param callable rowFun: rowFun(ind, Xn=, Yn=, Zn=, rxLoc=[, M=]) rows
+        of the receivers ind for the given cells, as in calcRows
+    :param scipy.spatial.cKDTree tree: tree of the cell centres
+    :param float radius: cutoff radius
+    :param dict far: coarse cells of the far field (see
+        :code:`aggregateCells`), or None
+    :rtype: tuple
+    :return: rows, columns and values of the near field, and the far
+        field rows [(len(ind), nComp*nB) array] for each of the nRow
+        components (None without a far field)
+    """
+    nC, ndata = Xn.shape[0], rxLoc.shape[0]
+    balls = tree.query_ball_point(rxLoc[ind, :], radius)
+    rx = np.repeat(np.arange(len(ind)), [len(ball) for ball in balls])
+    cells = np.hstack(
+        [np.asarray(ball, dtype=int) for ball in balls] +
+        [np.zeros(0, dtype=int)]
+    )
+
+    farRows = None
+    if far is not None:
+        # near field over whole coarse cells, so that each cell is in
+        # either the near or the far field
+        nB = far['A'].shape[0]
+        farGeometry = {'Xn': far['Xn'], 'Yn': far['Yn'], 'Zn': far['Zn']}
+        if M is not None:
+            farGeometry['M'] = far['M']
+        farRows = rowFun(ind, **farGeometry)
+
+        pairs = np.unique(rx * nB + far['blockOf'][cells])
+        rx, blocks = pairs // nB, pairs % nB
+        for jj in range(nRow):
+            for kk in range(nComp):
+                farRows[jj][rx, blocks + kk*nB] = 0.
+
+        start, count = far['start'][blocks], np.diff(far['start'])[blocks]
+        offset = np.cumsum(count) - count
+        rx = np.repeat(rx, count)
+        cells = far['order'][
+            np.arange(count.sum()) + np.repeat(start - offset, count)
+        ]
+
+    # the kernels only depend on the offsets between the cells and the
+    # receiver, so all of the receiver-cell pairs are evaluated at once as
+    # cells shifted to a receiver at the origin
+    loc = rxLoc[ind[rx], :]
+    geometry = {
+        'Xn': Xn[cells] - loc[:, 0, None], 'Yn': Yn[cells] - loc[:, 1, None],
+        'Zn': Zn[cells] - loc[:, 2, None], 'rxLoc': np.zeros((1, 3))
+    }
+    if M is not None:
+        geometry['M'] = M[cells]
+    nPair = len(cells)
+    rows = rowFun(np.r_[0], **geometry) if nPair else None
+
+    nearRows, nearCols, nearVals = [], [], []
+    for jj in range(nRow):
+        for kk in range(nComp):
+            nearRows.append(ind[rx] + jj*ndata)
+            nearCols.append(cells + kk*nC)
+            nearVals.append(
+                rows[jj][0, kk*nPair:(kk+1)*nPair] if nPair
+                else np.zeros(0)
+            )
+    return (
+        np.hstack(nearRows), np.hstack(nearCols), np.hstack(nearVals),
+        farRows
+    )
+
+
+def aggregateCells(Xn, Yn, Zn, size, M=None):
+    """
+    Aggregate the cells into coarse cells of a given size
+
+    Each coarse cell is the bounding box of the cells whose centres fall in
+    the same cube of side size. The model of the coarse cell is the volume
+    weighted sum of the models of its cells, divided by its volume.
+
+    :param numpy.ndarray Xn: lower and upper x of the cells (nC-by-2)
+    :param float size: size of the coarse cells
+    :param numpy.ndarray M: magnetization of the cells (nC-by-3)
+    :rtype: dict
+    :return: Xn, Yn, Zn and M of the coarse cells, blockOf (coarse cell of
+        each cell), members (cells of each coarse cell, also as
+        order[start[b]:start[b+1]]) and A (coarse model = A * model)
+    """
+    nodes = [Xn, Yn, Zn]
+    xyz = np.c_[Xn.mean(1), Yn.mean(1), Zn.mean(1)]
+    key = np.floor((xyz - xyz.min(axis=0)) / size).astype(np.int64)
+    _, blockOf = np.unique(key, axis=0, return_inverse=True)
+    blockOf = blockOf.ravel()
+    nB = blockOf.max() + 1
+
+    out = {'blockOf': blockOf}
+    vol = np.ones(len(blockOf))
+    volB = np.ones(nB)
+    for name, n in zip(['Xn', 'Yn', 'Zn'], nodes):
+        box = np.c_[np.full(nB, np.inf), np.full(nB, -np.inf)]
+        np.minimum.at(box[:, 0], blockOf, n[:, 0])
+        np.maximum.at(box[:, 1], blockOf, n[:, 1])
+        out[name] = box
+        vol *= n[:, 1] - n[:, 0]
+        volB *= box[:, 1] - box[:, 0]
+
+    out['A'] = sp.csr_matrix(
+        (vol / volB[blockOf], (blockOf, np.arange(len(blockOf)))),
+        shape=(nB, len(blockOf))
+    )
+
+    order = np.argsort(blockOf, kind='mergesort')
+    out['order'] = order
+    out['start'] = np.searchsorted(blockOf[order], np.arange(nB + 1))
+    out['members'] = np.split(order, out['start'][1:-1])
+
+    out['M'] = None
+    if M is not None:
+        Mb = out['A'] * M
+        out['M'] = Mb / np.linalg.norm(Mb, axis=1)[:, None]
+    return out
+
+
+class CutoffG(LinearOperator):
+    """
+    Sensitivity matrix made of a sparse near field and an aggregated far
+    field::
+
+        G = near + far * A
+
+    near (CSR) holds the exact rows over the cells close to each receiver.
+    far holds the rows over coarse cells (see :code:`aggregateCells`),
+    zero where the coarse cell is in the near field of the receiver, and A
+    maps the model of the cells to the coarse cells.
+    """
+
+    def __init__(self, near, far, A):
+        super(CutoffG, self).__init__(dtype=float, shape=near.shape)
+        self.near = near
+        self.far = far
+        self.A = A
+
+    @property
+    def nbytes(self):
+        """Memory (bytes) of G"""
+        return sum([
+            self.near.data.nbytes, self.near.indices.nbytes,
+            self.near.indptr.nbytes, self.far.nbytes, self.A.data.nbytes,
+            self.A.indices.nbytes, self.A.indptr.nbytes
+        ])
+
+    def _matvec(self, v):
+        v = np.asarray(v).ravel()
+        return self.near * v + dot64(self.far, self.A * v)
+
+    def _rmatvec(self, v):
+        v = np.asarray(v).ravel()
+        return self.near.T * v + self.A.T * dot64(self.far.T, v)
+
+    def _transpose(self):
+        return Utils.transposeOperator(self)
+    _adjoint = _transpose
+
+    def colNorm2(self):
+        """Squared column norms"""
+        # each cell is in the near or the far field of a receiver, and in
+        # a single coarse cell, so there are no cross terms
+        near = np.asarray(self.near.multiply(self.near).sum(axis=0)).ravel()
+        far = np.sum(np.asarray(self.far, dtype=float)**2., axis=0)
+        return near + self.A.multiply(self.A).T * far
+
+
+class ToeplitzG(LinearOperator):
+    """
+    Sensitivity matrix of cells on a regular (x, y) grid and receivers on
+    a regular grid at constant height, evaluated with FFTs.
+
+    The kernel of a cell then only depends on its layer and on the offset
+    (in cells) between the receiver and the cell, so that the data of each
+    layer is a 2D convolution of the kernel with the model::
+
+        d[p, q] = sum_k sum_ij K_k[p - i, q - j] * m_k[i, j]
+
+    G is never stored: the memory is that of the kernels (one per layer,
+    receiver component and model component) and the products cost
+    O(N log N).
+
+    :param numpy.ndarray kernel: kernels (nRow, nComp, Lx, Ly, nz) over the
+        offsets -(nx-1)..px, -(ny-1)..py
+    :param tuple shape: (nx, ny, nz) of the box holding the cells
+    :param tuple cells: (i, j, k) of each cell in the box
+    :param list rxGrid: [p, q] of each receiver on the receiver grid
+    """
+
+    def __init__(self, kernel, shape, cells, rxGrid):
+        nRow, nComp = kernel.shape[:2]
+        super(ToeplitzG, self).__init__(
+            dtype=float,
+            shape=(nRow*len(rxGrid[0]), nComp*len(cells[0]))
+        )
+        self.box = shape
+        self.cells = cells
+        self.nRow, self.nComp = nRow, nComp
+        # receivers on the linear convolution of the box with the kernel
+        self.rx = (rxGrid[0] + shape[0] - 1, rxGrid[1] + shape[1] - 1)
+        self.fftShape = tuple(
+            next_fast_len(n + L - 1)
+            for n, L in zip(shape[:2], kernel.shape[2:4])
+        )
+        self.Khat = np.fft.rfft2(kernel, s=self.fftShape, axes=(2, 3))
+
+    @property
+    def nbytes(self):
+        """Memory (bytes) of the kernels"""
+        return self.Khat.nbytes
+
+    def _matvec(self, v):
+        v = np.asarray(v).ravel()
+        nC = len(self.cells[0])
+        mhat = []
+        for cc in range(self.nComp):
+            box = np.zeros(self.box)
+            box[self.cells] = v[cc*nC:(cc+1)*nC]
+            mhat.append(np.fft.rfft2(box, s=self.fftShape, axes=(0, 1)))
+        mhat = np.stack(mhat)
+
+        out = []
+        for rr in range(self.nRow):
+            dhat = np.einsum('cxyk,cxyk->xy', self.Khat[rr], mhat)
+            d = np.fft.irfft2(dhat, s=self.fftShape)
+            out.append(d[self.rx])
+        return np.hstack(out)
+
+    def _rmatvec(self, v, Khat=None):
+        if Khat is None:
+            Khat = self.Khat
+        v = np.asarray(v).ravel()
+        ndata = len(self.rx[0])
+
+        vhat = []
+        for rr in range(self.nRow):
+            grid = np.zeros(self.fftShape)
+            np.add.at(grid, self.rx, v[rr*ndata:(rr+1)*ndata])
+            vhat.append(np.fft.rfft2(grid))
+        vhat = np.stack(vhat)
+
+        out = []
+        for cc in range(self.nComp):
+            mhat = np.einsum('rxyk,rxy->xyk', Khat[:, cc].conj(), vhat)
+            m = np.fft.irfft2(mhat, s=self.fftShape, axes=(0, 1))
+            out.append(m[self.cells])
+        return np.hstack(out)
+
+    def _transpose(self):
+        return Utils.transposeOperator(self)
+    _adjoint = _transpose
+
+    def colNorm2(self):
+        """Squared column norms"""
+        kernel = np.fft.irfft2(self.Khat, s=self.fftShape, axes=(2, 3))
+        K2hat = np.fft.rfft2(kernel**2., axes=(2, 3))
+        return self._rmatvec(np.ones(self.shape[0]), Khat=K2hat)
+
+
+class CompressedG(LinearOperator):
+    """
+    Sensitivity matrix stored as thresholded Haar wavelet coefficients of
+    its rows.
+
+    The cells (columns) are put in the order given (e.g. along a
+    space-filling curve) so that neighbouring cells are neighbouring
+    columns. Each row is then transformed with an orthonormal Haar wavelet
+    and the smallest coefficients are dropped for as long as the dropped
+    energy stays below tol**2 times the energy of the row. Each row of the
+    compressed G is therefore accurate to a relative (2-norm) error tol.
+
+    The potential-field kernels are smooth away from the receiver, so most
+    of the coefficients are dropped. Products are applied in the wavelet
+    domain::
+
+        G*v = C*(W*v)
+        G.T*v = W.T*(C.T*v)
+
+    Rows are added block by block with G[rows] = values, and finalize is
+    called once all of the rows are in.
+    """
+
+    def __init__(self, shape, tol, order=None):
+        super(CompressedG, self).__init__(dtype=float, shape=shape)
+        self.tol = tol
+        if order is None:
+            order = np.arange(shape[1])
+        self.order = order
+        self.nW = 2**int(np.ceil(np.log2(max(shape[1], 1))))
+        self._blocks = []
+        self.C = None
+
+    def __setitem__(self, rows, values):
+        rows = np.atleast_1d(rows)
+        values = np.atleast_2d(values)
+        coef = np.zeros((len(rows), self.nW))
+        coef[:, :self.shape[1]] = values[:, self.order]
+        coef = haar(coef)
+
+        # Drop the smallest coefficients of each row, keeping the dropped
+        # energy below tol**2 of the row energy
+        coef2 = coef**2.
+        srt = np.argsort(coef2, axis=1)
+        cum = np.cumsum(np.take_along_axis(coef2, srt, axis=1), axis=1)
+        nDrop = np.sum(cum <= self.tol**2. * cum[:, -1:], axis=1)
+        rank = np.empty_like(srt)
+        np.put_along_axis(
+            rank, srt, np.arange(self.nW)[None, :].repeat(len(rows), 0),
+            axis=1
+        )
+        ii, jj = np.nonzero(rank >= nDrop[:, None])
+        self._blocks.append((rows[ii], jj, coef[ii, jj]))
+
+    def finalize(self):
+        """Assemble the coefficients of all of the rows"""
+        if self._blocks:
+            rows, cols, vals = [np.hstack(x) for x in zip(*self._blocks)]
+        else:
+            rows = cols = np.zeros(0, dtype=int)
+            vals = np.zeros(0)
+        self.C = sp.csr_matrix(
+            (vals, (rows, cols)), shape=(self.shape[0], self.nW)
+        )
+        self._blocks = []
+
+    @property
+    def nbytes(self):
+        """Memory (bytes) of the compressed G"""
+        return self.C.data.nbytes + self.C.indices.nbytes + self.C.indptr.nbytes
+
+    @property
+    def compression(self):
+        """Ratio of the memory of the dense G to the compressed G"""
+        return self.shape[0]*self.shape[1]*8. / self.nbytes
+
+    def _matvec(self, v):
+        x = np.zeros(self.nW)
+        x[:self.shape[1]] = np.asarray(v).ravel()[self.order]
+        return self.C * haar(x)
+
+    def _rmatvec(self, v):
+        x = ihaar(self.C.T * np.asarray(v).ravel())
+        out = np.empty(self.shape[1])
+        out[self.order] = x[:self.shape[1]]
+        return out
+
+    def _transpose(self):
+        return Utils.transposeOperator(self)
+    _adjoint = _transpose
+
+    def colNorm2(self, nRow=100):
+        """Squared column norms, from nRow rows decompressed at a time"""
+        out = np.zeros(self.nW)
+        for start in range(0, self.shape[0], nRow):
+            rows = ihaar(self.C[start:start+nRow].toarray())
+            out += np.sum(rows**2., axis=0)
+        norm2 = np.empty(self.shape[1])
+        norm2[self.order] = out[:self.shape[1]]
+        return norm2
+
+
+def haar(x):
+    """
+    Orthonormal Haar wavelet transform along the last axis, of length a
+    power of 2
+    """
+    x = np.array(x, dtype=float)
+    n = x.shape[-1]
+    while n > 1:
+        s = (x[..., 0:n:2] + x[..., 1:n:2]) / np.sqrt(2.)
+        d = (x[..., 0:n:2] - x[..., 1:n:2]) / np.sqrt(2.)
+        x[..., :n//2] = s
+        x[..., n//2:n] = d
+        n //= 2
+    return x
+
+
+def ihaar(x):
+    """Inverse of :code:`haar`"""
+    x = np.array(x, dtype=float)
+    n = 2
+    while n <= x.shape[-1]:
+        s = x[..., :n//2].copy()
+        d = x[..., n//2:n].copy()
+        x[..., 0:n:2] = (s + d) / np.sqrt(2.)
+        x[..., 1:n:2] = (s - d) / np.sqrt(2.)
+        n *= 2
+    return x
+
+
+def mortonOrder(xyz, nBit=21):
+    """
+    Order of the points xyz along a Morton (Z-order) space-filling curve
+
+    :param numpy.ndarray xyz: (n, dim) locations
+    :param int nBit: bits per dimension
+    :rtype: numpy.ndarray
+    """
+    xyz = np.atleast_2d(xyz)
+    lo = xyz.min(axis=0)
+    span = xyz.max(axis=0) - lo
+    span[span == 0] = 1.
+    q = ((xyz - lo) / span * (2**nBit - 1)).astype(np.int64)
+
+    code = np.zeros(xyz.shape[0], dtype=np.int64)
+    for bit in range(nBit-1, -1, -1):
+        for dim in range(xyz.shape[1]):
+            code = (code << 1) | ((q[:, dim] >> bit) & 1)
+    return np.argsort(code, kind='mergesort')
+
+
+def progress(iter, prog, final):
+    """
+    progress(iter,prog,final)
+
+    Function measuring the progress of a process and print to screen the %.
+    Useful to estimate the remaining runtime of a large problem.
+
+    Created on Dec, 20th 2015
+
+    @author: dominiquef
+    """
+    arg = np.floor(float(iter)/float(final)*10.)
+
+    if arg > prog:
+
+        print("Done " + str(arg*10) + " %")
+        prog = arg
+
+    return prog
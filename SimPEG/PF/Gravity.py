@@ -1,15 +1,17 @@
 from __future__ import print_function
+from functools import partial
 from SimPEG import Problem
 from SimPEG import Utils
 from SimPEG import Props
+from SimPEG.Utils import io_utils
 import scipy.sparse as sp
 from . import BaseGrav as GRAV
+from .BasePF import BaseIntegral, progress
 import re
 import numpy as np
 
 
-
-class GravityIntegral(Problem.LinearProblem):
+class GravityIntegral(BaseIntegral):
 
     rho, rhoMap, rhoDeriv = Props.Invertible(
         "Specific density (g/cc)",
@@ -20,9 +22,10 @@ class GravityIntegral(Problem.LinearProblem):
     forwardOnly = False  # Is TRUE, forward matrix not stored to memory
     actInd = None  #: Active cell indices provided
     rtype = 'z'
+    nTemporaries = 16  #: receiver-by-cell arrays of get_T_mat_block
 
     def __init__(self, mesh, **kwargs):
-        Problem.BaseProblem.__init__(self, mesh, **kwargs)
+        BaseIntegral.__init__(self, mesh, **kwargs)
 
     def fwr_op(self):
         # Add forward function
@@ -31,81 +34,11 @@ class GravityIntegral(Problem.LinearProblem):
 
         if self.forwardOnly:
 
-            if getattr(self, 'actInd', None) is not None:
-
-                if self.actInd.dtype == 'bool':
-                    inds = np.asarray([inds for inds,
-                                      elem in enumerate(self.actInd, 1)
-                                      if elem], dtype=int) - 1
-                else:
-                    inds = self.actInd
-
-            else:
-
-                inds = np.asarray(range(self.mesh.nC))
-
-            nC = len(inds)
-
-            # Create active cell projector
-            P = sp.csr_matrix(
-                (np.ones(nC), (inds, range(nC))),
-                shape=(self.mesh.nC, nC)
-            )
-
-            # Create vectors of nodal location
-            # (lower and upper corners for each cell)
-            xn = self.mesh.vectorNx
-            yn = self.mesh.vectorNy
-            zn = self.mesh.vectorNz
-
-            yn2, xn2, zn2 = np.meshgrid(yn[1:], xn[1:], zn[1:])
-            yn1, xn1, zn1 = np.meshgrid(yn[0:-1], xn[0:-1], zn[0:-1])
-
-            Yn = P.T*np.c_[Utils.mkvc(yn1), Utils.mkvc(yn2)]
-            Xn = P.T*np.c_[Utils.mkvc(xn1), Utils.mkvc(xn2)]
-            Zn = P.T*np.c_[Utils.mkvc(zn1), Utils.mkvc(zn2)]
-
-            rxLoc = self.survey.srcField.rxList[0].locs
-            ndata = rxLoc.shape[0]
-
-            # Pre-allocate space and create magnetization matrix if required
-            # Pre-allocate space
-            if self.rtype == 'z':
-
-                fwr_d = np.zeros(self.survey.nRx)
-
-            elif self.rtype == 'xyz':
-
-                fwr_d = np.zeros(3*self.survey.nRx)
-
-            else:
-
-                print("""Flag must be either 'z' | 'xyz', please revised""")
-                return
-
-            # Add counter to dsiplay progress. Good for large problems
-            count = -1
-            for ii in range(ndata):
-
-                tx, ty, tz = get_T_mat(Xn, Yn, Zn, rxLoc[ii, :])
-
-                if self.rtype == 'z':
-                    fwr_d[ii] = tz.dot(rho)
-
-                elif self.rtype == 'xyz':
-                    fwr_d[ii] = tx.dot(rho)
-                    fwr_d[ii+ndata] = ty.dot(rho)
-                    fwr_d[ii+2*ndata] = tz.dot(rho)
-
-            # Display progress
-                count = progress(ii, count, ndata)
-
-            print("Done 100% ...forward operator completed!!\n")
-
-            return fwr_d
+            # Compute the linear operation without forming the full dense G
+            return self.Intrgl_Fwr_Op(self.rtype, m=rho)
 
         else:
-            return self.G.dot(rho)
+            return self.Gvec(rho)
 
     def fields(self, m):
         self.model = m
@@ -116,11 +49,11 @@ class GravityIntegral(Problem.LinearProblem):
 
     def Jvec(self, m, v, f=None):
         dmudm = self.rhoMap.deriv(m)
-        return self.G.dot(dmudm*v)
+        return self.Gvec(dmudm*v)
 
     def Jtvec(self, m, v, f=None):
         dmudm = self.rhoMap.deriv(m)
-        return dmudm.T * (self.G.T.dot(v))
+        return dmudm.T * self.Gtvec(v)
 
     @property
     def G(self):
@@ -132,7 +65,7 @@ class GravityIntegral(Problem.LinearProblem):
 
         return self._G
 
-    def Intrgl_Fwr_Op(self, flag):
+    def Intrgl_Fwr_Op(self, flag, m=None):
 
         """
 
@@ -143,89 +76,147 @@ class GravityIntegral(Problem.LinearProblem):
         Return
         _G        = Linear forward modeling operation
 
+        If a model m is given, the data G*m are returned instead and G is
+        never formed. m may hold several models as columns (nC-by-nModel),
+        which then share the kernel evaluations.
+
         Created on March, 15th 2016
 
         @author: dominiquef
 
          """
-        # Find non-zero cells
-        # inds = np.nonzero(actv)[0]
-        if getattr(self, 'actInd', None) is not None:
+        # Active cells and their lower and upper corners, shared by the
+        # problems on this mesh
+        geometry = self.geometry
+        inds, nC = geometry.inds, geometry.nC
+        Xn, Yn, Zn = geometry.Xn, geometry.Yn, geometry.Zn
 
-            if self.actInd.dtype == 'bool':
-                inds = np.asarray([inds for inds,
-                                  elem in enumerate(self.actInd, 1)
-                                  if elem], dtype=int) - 1
-            else:
-                inds = self.actInd
+        rxLoc = self.survey.srcField.rxList[0].locs
+        ndata = rxLoc.shape[0]
 
-        else:
+        if flag not in ['z', 'xyz']:
+            print("""Flag must be either 'z' | 'xyz', please revised""")
+            return
 
-            inds = np.asarray(range(self.mesh.nC))
+        # only compute the components that are needed
+        rowFun = partial(
+            calcRows, Xn=Xn, Yn=Yn, Zn=Zn, rxLoc=rxLoc, components=flag,
+            m=m
+        )
 
-        nC = len(inds)
+        # Pre-allocate space
+        if self.convolution:
+            G = self._toeplitzG(partial(calcRows, components=flag),
+                                rxLoc, len(flag))
+            if G is not None:
+                return G if m is None else G.dot(m)
+
+        if m is None and self.cutoffRadius is not None:
+            return self._cutoffG(
+                partial(calcRows, rxLoc=rxLoc, components=flag),
+                Xn, Yn, Zn, rxLoc, len(flag)
+            )
 
-        # Create active cell projector
-        P = sp.csr_matrix(
-            (np.ones(nC), (inds, range(nC))),
-            shape=(self.mesh.nC, nC)
-        )
+        if m is None:
+            key = self._GKey(inds, rxLoc, flag)
+            G = self._loadG(key)
+            if G is not None:
+                return G
 
-        # Create vectors of nodal location
-        # (lower and upper corners for each cell)
-        xn = self.mesh.vectorNx
-        yn = self.mesh.vectorNy
-        zn = self.mesh.vectorNz
+            G = self._allocateG(
+                (len(flag)*ndata, nC),
+                xyz=np.c_[Xn.mean(1), Yn.mean(1), Zn.mean(1)]
+            )
 
-        yn2, xn2, zn2 = np.meshgrid(yn[1:], xn[1:], zn[1:])
-        yn1, xn1, zn1 = np.meshgrid(yn[0:-1], xn[0:-1], zn[0:-1])
+            # Loop through all observations
+            if self.progressCallback is None:
+                print("Begin calculation of forward operator: " + flag)
 
-        Yn = P.T*np.c_[Utils.mkvc(yn1), Utils.mkvc(yn2)]
-        Xn = P.T*np.c_[Utils.mkvc(xn1), Utils.mkvc(xn2)]
-        Zn = P.T*np.c_[Utils.mkvc(zn1), Utils.mkvc(zn2)]
+        else:
+            G = np.zeros((len(flag)*ndata,) + np.shape(m)[1:])
 
-        rxLoc = self.survey.srcField.rxList[0].locs
-        ndata = rxLoc.shape[0]
+        def store(ind, rows):
+            for ii in range(len(flag)):
+                G[ind + ii*ndata] = rows[ii]
 
-        # Pre-allocate space and create magnetization matrix if required
-        # Pre-allocate space
-        if flag == 'z':
+        self._evalBlocks(rowFun, ndata, store, nC)
 
-            G = np.zeros((ndata, nC))
+        if m is None:
+            G = self._saveG(G, key)
 
-        elif flag == 'xyz':
+        return G
 
-            G = np.zeros((int(3*ndata), nC))
 
-        else:
+def calcRows(ind, Xn, Yn, Zn, rxLoc, components='xyz', m=None):
+    """
+    Rows of the gravity sensitivity for the receivers rxLoc[ind, :]
+
+    :param numpy.ndarray ind: receiver indices
+    :param str components: 'z' | 'xyz'
+    :param numpy.ndarray m: if given, the data G*m are returned instead
+        (nC or nC-by-nModel)
+    :rtype: list
+    :return: [(len(ind), nC) array] for each of the components
+    """
+    rows = get_T_mat_block(Xn, Yn, Zn, rxLoc[ind, :], components)
+    if m is not None:
+        rows = [row.dot(m) for row in rows]
+    return rows
 
-            print("""Flag must be either 'z' | 'xyz', please revised""")
-            return
 
-        # Loop through all observations
-        print("Begin calculation of forward operator: " + flag)
+def get_T_mat_block(Xn, Yn, Zn, rxLoc, components='xyz'):
+    """
+    Gravity kernels of a block of observation locations rxLoc (nRx-by-3).
+    Same as :code:`get_T_mat`, but evaluated for all of the receivers of the
+    block at once and only for the requested components.
+
+    :param numpy.ndarray Xn: lower and upper corners of the cells (nC-by-2)
+    :param numpy.ndarray Yn: lower and upper corners of the cells (nC-by-2)
+    :param numpy.ndarray Zn: lower and upper corners of the cells (nC-by-2)
+    :param numpy.ndarray rxLoc: observation locations (nRx-by-3)
+    :param str components: any of 'x', 'y', 'z', e.g. 'z' or 'xyz'
+    :rtype: list
+    :return: [t (nRx-by-nC)] in the order of the components
+    """
+    from scipy.constants import G as NewtG
 
-        # Add counter to dsiplay progress. Good for large problems
-        count = -1
-        for ii in range(ndata):
+    NewtG = NewtG*1e+8  # Convertion from mGal (1e-5) and g/cc (1e-3)
+    eps = 1e-10  # add a small value to the locations to avoid
 
-            tx, ty, tz = get_T_mat(Xn, Yn, Zn, rxLoc[ii, :])
+    rxLoc = np.atleast_2d(rxLoc)
+    nC = Xn.shape[0]
 
-            if flag == 'z':
+    dz = rxLoc[:, 2, None, None] - Zn[None, :, :] + eps
+    dy = Yn[None, :, :] - rxLoc[:, 1, None, None] + eps
+    dx = Xn[None, :, :] - rxLoc[:, 0, None, None] + eps
 
-                G[ii, :] = tz
+    t = dict([(comp, np.zeros((rxLoc.shape[0], nC))) for comp in components])
 
-            elif flag == 'xyz':
-                G[ii, :] = tx
-                G[ii+ndata, :] = ty
-                G[ii+2*ndata, :] = tz
+    # Compute contribution from each corners
+    for aa in range(2):
+        for bb in range(2):
+            for cc in range(2):
 
-            # Display progress
-            count = progress(ii, count, ndata)
+                dxa, dyb, dzc = dx[:, :, aa], dy[:, :, bb], dz[:, :, cc]
+                r = (dxa ** 2 + dyb ** 2 + dzc ** 2) ** (0.50)
+                sign = NewtG * (-1) ** aa * (-1) ** bb * (-1) ** cc
 
-        print("Done 100% ...forward operator completed!!\n")
+                if 'x' in t:
+                    t['x'] -= sign * (
+                        dyb * np.log(dzc + r) + dzc * np.log(dyb + r) -
+                        dxa * np.arctan(dyb * dzc / (dxa * r)))
 
-        return G
+                if 'y' in t:
+                    t['y'] -= sign * (
+                        dxa * np.log(dzc + r) + dzc * np.log(dxa + r) -
+                        dyb * np.arctan(dxa * dzc / (dyb * r)))
+
+                if 'z' in t:
+                    t['z'] -= sign * (
+                        dxa * np.log(dyb + r) + dyb * np.log(dxa + r) -
+                        dzc * np.arctan(dxa * dyb / (dzc * r)))
+
+    return [t[comp] for comp in components]
 
 
 def get_T_mat(Xn, Yn, Zn, rxLoc):
@@ -298,29 +289,7 @@ def get_T_mat(Xn, Yn, Zn, rxLoc):
     return tx, ty, tz
 
 
-def progress(iter, prog, final):
-    """
-    progress(iter,prog,final)
-
-    Function measuring the progress of a process and print to screen the %.
-    Useful to estimate the remaining runtime of a large problem.
-
-    Created on Dec, 20th 2015
-
-    @author: dominiquef
-    """
-    arg = np.floor(float(iter)/float(final)*10.)
-
-    if arg > prog:
-
-        strg = "Done " + str(arg*10) + " %"
-        print(strg)
-        prog = arg
-
-    return prog
-
-
-def writeUBCobs(filename, survey, d):
+def writeUBCobs(filename, survey, d, cache=False):
     """
     writeUBCobs(filename,survey,d)
 
@@ -330,6 +299,7 @@ def writeUBCobs(filename, survey, d):
     filename    : Name of out file including directory
     survey
     flag          : dobs | dpred
+    cache         : also write the binary copy read by readUBCgravObs
 
     OUTPUT
     Obsfile
@@ -342,8 +312,8 @@ def writeUBCobs(filename, survey, d):
 
     data = np.c_[rxLoc, d, wd]
 
-    head = '%i\n'%len(d)
-    np.savetxt(filename, data, fmt='%e', delimiter=' ', newline='\n', header=head,comments='')
+    head = ['%i\n' % len(d)]
+    io_utils.writeUBCtable(filename, head, data, cache=cache)
 
     print("Observation file saved to: " + filename)
 
@@ -417,46 +387,30 @@ def plot_obs_2D(rxLoc, d=None, varstr='Gz Obs', vmin=None, vmax=None,
     return fig
 
 
-def readUBCgravObs(obs_file):
+def readUBCgravObs(obs_file, cache=False):
 
     """
     Read UBC grav file format
 
     INPUT:
     :param fileName, path to the UBC obs grav file
+    :param cache, keep a binary copy of the file (obs_file.npz) to read
+        from while the file is unchanged
 
     OUTPUT:
     :param survey
 
     """
 
-    fid = open(obs_file, 'r')
-
-    # First line has the number of rows
-    line = fid.readline()
-    ndat = np.array(line.split(), dtype=int)
-
-    # Pre-allocate space for obsx, obsy, obsz, data, uncert
-    line = fid.readline()
-    temp = np.array(line.split(), dtype=float)
-
-    d = np.zeros(ndat, dtype=float)
-    wd = np.zeros(ndat, dtype=float)
-    locXYZ = np.zeros((ndat, 3), dtype=float)
-
-    for ii in range(ndat):
-
-        temp = np.array(line.split(), dtype=float)
-        locXYZ[ii, :] = temp[:3]
-        d[ii] = temp[3]
-        wd[ii] = temp[4]
-        line = fid.readline()
+    # First line has the number of rows, then obsx, obsy, obsz, data, uncert
+    _, data = io_utils.readUBCtable(obs_file, nHeader=1, countInHeader=True,
+                                    cache=cache)
 
-    rxLoc = GRAV.RxObs(locXYZ)
+    rxLoc = GRAV.RxObs(data[:, :3])
     srcField = GRAV.SrcField([rxLoc])
     survey = GRAV.LinearSurvey(srcField)
-    survey.dobs = d
-    survey.std = wd
+    survey.dobs = data[:, 3]
+    survey.std = data[:, 4]
     return survey
 
 
@@ -2,12 +2,16 @@ import re
 import os
 from SimPEG import Mesh, Utils
 import numpy as np
-from . import BaseGrav, Gravity
+from . import Gravity
 
 
 class GravityDriver_Inv(object):
     """docstring for GravityDriver_Inv"""
 
+    #: Keep binary copies (.npz) of the parsed observation and model files
+    #: next to them, read instead of the text while the files are unchanged
+    cacheFiles = False
+
     def __init__(self, input_file=None):
         if input_file is not None:
             self.basePath = os.path.sep.join(input_file.split(os.path.sep)[:-1])
@@ -187,8 +191,7 @@ class GravityDriver_Inv(object):
                 # Read from file active cells with 0:air, 1:dynamic, -1 static
                 active = self.activeModel != 0
 
-            inds = np.asarray([inds for inds, elem in enumerate(active, 1)
-                              if elem], dtype=int) - 1
+            inds = np.where(active)[0]
             self._activeCells = inds
 
             # Reduce m0 to active space
@@ -204,8 +207,7 @@ class GravityDriver_Inv(object):
             # Cells with value 1 in active model are dynamic
             staticCells = self.activeModel[self._activeCells] == -1
 
-            inds = np.asarray([inds for inds, elem in enumerate(staticCells, 1)
-                              if elem], dtype=int) - 1
+            inds = np.where(staticCells)[0]
             self._staticCells = inds
 
         return self._staticCells
@@ -217,7 +219,7 @@ class GravityDriver_Inv(object):
             # Cells with value 1 in active model are dynamic
             dynamicCells = self.activeModel[self._activeCells] == 1
 
-            inds = np.asarray([inds for inds, elem in enumerate(dynamicCells, 1) if elem], dtype=int) - 1
+            inds = np.where(dynamicCells)[0]
             self._dynamicCells = inds
 
         return self._dynamicCells
@@ -272,32 +274,4 @@ class GravityDriver_Inv(object):
         :param survey
 
         """
-
-        fid = open(obs_file, 'r')
-
-        # First line has the number of rows
-        line = fid.readline()
-        ndat = int(line.strip())
-
-        # Pre-allocate space for obsx, obsy, obsz, data, uncert
-        line = fid.readline()
-        temp = np.array(line.split(), dtype=float)
-
-        d = np.zeros(ndat, dtype=float)
-        wd = np.zeros(ndat, dtype=float)
-        locXYZ = np.zeros((ndat, 3), dtype=float)
-
-        for ii in range(ndat):
-
-            temp = np.array(line.split(), dtype=float)
-            locXYZ[ii, :] = temp[:3]
-            d[ii] = temp[3]
-            wd[ii] = temp[4]
-            line = fid.readline()
-
-        rxLoc = BaseGrav.RxObs(locXYZ)
-        srcField = BaseGrav.SrcField([rxLoc])
-        survey = BaseGrav.LinearSurvey(srcField)
-        survey.dobs = d
-        survey.std = wd
-        return survey
+        return Gravity.readUBCgravObs(obs_file, cache=self.cacheFiles)
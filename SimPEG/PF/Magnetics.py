@@ -1,5 +1,6 @@
 from __future__ import print_function
 
+from functools import partial
 import numpy as np
 import scipy.sparse as sp
 from scipy.constants import mu_0
@@ -8,12 +9,14 @@ from SimPEG import Utils
 from SimPEG import Problem
 from SimPEG import Solver
 from SimPEG import Props
+from SimPEG.Utils import io_utils
 
 from . import BaseMag as MAG
+from .BasePF import BaseIntegral, activeGeometry, calcDistWgt, progress
 from .MagAnalytics import spheremodel, CongruousMagBC
 
 
-class MagneticIntegral(Problem.LinearProblem):
+class MagneticIntegral(BaseIntegral):
 
     chi, chiMap, chiDeriv = Props.Invertible(
         "Magnetic Susceptibility (SI)",
@@ -26,7 +29,7 @@ class MagneticIntegral(Problem.LinearProblem):
     rtype = 'tmi'  #: Receiver type either "tmi" | "xyz"
 
     def __init__(self, mesh, **kwargs):
-        Problem.BaseProblem.__init__(self, mesh, **kwargs)
+        BaseIntegral.__init__(self, mesh, **kwargs)
 
     def fwr_ind(self, m):
 
@@ -39,11 +42,11 @@ class MagneticIntegral(Problem.LinearProblem):
 
         else:
 
-            return self.G.dot(m)
+            return self.Gvec(m)
 
     def fwr_rem(self):
         # TODO check if we are inverting for M
-        return self.G.dot(self.chiMap(m))
+        return self.Gvec(self.chiMap(m))
 
     def fields(self, m, **kwargs):
         self.model = m
@@ -94,39 +97,17 @@ class MagneticIntegral(Problem.LinearProblem):
         Return
         _G = Linear forward modeling operation
 
-         """
-
-        # Find non-zero cells
-        if getattr(self, 'actInd', None) is not None:
-            if self.actInd.dtype == 'bool':
-                inds = np.asarray([inds for inds,
-                                  elem in enumerate(self.actInd, 1) if elem],
-                                  dtype=int) - 1
-            else:
-                inds = self.actInd
-
-        else:
-
-            inds = np.asarray(range(self.mesh.nC))
-
-        nC = len(inds)
-
-        # Create active cell projector
-        P = sp.csr_matrix((np.ones(nC), (inds, range(nC))),
-                          shape=(self.mesh.nC, nC))
-
-        # Create vectors of nodal location
-        # (lower and upper coners for each cell)
-        xn = self.mesh.vectorNx
-        yn = self.mesh.vectorNy
-        zn = self.mesh.vectorNz
+        With forwardOnly, the data G*m are returned instead and G is never
+        formed. m may hold several models as columns (nC-by-nModel), which
+        then share the kernel evaluations.
 
-        yn2, xn2, zn2 = np.meshgrid(yn[1:], xn[1:], zn[1:])
-        yn1, xn1, zn1 = np.meshgrid(yn[0:-1], xn[0:-1], zn[0:-1])
+         """
 
-        Yn = P.T*np.c_[Utils.mkvc(yn1), Utils.mkvc(yn2)]
-        Xn = P.T*np.c_[Utils.mkvc(xn1), Utils.mkvc(xn2)]
-        Zn = P.T*np.c_[Utils.mkvc(zn1), Utils.mkvc(zn2)]
+        # Active cells and their lower and upper corners, shared by the
+        # problems on this mesh
+        geometry = self.geometry
+        inds, nC = geometry.inds, geometry.nC
+        Xn, Yn, Zn = geometry.Xn, geometry.Yn, geometry.Zn
 
         survey = self.survey
         rxLoc = survey.srcField.rxList[0].locs
@@ -143,102 +124,84 @@ class MagneticIntegral(Problem.LinearProblem):
         if getattr(self, 'M', None) is None:
             M = dipazm_2_xyz(np.ones(nC) * survey.srcField.param[1],
                              np.ones(nC) * survey.srcField.param[2])
+        else:
+            M = self.M
 
-        Mx = Utils.sdiag(M[:, 0]*survey.srcField.param[0])
-        My = Utils.sdiag(M[:, 1]*survey.srcField.param[0])
-        Mz = Utils.sdiag(M[:, 2]*survey.srcField.param[0])
-
-        Mxyz = sp.vstack((Mx, My, Mz))
-
-        if survey.srcField.rxList[0].rxType == 'tmi':
-
+        # Convert Bdecination from north to cartesian
+        D = (450.-float(survey.srcField.param[2])) % 360.
+        I = survey.srcField.param[1]
+        # Projection matrix
+        Ptmi = np.r_[np.cos(np.deg2rad(I))*np.cos(np.deg2rad(D)),
+                     np.cos(np.deg2rad(I))*np.sin(np.deg2rad(D)),
+                     np.sin(np.deg2rad(I))]
 
-            # Convert Bdecination from north to cartesian
-            D = (450.-float(survey.srcField.param[2])) % 360.
-            I = survey.srcField.param[1]
-            # Projection matrix
-            Ptmi = Utils.mkvc(np.r_[np.cos(np.deg2rad(I))*np.cos(np.deg2rad(D)),
-                              np.cos(np.deg2rad(I))*np.sin(np.deg2rad(D)),
-                              np.sin(np.deg2rad(I))], 2).T
+        if Magnetization not in ['ind', 'xyz']:
+            print("""Flag must be either 'ind' | 'xyz', please revised""")
+            return
 
         if self.forwardOnly:
 
-            if self.rtype == 'tmi':
-
-                fwr_out = np.zeros(self.survey.nRx)
-
-            else:
-
-                fwr_out = np.zeros(3*self.survey.nRx)
+            rxType = self.rtype
 
         else:
 
-            if (Magnetization == 'ind'):
-
-                if survey.srcField.rxList[0].rxType == 'tmi':
-                    fwr_out = np.zeros((ndata, nC))
-
-                elif survey.srcField.rxList[0].rxType == 'xyz':
-
-                    fwr_out = np.zeros((int(3*ndata), nC))
-
-            elif Magnetization == 'xyz':
-                if survey.srcField.rxList[0].rxType == 'tmi':
-                    fwr_out = np.zeros((int(ndata), int(3*nC)))
-
-                elif survey.srcField.rxList[0].rxType == 'xyz':
-                    fwr_out = np.zeros((int(3*ndata), int(3*nC)))
-
-            else:
-                print("""Flag must be either 'ind' | 'xyz', please revised""")
-                return
+            rxType = survey.srcField.rxList[0].rxType
 
             # Loop through all observations and create forward operator (nD-by-nC)
-            print("Begin calculation of forward operator: " + Magnetization)
-
-        # Add counter to dsiplay progress. Good for large problems
-        count = -1
-        for ii in range(ndata):
-
-            tx, ty, tz = get_T_mat(Xn, Yn, Zn, rxLoc[ii, :])
-
-            if self.forwardOnly:
-
-                if self.rtype == 'tmi':
-                    fwr_out[ii] = (Ptmi.dot(np.vstack((tx, ty, tz)))*Mxyz).dot(m)
+            if self.progressCallback is None:
+                print("Begin calculation of forward operator: " + Magnetization)
+
+        nRow = 1 if rxType == 'tmi' else 3
+        nCol = nC if Magnetization == 'ind' else 3*nC
+
+        rowFun = partial(
+            calcRows, Xn=Xn, Yn=Yn, Zn=Zn, rxLoc=rxLoc, rxType=rxType,
+            Magnetization=Magnetization, M=M, B0=survey.srcField.param[0],
+            Ptmi=Ptmi, m=m if self.forwardOnly else None
+        )
+
+        if self.convolution:
+            G = self._toeplitzG(
+                partial(calcRows, rxType=rxType, Magnetization=Magnetization,
+                        B0=survey.srcField.param[0], Ptmi=Ptmi),
+                rxLoc, nRow, nComp=nCol//nC,
+                M=M if Magnetization == 'ind' else None
+            )
+            if G is not None:
+                return G.dot(m) if self.forwardOnly else G
+
+        if not self.forwardOnly and self.cutoffRadius is not None:
+            return self._cutoffG(
+                partial(calcRows, rxLoc=rxLoc, rxType=rxType,
+                        Magnetization=Magnetization,
+                        B0=survey.srcField.param[0], Ptmi=Ptmi),
+                Xn, Yn, Zn, rxLoc, nRow, nComp=nCol//nC, M=M
+            )
 
-                elif self.rtype == 'xyz':
-                    fwr_out[ii] = (tx*Mxyz).dot(m)
-                    fwr_out[ii+ndata] = (ty*Mxyz).dot(m)
-                    fwr_out[ii+2*ndata] = (tz*Mxyz).dot(m)
-
-            else:
-
-                if Magnetization == 'ind':
-
-                    if survey.srcField.rxList[0].rxType == 'tmi':
-                        fwr_out[ii, :] = Ptmi.dot(np.vstack((tx, ty, tz)))*Mxyz
-
-                    elif survey.srcField.rxList[0].rxType == 'xyz':
-                        fwr_out[ii, :] = tx*Mxyz
-                        fwr_out[ii+ndata, :] = ty*Mxyz
-                        fwr_out[ii+2*ndata, :] = tz*Mxyz
-
-                elif Magnetization == 'xyz':
+        if self.forwardOnly:
+            fwr_out = np.zeros((nRow*ndata,) + np.shape(m)[1:])
+        else:
+            key = self._GKey(
+                inds, rxLoc, rxType, Magnetization, M,
+                np.r_[survey.srcField.param]
+            )
+            fwr_out = self._loadG(key)
+            if fwr_out is not None:
+                return fwr_out
 
-                    if survey.srcField.rxList[0].rxType == 'tmi':
-                        fwr_out[ii, :] = Ptmi.dot(np.vstack((tx, ty, tz)) *
-                                                  survey.srcField.param[0])
+            fwr_out = self._allocateG(
+                (nRow*ndata, nCol),
+                xyz=np.c_[Xn.mean(1), Yn.mean(1), Zn.mean(1)]
+            )
 
-                    elif survey.srcField.rxList[0].rxType == 'xyz':
-                        fwr_out[ii, :] = tx * survey.srcField.param[0]
-                        fwr_out[ii+ndata, :] = ty * survey.srcField.param[0]
-                        fwr_out[ii+2*ndata, :] = tz * survey.srcField.param[0]
+        def store(ind, rows):
+            for ii in range(nRow):
+                fwr_out[ind + ii*ndata] = rows[ii]
 
-            # Display progress
-            count = progress(ii, count, ndata)
+        self._evalBlocks(rowFun, ndata, store, nC)
 
-        print("Done 100% ...forward operator completed!!\n")
+        if not self.forwardOnly:
+            fwr_out = self._saveG(fwr_out, key)
 
         return fwr_out
 
@@ -258,7 +221,7 @@ class MagneticVector(MagneticIntegral):
         if self.forwardOnly:
 
             # Compute the linear operation without forming the full dense G
-            fwr_d = Intrgl_Fwr_Op(m=m, Magnetization='xyz')
+            fwr_d = self.Intrgl_Fwr_Op(m=m, Magnetization='xyz')
 
             return fwr_d
 
@@ -266,7 +229,7 @@ class MagneticVector(MagneticIntegral):
 
             # m = np.hstack([m, mii])
 
-            return self.G.dot(m)
+            return self.Gvec(m)
 
     @property
     def G(self):
@@ -293,18 +256,18 @@ class MagneticAmplitude(MagneticIntegral):
 
         self.survey.srcField.rxList[0].rxType = 'xyz'
 
+        if m is None:
+            m = self.chiMap*self.model
+
         if self.forwardOnly:
 
             # Compute the linear operation without forming the full dense G
-            Bxyz = Intrgl_Fwr_Op(m=m)
+            Bxyz = self.Intrgl_Fwr_Op(m=m)
 
             return self.calcAmpData(Bxyz)
 
         else:
-            if m is None:
-                m = self.chiMap*self.model
-
-            Bxyz = self.G.dot(m)
+            Bxyz = self.Gvec(m)
 
             return self.calcAmpData(Bxyz)
 
@@ -328,11 +291,11 @@ class MagneticAmplitude(MagneticIntegral):
 
     def Jvec(self, m, v, f=None):
         dmudm = self.chiMap.deriv(m)
-        return self.dfdm*(self.G.dot(dmudm*v))
+        return self.dfdm*(self.Gvec(dmudm*v))
 
     def Jtvec(self, m, v, f=None):
         dmudm = self.chiMap.deriv(m)
-        return dmudm.T * (self.G.T.dot(self.dfdm.T*v))
+        return dmudm.T * self.Gtvec(self.dfdm.T*v)
 
     @property
     def G(self):
@@ -354,7 +317,7 @@ class MagneticAmplitude(MagneticIntegral):
             # Get field data
             m = self.chiMap*self.model
 
-            Bxyz = self.G.dot(m)
+            Bxyz = self.Gvec(m)
 
             Bamp = self.calcAmpData(Bxyz)
 
@@ -734,6 +697,136 @@ def MagneticsDiffSecondaryInv(mesh, model, data, **kwargs):
     return inv, reg
 
 
+def calcRows(ind, Xn, Yn, Zn, rxLoc, rxType='tmi', Magnetization='ind',
+             M=None, B0=1., Ptmi=None, m=None):
+    """
+    Rows of the magnetic sensitivity for the receivers rxLoc[ind, :]
+
+    :param numpy.ndarray ind: receiver indices
+    :param str rxType: 'tmi' | 'xyz'
+    :param str Magnetization: 'ind' (magnetization direction M (nC-by-3)
+        fixed) | 'xyz' (three magnetization components per cell)
+    :param float B0: inducing field strength
+    :param numpy.ndarray Ptmi: unit vector of the inducing field (3,)
+    :param numpy.ndarray m: if given, the data G*m are returned instead
+        (nCol or nCol-by-nModel)
+    :rtype: list
+    :return: [(len(ind), nC or 3*nC) array] for each of the components
+    """
+    T = get_T_mat_block(Xn, Yn, Zn, rxLoc[ind, :])
+
+    if Magnetization == 'ind':
+        rows = [
+            (Ti[0] * M[:, 0] + Ti[1] * M[:, 1] + Ti[2] * M[:, 2]) * B0
+            for Ti in T
+        ]
+    else:
+        rows = [np.hstack(Ti) * B0 for Ti in T]
+
+    if rxType == 'tmi':
+        rows = [Ptmi[0] * rows[0] + Ptmi[1] * rows[1] + Ptmi[2] * rows[2]]
+
+    if m is not None:
+        rows = [row.dot(m) for row in rows]
+    return rows
+
+
+def get_T_mat_block(Xn, Yn, Zn, rxLoc):
+    """
+    Magnetic tensor of a block of observation locations rxLoc (nRx-by-3).
+    Same as :code:`get_T_mat`, but evaluated for all of the receivers of the
+    block at once.
+
+    :param numpy.ndarray Xn: lower and upper corners of the cells (nC-by-2)
+    :param numpy.ndarray Yn: lower and upper corners of the cells (nC-by-2)
+    :param numpy.ndarray Zn: lower and upper corners of the cells (nC-by-2)
+    :param numpy.ndarray rxLoc: observation locations (nRx-by-3)
+    :rtype: list
+    :return: T[i][j] (nRx-by-nC), the j-th component of the field of a
+        cell magnetized along i (T is symmetric)
+    """
+
+    eps = 1e-10  # add a small value to the locations to avoid /0
+
+    rxLoc = np.atleast_2d(rxLoc)
+
+    dz2 = rxLoc[:, 2, None] - Zn[None, :, 0] + eps
+    dz1 = rxLoc[:, 2, None] - Zn[None, :, 1] + eps
+
+    dy2 = Yn[None, :, 1] - rxLoc[:, 1, None] + eps
+    dy1 = Yn[None, :, 0] - rxLoc[:, 1, None] + eps
+
+    dx2 = Xn[None, :, 1] - rxLoc[:, 0, None] + eps
+    dx1 = Xn[None, :, 0] - rxLoc[:, 0, None] + eps
+
+    R1 = (dy2**2 + dx2**2)
+    R2 = (dy2**2 + dx1**2)
+    R3 = (dy1**2 + dx2**2)
+    R4 = (dy1**2 + dx1**2)
+
+    arg1 = np.sqrt(dz2**2 + R2)
+    arg2 = np.sqrt(dz2**2 + R1)
+    arg3 = np.sqrt(dz1**2 + R1)
+    arg4 = np.sqrt(dz1**2 + R2)
+    arg5 = np.sqrt(dz2**2 + R3)
+    arg6 = np.sqrt(dz2**2 + R4)
+    arg7 = np.sqrt(dz1**2 + R4)
+    arg8 = np.sqrt(dz1**2 + R3)
+
+    Txx = np.arctan2(dy1 * dz2, (dx2 * arg5)) +\
+        - np.arctan2(dy2 * dz2, (dx2 * arg2)) +\
+        np.arctan2(dy2 * dz1, (dx2 * arg3)) +\
+        - np.arctan2(dy1 * dz1, (dx2 * arg8)) +\
+        np.arctan2(dy2 * dz2, (dx1 * arg1)) +\
+        - np.arctan2(dy1 * dz2, (dx1 * arg6)) +\
+        np.arctan2(dy1 * dz1, (dx1 * arg7)) +\
+        - np.arctan2(dy2 * dz1, (dx1 * arg4))
+
+    Txy = np.log((dz2 + arg2) / (dz1 + arg3)) +\
+        -np.log((dz2 + arg1) / (dz1 + arg4)) +\
+        np.log((dz2 + arg6) / (dz1 + arg7)) +\
+        -np.log((dz2 + arg5) / (dz1 + arg8))
+
+    Tyy = np.arctan2(dx1 * dz2, (dy2 * arg1)) +\
+        - np.arctan2(dx2 * dz2, (dy2 * arg2)) +\
+        np.arctan2(dx2 * dz1, (dy2 * arg3)) +\
+        - np.arctan2(dx1 * dz1, (dy2 * arg4)) +\
+        np.arctan2(dx2 * dz2, (dy1 * arg5)) +\
+        - np.arctan2(dx1 * dz2, (dy1 * arg6)) +\
+        np.arctan2(dx1 * dz1, (dy1 * arg7)) +\
+        - np.arctan2(dx2 * dz1, (dy1 * arg8))
+
+    R1 = (dy2**2 + dz1**2)
+    R2 = (dy2**2 + dz2**2)
+    R3 = (dy1**2 + dz1**2)
+    R4 = (dy1**2 + dz2**2)
+
+    Tyz = np.log((dx1 + np.sqrt(dx1**2 + R1)) /
+                 (dx2 + np.sqrt(dx2**2 + R1))) +\
+        -np.log((dx1 + np.sqrt(dx1**2 + R2)) / (dx2 + np.sqrt(dx2**2 + R2))) +\
+        np.log((dx1 + np.sqrt(dx1**2 + R4)) / (dx2 + np.sqrt(dx2**2 + R4))) +\
+        -np.log((dx1 + np.sqrt(dx1**2 + R3)) / (dx2 + np.sqrt(dx2**2 + R3)))
+
+    R1 = (dx2**2 + dz1**2)
+    R2 = (dx2**2 + dz2**2)
+    R3 = (dx1**2 + dz1**2)
+    R4 = (dx1**2 + dz2**2)
+
+    Txz = np.log((dy1 + np.sqrt(dy1**2 + R1)) /
+                 (dy2 + np.sqrt(dy2**2 + R1))) +\
+        -np.log((dy1 + np.sqrt(dy1**2 + R2)) / (dy2 + np.sqrt(dy2**2 + R2))) +\
+        np.log((dy1 + np.sqrt(dy1**2 + R4)) / (dy2 + np.sqrt(dy2**2 + R4))) +\
+        -np.log((dy1 + np.sqrt(dy1**2 + R3)) / (dy2 + np.sqrt(dy2**2 + R3)))
+
+    Tzz = -(Tyy + Txx)
+
+    Txx, Txy, Txz, Tyy, Tyz, Tzz = [
+        T/(4*np.pi) for T in [Txx, Txy, Txz, Tyy, Tyz, Tzz]
+    ]
+
+    return [[Txx, Txy, Txz], [Txy, Tyy, Tyz], [Txz, Tyz, Tzz]]
+
+
 def get_T_mat(Xn, Yn, Zn, rxLoc):
     """
     Load in the active nodes of a tensor mesh and computes the magnetic tensor
@@ -848,27 +941,6 @@ def get_T_mat(Xn, Yn, Zn, rxLoc):
     return Tx, Ty, Tz
 
 
-def progress(iter, prog, final):
-    """
-    progress(iter,prog,final)
-
-    Function measuring the progress of a process and print to screen the %.
-    Useful to estimate the remaining runtime of a large problem.
-
-    Created on Dec, 20th 2015
-
-    @author: dominiquef
-    """
-    arg = np.floor(float(iter)/float(final)*10.)
-
-    if arg > prog:
-
-        print("Done " + str(arg*10) + " %")
-        prog = arg
-
-    return prog
-
-
 def dipazm_2_xyz(dip, azm_N):
     """
     dipazm_2_xyz(dip,azm_N)
@@ -904,7 +976,7 @@ def dipazm_2_xyz(dip, azm_N):
     return M
 
 
-def get_dist_wgt(mesh, rxLoc, actv, R, R0):
+def get_dist_wgt(mesh, rxLoc, actv, R, R0, chunkSize=None, nWorkers=1):
     """
     get_dist_wgt(xn,yn,zn,rxLoc,R,R0)
 
@@ -917,89 +989,28 @@ def get_dist_wgt(mesh, rxLoc, actv, R, R0):
     actv        : Active cell vector [0:air , 1: ground]
     R           : Decay factor (mag=3, grav =2)
     R0          : Small factor added (default=dx/4)
+    chunkSize   : Number of receivers processed at a time
+    nWorkers    : Number of threads, see SimPEG.Utils.parallelMap
 
     OUTPUT
     wr       : [nC] Vector of distance weighting
 
+    The problems also provide the weighting, cached for their receivers and
+    active cells, as prob.distWgt(R, R0).
+
     Created on Dec, 20th 2015
 
     @author: dominiquef
     """
 
-    # Find non-zero cells
-    if actv.dtype == 'bool':
-        inds = np.asarray([inds for inds,
-                          elem in enumerate(actv, 1) if elem], dtype=int) - 1
-    else:
-        inds = actv
-
-    nC = len(inds)
-
-    # Create active cell projector
-    P = sp.csr_matrix((np.ones(nC), (inds, range(nC))),
-                      shape=(mesh.nC, nC))
-
-    # Geometrical constant
-    p = 1/np.sqrt(3)
-
-    # Create cell center location
-    Ym, Xm, Zm = np.meshgrid(mesh.vectorCCy, mesh.vectorCCx, mesh.vectorCCz)
-    hY, hX, hZ = np.meshgrid(mesh.hy, mesh.hx, mesh.hz)
-
-    # Remove air cells
-    Xm = P.T*Utils.mkvc(Xm)
-    Ym = P.T*Utils.mkvc(Ym)
-    Zm = P.T*Utils.mkvc(Zm)
-
-    hX = P.T*Utils.mkvc(hX)
-    hY = P.T*Utils.mkvc(hY)
-    hZ = P.T*Utils.mkvc(hZ)
-
-    V = P.T * Utils.mkvc(mesh.vol)
-    wr = np.zeros(nC)
-
-    ndata = rxLoc.shape[0]
-    count = -1
-    print("Begin calculation of distance weighting for R= " + str(R))
-
-    for dd in range(ndata):
-
-        nx1 = (Xm - hX * p - rxLoc[dd, 0])**2
-        nx2 = (Xm + hX * p - rxLoc[dd, 0])**2
-
-        ny1 = (Ym - hY * p - rxLoc[dd, 1])**2
-        ny2 = (Ym + hY * p - rxLoc[dd, 1])**2
-
-        nz1 = (Zm - hZ * p - rxLoc[dd, 2])**2
-        nz2 = (Zm + hZ * p - rxLoc[dd, 2])**2
-
-        R1 = np.sqrt(nx1 + ny1 + nz1)
-        R2 = np.sqrt(nx1 + ny1 + nz2)
-        R3 = np.sqrt(nx2 + ny1 + nz1)
-        R4 = np.sqrt(nx2 + ny1 + nz2)
-        R5 = np.sqrt(nx1 + ny2 + nz1)
-        R6 = np.sqrt(nx1 + ny2 + nz2)
-        R7 = np.sqrt(nx2 + ny2 + nz1)
-        R8 = np.sqrt(nx2 + ny2 + nz2)
-
-        temp = (R1 + R0)**-R + (R2 + R0)**-R + (R3 + R0)**-R + \
-            (R4 + R0)**-R + (R5 + R0)**-R + (R6 + R0)**-R + \
-            (R7 + R0)**-R + (R8 + R0)**-R
-
-        wr = wr + (V*temp/8.)**2.
-
-        count = progress(dd, count, ndata)
-
-    wr = np.sqrt(wr)/V
-    wr = Utils.mkvc(wr)
-    wr = np.sqrt(wr/(np.max(wr)))
-
-    print("Done 100% ...distance weighting completed!!\n")
+    # Cell centers and sizes of the active cells
+    geometry = activeGeometry(mesh, actv)
 
-    return wr
+    return calcDistWgt(geometry.xyz, geometry.h, rxLoc, R, R0,
+                       chunkSize=chunkSize, nWorkers=nWorkers)
 
 
-def writeUBCobs(filename, survey, d):
+def writeUBCobs(filename, survey, d, cache=False):
     """
     writeUBCobs(filename,B,M,rxLoc,d,wd)
 
@@ -1009,6 +1020,7 @@ def writeUBCobs(filename, survey, d):
     filename    : Name of out file including directory
     survey
     flag          : dobs | dpred
+    cache         : also write the binary copy read by the driver
 
     OUTPUT
     Obsfile
@@ -1025,10 +1037,10 @@ def writeUBCobs(filename, survey, d):
     wd = survey.std
 
     data = np.c_[rxLoc, d, wd]
-    head = ('%6.2f %6.2f %6.2f\n' % (B[1], B[2], B[0])+
-              '%6.2f %6.2f %6.2f\n' % (B[1], B[2], 1)+
-              '%i\n' % len(d))
-    np.savetxt(filename, data, fmt='%e', delimiter=' ', newline='\n',header=head,comments='')
+    head = ['%6.2f %6.2f %6.2f\n' % (B[1], B[2], B[0]),
+            '%6.2f %6.2f %6.2f\n' % (B[1], B[2], 1),
+            '%i\n' % len(d)]
+    io_utils.writeUBCtable(filename, head, data, cache=cache)
 
     print("Observation file saved to: " + filename)
 
@@ -1,6 +1,7 @@
 import re
 import os
 from SimPEG import Mesh, Utils
+from SimPEG.Utils import io_utils
 import numpy as np
 from . import BaseMag
 from . import Magnetics
@@ -9,6 +10,10 @@ from . import Magnetics
 class MagneticsDriver_Inv(object):
     """docstring for MagneticsDriver_Inv"""
 
+    #: Keep binary copies (.npz) of the parsed observation and model files
+    #: next to them, read instead of the text while the files are unchanged
+    cacheFiles = False
+
     def __init__(self, input_file=None):
         if input_file is not None:
             self.basePath = os.path.sep.join(input_file.split(
@@ -200,9 +205,7 @@ class MagneticsDriver_Inv(object):
                 # Read from file active cells with 0:air, 1:dynamic, -1 static
                 active = self.activeModel != 0
 
-            inds = np.asarray([inds for inds,
-                               elem in enumerate(active, 1)
-                               if elem], dtype=int) - 1
+            inds = np.where(active)[0]
 
             self._activeCells = inds
 
@@ -219,9 +222,7 @@ class MagneticsDriver_Inv(object):
             # Cells with value 1 in active model are dynamic
             staticCells = self.activeModel[self._activeCells] == -1
 
-            inds = np.asarray([inds for inds,
-                               elem in enumerate(staticCells, 1)
-                               if elem], dtype=int) - 1
+            inds = np.where(staticCells)[0]
 
             self._staticCells = inds
 
@@ -234,9 +235,7 @@ class MagneticsDriver_Inv(object):
             # Cells with value 1 in active model are dynamic
             dynamicCells = self.activeModel[self._activeCells] == 1
 
-            inds = np.asarray([inds for inds,
-                               elem in enumerate(dynamicCells, 1)
-                               if elem], dtype=int) - 1
+            inds = np.where(dynamicCells)[0]
 
             self._dynamicCells = inds
 
@@ -302,17 +301,8 @@ class MagneticsDriver_Inv(object):
 
         else:
 
-            with open(self.basePath + self.magfile) as f:
-                magmodel = f.read()
-
-            magmodel = magmodel.splitlines()
-            M = []
-
-            for line in magmodel:
-                M.append(map(float, line.split()))
-
-            # Convert list to 2d array
-            M = np.vstack(M)
+            _, M = io_utils.readUBCtable(self.basePath + self.magfile,
+                                         cache=self.cacheFiles)
 
             # Cycle through three components and permute from UBC to SimPEG
             for ii in range(3):
@@ -340,40 +330,21 @@ class MagneticsDriver_Inv(object):
             :param M, magnetization orentiaton (MI, MD)
         """
 
-        fid = open(self.basePath + obs_file, 'r')
-
-        # First line has the inclination,declination and amplitude of B0
-        line = fid.readline()
-        B = np.array(line.split(), dtype=float)
-
-        # Second line has the magnetization orientation and a flag
-        line = fid.readline()
-        M = np.array(line.split(), dtype=float)
-
-        # Third line has the number of rows
-        line = fid.readline()
-        ndat = int(line.strip())
-
-        # Pre-allocate space for obsx, obsy, obsz, data, uncert
-        line = fid.readline()
-        temp = np.array(line.split(), dtype=float)
-
-        d = np.zeros(ndat, dtype=float)
-        wd = np.zeros(ndat, dtype=float)
-        locXYZ = np.zeros((ndat, 3), dtype=float)
-
-        for ii in range(ndat):
-
-            temp = np.array(line.split(), dtype=float)
-            locXYZ[ii, :] = temp[:3]
-
-            if len(temp) > 3:
-                d[ii] = temp[3]
-
-                if len(temp) == 5:
-                    wd[ii] = temp[4]
-
-            line = fid.readline()
+        # Header: inclination, declination and amplitude of B0, the
+        # magnetization orientation and a flag, and the number of rows
+        header, data = io_utils.readUBCtable(
+            self.basePath + obs_file, nHeader=3, countInHeader=True,
+            cache=self.cacheFiles
+        )
+        B = np.array(header[0].split(), dtype=float)
+
+        # obsx, obsy, obsz, and data and uncert if given (0 otherwise)
+        nPad = max(5 - data.shape[1], 0)
+        data = np.c_[data, np.zeros((data.shape[0], nPad))]
+        data[np.isnan(data)] = 0.
+        locXYZ = data[:, :3]
+        d = data[:, 3]
+        wd = data[:, 4]
 
         rxLoc = BaseMag.RxObs(locXYZ)
         srcField = BaseMag.SrcField([rxLoc], param=(B[2], B[0], B[1]))
@@ -1,5 +1,6 @@
 from . import MagAnalytics
 from . import GravAnalytics
+from . import BasePF
 from . import BaseMag
 from . import Magnetics
 from . import BaseGrav
@@ -33,6 +33,17 @@ class BaseProblem(Props.HasModel):
     #: Solver options as a kwarg dict
     solverOpts = {}
 
+    #: Memory (bytes) for factorizations kept between fields, Jvec and Jtvec.
+    #: 0 turns the factor cache off, None removes the limit.
+    maxFactorMemory = 0
+
+    #: Number of workers for independent systems (e.g. frequencies), see
+    #: :code:`SimPEG.Utils.parallelMap`. 1 solves them serially.
+    nWorkers = 1
+
+    #: Pool of the workers: 'thread' or 'process'
+    workerPool = 'thread'
+
     #: A discretize instance.
     mesh = None
 
@@ -127,6 +138,66 @@ class BaseProblem(Props.HasModel):
         for prop in self.deleteTheseOnModelUpdate:
             if hasattr(self, prop):
                 delattr(self, prop)
+        if getattr(self, '_factorCache', None) is not None:
+            self._factorCache.setModel(self.model)
+        if self.ispaired:
+            self.survey._dpredCache = None
+
+    @property
+    def factorCache(self):
+        """
+        Factorizations of the system matrices for the current model, see
+        :code:`SimPEG.Utils.SolverUtils.FactorCache`.
+        """
+        if getattr(self, '_factorCache', None) is None:
+            self._factorCache = Utils.SolverUtils.FactorCache()
+        self._factorCache.maxMemory = self.maxFactorMemory
+        return self._factorCache
+
+    @property
+    def factorMemory(self):
+        """Memory (bytes) held by the factorizations in the factorCache."""
+        if getattr(self, '_factorCache', None) is None:
+            return 0
+        return self._factorCache.nbytes
+
+    def getAinv(self, key, getA, *args):
+        """getAinv(key, getA, *args)
+
+        Solver for the system matrix identified by key. It is taken from the
+        factorCache if possible, otherwise :code:`getA(*args)` is factored.
+        Give it back with :code:`cleanAinv` when done.
+
+        :param key: hashable key of the system, e.g. the frequency
+        :param callable getA: function that builds the system matrix
+        :rtype: Solver
+        :return: Ainv
+        """
+        cache = self.factorCache
+        cache.setModel(self.model)
+        Ainv = cache.get(key)
+        if Ainv is None:
+            Ainv = self.Solver(getA(*args), **self.solverOpts)
+            cache.add(key, Ainv)
+        return Ainv
+
+    def parallelMap(self, fun, items):
+        """parallelMap(fun, items)
+
+        :code:`[fun(item) for item in items]`, spread over the nWorkers of
+        the problem.
+        """
+        return Utils.parallelMap(
+            fun, items, nWorkers=self.nWorkers, pool=self.workerPool
+        )
+
+    def cleanAinv(self, key, Ainv):
+        """cleanAinv(key, Ainv)
+
+        Release a solver obtained from :code:`getAinv`. It is cleaned unless
+        it is kept in the factorCache.
+        """
+        self.factorCache.release(key, Ainv)
 
     @property
     def ispaired(self):
@@ -287,3 +358,7 @@ class LinearProblem(BaseProblem):
 
     def Jtvec(self, m, v, f=None):
         return self.G.T.dot(v)
+
+    def GtGdiag(self):
+        """Diagonal of G.T*G (squared column norms of G)"""
+        return np.sum(self.G**2., axis=0)
@@ -6,6 +6,19 @@ import numpy as np
 import scipy.sparse as sp
 
 
+def _activeProjection(n, active):
+    """
+    projection from the active subset of n items to all n items (n x nActive)
+    """
+    if active is None:
+        return Utils.speye(n)
+    inds = np.where(active)[0]
+    return sp.csr_matrix(
+        (np.ones(inds.size), (inds, np.arange(inds.size))),
+        shape=(n, inds.size)
+    )
+
+
 class RegularizationMesh(object):
     """
     **Regularization Mesh**
@@ -14,15 +27,60 @@ class RegularizationMesh(object):
     are not necessarily true differential operators, but are constructed from
     a SimPEG Mesh.
 
+    The operators are built once, stored in CSR format and shared until
+    indActive is changed. cacheHits and cacheMisses count the accesses.
+
     :param BaseMesh mesh: problem mesh
     :param numpy.array indActive: bool array, size nC, that is True where we have active cells. Used to reduce the operators so we regularize only on active cells
     """
 
+    cacheHits = 0    #: Number of operators taken from the cache
+    cacheMisses = 0  #: Number of operators built
+
     def __init__(self, mesh, indActive=None):
         self.mesh = mesh
-        assert indActive is None or indActive.dtype == 'bool', 'indActive needs to be None or a bool'
         self.indActive = indActive
 
+    @property
+    def indActive(self):
+        """
+        bool array, size nC, that is True where we have active cells
+        :rtype: numpy.array
+        :return: active cells
+        """
+        return self._indActive
+
+    @indActive.setter
+    def indActive(self, value):
+        assert value is None or value.dtype == 'bool', 'indActive needs to be None or a bool'
+        self._indActive = value
+        self.clearCache()
+
+    def clearCache(self):
+        """
+        Remove all of the cached operators.
+        """
+        self._operators = {}
+        self._nC = None
+
+    def _operator(self, name, build):
+        """
+        Take the operator name from the cache, or build it (as CSR) and add
+        it to the cache.
+
+        :param str name: name of the operator
+        :param callable build: function that builds the operator
+        """
+        if name in self._operators:
+            self.cacheHits += 1
+            return self._operators[name]
+        self.cacheMisses += 1
+        op = build()
+        if sp.issparse(op):
+            op = sp.csr_matrix(op)
+        self._operators[name] = op
+        return op
+
     @property
     def vol(self):
         """
@@ -30,9 +88,7 @@ class RegularizationMesh(object):
         :rtype: numpy.array
         :return: reduced cell volume
         """
-        if getattr(self, '_vol', None) is None:
-            self._vol = self._Pac.T * self.mesh.vol
-        return self._vol
+        return self._operator('vol', lambda: self._Pac.T * self.mesh.vol)
 
     @property
     def nC(self):
@@ -59,6 +115,10 @@ class RegularizationMesh(object):
             self._dim = self.mesh.dim
         return self._dim
 
+    def _indActiveFaces(self, aveF2CC):
+        if self.indActive is None:
+            return None
+        return (aveF2CC.T * self.indActive) == 1
 
     @property
     def _Pac(self):
@@ -67,12 +127,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: active cell projection matrix
         """
-        if getattr(self, '__Pac', None) is None:
-            if self.indActive is None:
-                self.__Pac = Utils.speye(self.mesh.nC)
-            else:
-                self.__Pac = Utils.speye(self.mesh.nC)[:,self.indActive]
-        return self.__Pac
+        return self._operator('Pac', lambda: _activeProjection(
+            self.mesh.nC, self.indActive
+        ))
 
     @property
     def _Pafx(self):
@@ -81,13 +138,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: active face-x projection matrix
         """
-        if getattr(self, '__Pafx', None) is None:
-            if self.indActive is None:
-                self.__Pafx = Utils.speye(self.mesh.nFx)
-            else:
-                indActive_Fx = (self.mesh.aveFx2CC.T * self.indActive) == 1
-                self.__Pafx = Utils.speye(self.mesh.nFx)[:,indActive_Fx]
-        return self.__Pafx
+        return self._operator('Pafx', lambda: _activeProjection(
+            self.mesh.nFx, self._indActiveFaces(self.mesh.aveFx2CC)
+        ))
 
     @property
     def _Pafy(self):
@@ -96,13 +149,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: active face-y projection matrix
         """
-        if getattr(self, '__Pafy', None) is None:
-            if self.indActive is None:
-                self.__Pafy = Utils.speye(self.mesh.nFy)
-            else:
-                indActive_Fy = (self.mesh.aveFy2CC.T * self.indActive) == 1
-                self.__Pafy = Utils.speye(self.mesh.nFy)[:,indActive_Fy]
-        return self.__Pafy
+        return self._operator('Pafy', lambda: _activeProjection(
+            self.mesh.nFy, self._indActiveFaces(self.mesh.aveFy2CC)
+        ))
 
     @property
     def _Pafz(self):
@@ -111,13 +160,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: active face-z projection matrix
         """
-        if getattr(self, '__Pafz', None) is None:
-            if self.indActive is None:
-                self.__Pafz = Utils.speye(self.mesh.nFz)
-            else:
-                indActive_Fz = (self.mesh.aveFz2CC.T * self.indActive) == 1
-                self.__Pafz = Utils.speye(self.mesh.nFz)[:,indActive_Fz]
-        return self.__Pafz
+        return self._operator('Pafz', lambda: _activeProjection(
+            self.mesh.nFz, self._indActiveFaces(self.mesh.aveFz2CC)
+        ))
 
     @property
     def aveFx2CC(self):
@@ -126,9 +171,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: averaging from active cell centers to active x-faces
         """
-        if getattr(self, '_aveFx2CC', None) is None:
-            self._aveFx2CC =  self._Pac.T * self.mesh.aveFx2CC * self._Pafx
-        return self._aveFx2CC
+        return self._operator(
+            'aveFx2CC', lambda: self._Pac.T * self.mesh.aveFx2CC * self._Pafx
+        )
 
     @property
     def aveCC2Fx(self):
@@ -137,9 +182,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: averaging matrix from active x-faces to active cell centers
         """
-        if getattr(self, '_aveCC2Fx', None) is None:
-            self._aveCC2Fx =  Utils.sdiag(1./(self.aveFx2CC.T).sum(1)) * self.aveFx2CC.T
-        return self._aveCC2Fx
+        return self._operator('aveCC2Fx', lambda: (
+            Utils.sdiag(1./(self.aveFx2CC.T).sum(1)) * self.aveFx2CC.T
+        ))
 
     @property
     def aveFy2CC(self):
@@ -148,9 +193,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: averaging from active cell centers to active y-faces
         """
-        if getattr(self, '_aveFy2CC', None) is None:
-            self._aveFy2CC = self._Pac.T * self.mesh.aveFy2CC * self._Pafy
-        return self._aveFy2CC
+        return self._operator(
+            'aveFy2CC', lambda: self._Pac.T * self.mesh.aveFy2CC * self._Pafy
+        )
 
     @property
     def aveCC2Fy(self):
@@ -159,9 +204,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: averaging matrix from active y-faces to active cell centers
         """
-        if getattr(self, '_aveCC2Fy', None) is None:
-            self._aveCC2Fy =  Utils.sdiag(1./(self.aveFy2CC.T).sum(1)) * self.aveFy2CC.T
-        return self._aveCC2Fy
+        return self._operator('aveCC2Fy', lambda: (
+            Utils.sdiag(1./(self.aveFy2CC.T).sum(1)) * self.aveFy2CC.T
+        ))
 
     @property
     def aveFz2CC(self):
@@ -170,9 +215,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: averaging from active cell centers to active z-faces
         """
-        if getattr(self, '_aveFz2CC', None) is None:
-            self._aveFz2CC = self._Pac.T * self.mesh.aveFz2CC * self._Pafz
-        return self._aveFz2CC
+        return self._operator(
+            'aveFz2CC', lambda: self._Pac.T * self.mesh.aveFz2CC * self._Pafz
+        )
 
     @property
     def aveCC2Fz(self):
@@ -181,9 +226,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: averaging matrix from active z-faces to active cell centers
         """
-        if getattr(self, '_aveCC2Fz', None) is None:
-            self._aveCC2Fz =  Utils.sdiag(1./(self.aveFz2CC.T).sum(1)) * self.aveFz2CC.T
-        return self._aveCC2Fz
+        return self._operator('aveCC2Fz', lambda: (
+            Utils.sdiag(1./(self.aveFz2CC.T).sum(1)) * self.aveFz2CC.T
+        ))
 
     @property
     def cellDiffx(self):
@@ -192,9 +237,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: differencing matrix for active cells in the x-direction
         """
-        if getattr(self, '_cellDiffx', None) is None:
-            self._cellDiffx = self._Pafx.T * self.mesh.cellGradx * self._Pac
-        return self._cellDiffx
+        return self._operator(
+            'cellDiffx', lambda: self._Pafx.T * self.mesh.cellGradx * self._Pac
+        )
 
     @property
     def cellDiffy(self):
@@ -203,9 +248,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: differencing matrix for active cells in the y-direction
         """
-        if getattr(self, '_cellDiffy', None) is None:
-            self._cellDiffy = self._Pafy.T * self.mesh.cellGrady * self._Pac
-        return self._cellDiffy
+        return self._operator(
+            'cellDiffy', lambda: self._Pafy.T * self.mesh.cellGrady * self._Pac
+        )
 
     @property
     def cellDiffz(self):
@@ -214,9 +259,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: differencing matrix for active cells in the z-direction
         """
-        if getattr(self, '_cellDiffz', None) is None:
-            self._cellDiffz = self._Pafz.T * self.mesh.cellGradz * self._Pac
-        return self._cellDiffz
+        return self._operator(
+            'cellDiffz', lambda: self._Pafz.T * self.mesh.cellGradz * self._Pac
+        )
 
     @property
     def faceDiffx(self):
@@ -225,9 +270,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: differencing matrix for active faces in the x-direction
         """
-        if getattr(self, '_faceDiffx', None) is None:
-            self._faceDiffx = self._Pac.T * self.mesh.faceDivx * self._Pafx
-        return self._faceDiffx
+        return self._operator(
+            'faceDiffx', lambda: self._Pac.T * self.mesh.faceDivx * self._Pafx
+        )
 
     @property
     def faceDiffy(self):
@@ -236,9 +281,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: differencing matrix for active faces in the y-direction
         """
-        if getattr(self, '_faceDiffy', None) is None:
-            self._faceDiffy = self._Pac.T * self.mesh.faceDivy * self._Pafy
-        return self._faceDiffy
+        return self._operator(
+            'faceDiffy', lambda: self._Pac.T * self.mesh.faceDivy * self._Pafy
+        )
 
     @property
     def faceDiffz(self):
@@ -247,9 +292,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: differencing matrix for active faces in the z-direction
         """
-        if getattr(self, '_faceDiffz', None) is None:
-            self._faceDiffz = self._Pac.T * self.mesh.faceDivz * self._Pafz
-        return self._faceDiffz
+        return self._operator(
+            'faceDiffz', lambda: self._Pac.T * self.mesh.faceDivz * self._Pafz
+        )
 
     @property
     def cellDiffxStencil(self):
@@ -258,10 +303,9 @@ class RegularizationMesh(object):
         :rtype: scipy.sparse.csr_matrix
         :return: differencing matrix for active cells in the x-direction
         """
-        if getattr(self, '_cellDiffxStencil', None) is None:
-
-            self._cellDiffxStencil = self._Pafx.T * self.mesh._cellGradxStencil() * self._Pac
-        return self._cellDiffxStencil
+        return self._operator('cellDiffxStencil', lambda: (
+            self._Pafx.T * self.mesh._cellGradxStencil() * self._Pac
+        ))
 
     @property
     def cellDiffyStencil(self):
@@ -271,10 +315,9 @@ class RegularizationMesh(object):
         :return: differencing matrix for active cells in the y-direction
         """
         if self.dim < 2: return None
-        if getattr(self, '_cellDiffyStencil', None) is None:
-
-            self._cellDiffyStencil = self._Pafy.T * self.mesh._cellGradyStencil() * self._Pac
-        return self._cellDiffyStencil
+        return self._operator('cellDiffyStencil', lambda: (
+            self._Pafy.T * self.mesh._cellGradyStencil() * self._Pac
+        ))
 
     @property
     def cellDiffzStencil(self):
@@ -284,10 +327,220 @@ class RegularizationMesh(object):
         :return: differencing matrix for active cells in the y-direction
         """
         if self.dim < 3: return None
-        if getattr(self, '_cellDiffzStencil', None) is None:
+        return self._operator('cellDiffzStencil', lambda: (
+            self._Pafz.T * self.mesh._cellGradzStencil() * self._Pac
+        ))
 
-            self._cellDiffzStencil = self._Pafz.T * self.mesh._cellGradzStencil() * self._Pac
-        return self._cellDiffzStencil
+    @property
+    def isTensor(self):
+        """
+        True if the mesh is a tensor mesh, the differences and averages can
+        then be applied as stencils (see cellDiffVec and aveCC2FVec)
+        :rtype: bool
+        """
+        return isinstance(self.mesh, Mesh.TensorMesh)
+
+    def _gridSlices(self, comp):
+        """
+        slices of the faces of comp on the low and high side of each cell,
+        of the inner faces, and the number of faces in each direction
+        """
+        axis = 'xyz'.index(comp)
+        vnF = list(self.mesh.vnC)
+        vnF[axis] += 1
+        lo, hi, inner = [[slice(None)]*self.dim for i in range(3)]
+        lo[axis], hi[axis], inner[axis] = slice(0, -1), slice(1, None), slice(1, -1)
+        return tuple(lo), tuple(hi), tuple(inner), vnF
+
+    def _boundarySlices(self, comp):
+        axis = 'xyz'.index(comp)
+        first, last = [slice(None)]*self.dim, [slice(None)]*self.dim
+        first[axis], last[axis] = 0, -1
+        return tuple(first), tuple(last)
+
+    def _activeFaces(self, comp):
+        """
+        bool array of the active faces of comp in the full mesh, faces
+        between two active cells (None if all cells are active)
+        """
+        if self.indActive is None:
+            return None
+
+        def build():
+            lo, hi, inner, vnF = self._gridSlices(comp)
+            act = self.indActive.reshape(self.mesh.vnC, order='F')
+            # the boundary faces are never active
+            faces = np.zeros(vnF, dtype=bool, order='F')
+            faces[inner] = act[lo] & act[hi]
+            return faces.ravel(order='F')
+        return self._operator('activeF' + comp, build)
+
+    def _faceScale(self, comp):
+        """
+        inverse distance between the cell centers on each side of the
+        faces of comp in the full mesh (the cell width on the boundary)
+        """
+        def build():
+            axis = 'xyz'.index(comp)
+            lo, hi, inner, vnF = self._gridSlices(comp)
+            h = self.mesh.h[axis]
+            dist = np.r_[h[0], 0.5*(h[:-1] + h[1:]), h[-1]]
+            shape = [1]*self.dim
+            shape[axis] = vnF[axis]
+            scale = np.empty(vnF, order='F')
+            scale[...] = (1./dist).reshape(shape)
+            return scale.ravel(order='F')
+        return self._operator('faceScale' + comp, build)
+
+    def _cellGrid(self, v):
+        if self.indActive is None:
+            x = np.asarray(v, dtype=float)
+        else:
+            x = np.zeros(self.mesh.nC)
+            x[self.indActive] = v
+        return x.reshape(self.mesh.vnC, order='F')
+
+    def cellDiffVec(self, comp, v, stencil=False, adjoint=False):
+        """
+        cellDiff{comp} * v, or cellDiff{comp}Stencil * v if stencil, (the
+        transpose if adjoint) applied as a stencil on tensor meshes, without
+        forming the matrix. Other meshes use the sparse operators.
+
+        :param str comp: 'x', 'y' or 'z'
+        :param numpy.array v: vector on the active cells (active faces if adjoint)
+        :param bool stencil: no cell lengths, as in cellDiff{comp}Stencil
+        :param bool adjoint: multiply with the transpose
+        :rtype: numpy.array
+        :return: difference of v on the active faces (active cells if adjoint)
+        """
+        if not self.isTensor:
+            D = getattr(self, 'cellDiff' + comp + ('Stencil' if stencil else ''))
+            return D.T * v if adjoint else D * v
+
+        lo, hi, inner, vnF = self._gridSlices(comp)
+        first, last = self._boundarySlices(comp)
+        actF = self._activeFaces(comp)
+
+        if not adjoint:
+            x = self._cellGrid(v)
+            d = np.empty(vnF, order='F')
+            np.subtract(x[hi], x[lo], out=d[inner])
+            # the boundary rows of the difference are empty
+            d[first], d[last] = 0., 0.
+            d = d.ravel(order='F')
+            if not stencil:
+                d *= self._faceScale(comp)
+            return d if actF is None else d[actF]
+
+        if actF is None:
+            w = np.array(v, dtype=float)
+        else:
+            w = np.zeros(actF.size)
+            w[actF] = v
+        if not stencil:
+            w *= self._faceScale(comp)
+        w = w.reshape(vnF, order='F')
+        w[first], w[last] = 0., 0.
+        x = np.empty(self.mesh.vnC, order='F')
+        np.subtract(w[lo], w[hi], out=x)
+        x = x.ravel(order='F')
+        return x if self.indActive is None else x[self.indActive]
+
+    def aveCC2FVec(self, comp, v):
+        """
+        aveCC2F{comp} * v applied as a stencil on tensor meshes, without
+        forming the matrix. Other meshes use the sparse operators.
+
+        :param str comp: 'x', 'y' or 'z'
+        :param numpy.array v: vector on the active cells
+        :rtype: numpy.array
+        :return: average of v on the active faces
+        """
+        if not self.isTensor:
+            return getattr(self, 'aveCC2F' + comp) * v
+
+        lo, hi, inner, vnF = self._gridSlices(comp)
+        first, last = self._boundarySlices(comp)
+        x = self._cellGrid(v)
+        a = np.empty(vnF, order='F')
+        a[inner] = 0.5*(x[lo] + x[hi])
+        # boundary faces take the value of their cell
+        a[first], a[last] = x[first], x[last]
+        a = a.ravel(order='F')
+
+        actF = self._activeFaces(comp)
+        return a if actF is None else a[actF]
+
+
+class CellDifferenceOperator(sp.linalg.LinearOperator):
+    """
+    Matrix-free weighted cell difference, sdiag(weights) * cellDiff{comp}
+    (or cellDiff{comp}Stencil), on a tensor regularization mesh. With
+    nModels, the difference is applied to each of the models stacked in
+    the vector (a block diagonal operator).
+
+    The products with the operator and its transpose are stencil kernels
+    over the cell grid (see RegularizationMesh.cellDiffVec), use tocsr()
+    for the sparse matrix.
+
+    :param RegularizationMesh regmesh: regularization mesh
+    :param str comp: 'x', 'y' or 'z'
+    :param numpy.array weights: weights on the active faces of all models
+    :param bool stencil: no cell lengths, as in cellDiff{comp}Stencil
+    :param int nModels: number of models
+    """
+
+    def __init__(self, regmesh, comp, weights, stencil=True, nModels=1):
+        self.regmesh = regmesh
+        self.comp = comp
+        self.weights = weights
+        self.stencil = stencil
+        self.nModels = nModels
+        super(CellDifferenceOperator, self).__init__(
+            dtype=np.float64, shape=(weights.size, regmesh.nC*nModels)
+        )
+
+    def _blocks(self, v, n):
+        v = np.ravel(v)
+        return [v[i*n:(i+1)*n] for i in range(self.nModels)]
+
+    def _matvec(self, v):
+        d = [
+            self.regmesh.cellDiffVec(self.comp, vi, stencil=self.stencil)
+            for vi in self._blocks(v, self.regmesh.nC)
+        ]
+        d = d[0] if self.nModels == 1 else np.hstack(d)
+        d *= self.weights
+        return d
+
+    def _rmatvec(self, w):
+        x = [
+            self.regmesh.cellDiffVec(
+                self.comp, wi, stencil=self.stencil, adjoint=True
+            )
+            for wi in self._blocks(self.weights * np.ravel(w),
+                                   self.shape[0] // self.nModels)
+        ]
+        return x[0] if self.nModels == 1 else np.hstack(x)
+
+    def _transpose(self):
+        return Utils.transposeOperator(self)
+    _adjoint = _transpose
+
+    def tocsr(self):
+        """
+        The weighted difference as a sparse matrix.
+        :rtype: scipy.sparse.csr_matrix
+        """
+        if getattr(self, '_csr', None) is None:
+            D = getattr(
+                self.regmesh,
+                'cellDiff' + self.comp + ('Stencil' if self.stencil else '')
+            )
+            if self.nModels > 1:
+                D = sp.block_diag([D]*self.nModels)
+            self._csr = sp.csr_matrix(Utils.sdiag(self.weights) * D)
+        return self._csr
 
 
 class BaseRegularization(object):
@@ -428,12 +681,30 @@ class Simple(BaseRegularization):
     alpha_z      = Utils.dependentProperty('_alpha_z', 1.0, ['_W', '_Wz'],     "Weight for the first derivative in the z direction")
     cell_weights = 1.
 
+    #: Apply Wx, Wy and Wz as stencils on tensor meshes instead of building
+    #: the sparse matrices (see CellDifferenceOperator)
+    matrixFree = False
+
     def __init__(self, mesh, mapping=None, indActive=None, **kwargs):
         BaseRegularization.__init__(self, mesh, mapping=mapping, indActive=indActive, **kwargs)
 
         if isinstance(self.cell_weights,float):
             self.cell_weights = np.ones(self.regmesh.nC) * self.cell_weights
 
+    def _smoothW(self, comp, weights, stencil=True, nModels=1):
+        """
+        Weighted difference sdiag(weights) * cellDiff{comp}(Stencil),
+        matrix-free if matrixFree and the mesh is a tensor mesh.
+        """
+        if self.matrixFree and self.regmesh.isTensor:
+            return CellDifferenceOperator(
+                self.regmesh, comp, weights, stencil=stencil, nModels=nModels
+            )
+        D = getattr(self.regmesh, 'cellDiff' + comp + ('Stencil' if stencil else ''))
+        if nModels > 1:
+            D = sp.block_diag([D]*nModels)
+        return Utils.sdiag(weights)*D
+
     @property
     def Wsmall(self):
         """Regularization matrix Wsmall"""
@@ -445,21 +716,27 @@ class Simple(BaseRegularization):
     def Wx(self):
         """Regularization matrix Wx"""
         if getattr(self, '_Wx', None) is None:
-            self._Wx = Utils.sdiag((self.alpha_x * (self.regmesh.aveCC2Fx*self.cell_weights))**0.5)*self.regmesh.cellDiffxStencil
+            self._Wx = self._smoothW(
+                'x', (self.alpha_x * self.regmesh.aveCC2FVec('x', self.cell_weights))**0.5
+            )
         return self._Wx
 
     @property
     def Wy(self):
         """Regularization matrix Wy"""
         if getattr(self, '_Wy', None) is None:
-            self._Wy = Utils.sdiag((self.alpha_y * (self.regmesh.aveCC2Fy*self.cell_weights))**0.5)*self.regmesh.cellDiffyStencil
+            self._Wy = self._smoothW(
+                'y', (self.alpha_y * self.regmesh.aveCC2FVec('y', self.cell_weights))**0.5
+            )
         return self._Wy
 
     @property
     def Wz(self):
         """Regularization matrix Wz"""
         if getattr(self, '_Wz', None) is None:
-            self._Wz = Utils.sdiag((self.alpha_z * (self.regmesh.aveCC2Fz*self.cell_weights))**0.5)*self.regmesh.cellDiffzStencil
+            self._Wz = self._smoothW(
+                'z', (self.alpha_z * self.regmesh.aveCC2FVec('z', self.cell_weights))**0.5
+            )
         return self._Wz
 
     @property
@@ -471,7 +748,7 @@ class Simple(BaseRegularization):
                 wlist += (self.Wy,)
             if self.regmesh.dim > 2:
                 wlist += (self.Wz,)
-            self._Wsmooth = sp.vstack(wlist)
+            self._Wsmooth = sp.vstack([w.tocsr() for w in wlist])
         return self._Wsmooth
 
 
@@ -539,60 +816,63 @@ class Simple(BaseRegularization):
     def _evalSmoothxDeriv(self, m):
         if self.mrefInSmooth == True:
             r = self.Wx * ( self.mapping * ( m - self.mref ) )
-            return r.T * ( self.Wx * self.mapping.deriv(m - self.mref) )
+            return self.mapping.deriv(m - self.mref).T * ( self.Wx.T * r )
         elif self.mrefInSmooth == False:
             r = self.Wx * ( self.mapping * m )
-            return r.T * ( self.Wx * self.mapping.deriv(m) )
+            return self.mapping.deriv(m).T * ( self.Wx.T * r )
 
     @Utils.timeIt
     def _evalSmoothx2Deriv(self, m, v=None):
         if self.mrefInSmooth == True:
-            rDeriv = self.Wx * ( self.mapping.deriv( m - self.mref ) )
+            mD = self.mapping.deriv( m - self.mref )
         elif self.mrefInSmooth == False:
-            rDeriv = self.Wx * ( self.mapping.deriv(m) )
+            mD = self.mapping.deriv(m)
 
         if v is not None:
-            return rDeriv.T * ( rDeriv * v )
+            return mD.T * ( self.Wx.T * ( self.Wx * ( mD * v ) ) )
+        rDeriv = self.Wx.tocsr() * mD
         return rDeriv.T * rDeriv
 
     @Utils.timeIt
     def _evalSmoothyDeriv(self, m):
         if self.mrefInSmooth == True:
             r = self.Wy * ( self.mapping * ( m - self.mref ) )
-            return r.T * ( self.Wy * self.mapping.deriv(m - self.mref) )
+            return self.mapping.deriv(m - self.mref).T * ( self.Wy.T * r )
         elif self.mrefInSmooth == False:
             r = self.Wy * ( self.mapping * m )
-            return r.T * ( self.Wy * self.mapping.deriv(m) )
+            return self.mapping.deriv(m).T * ( self.Wy.T * r )
 
     @Utils.timeIt
     def _evalSmoothy2Deriv(self, m, v=None):
         if self.mrefInSmooth == True:
-            rDeriv = self.Wy * ( self.mapping.deriv( m - self.mref ) )
+            mD = self.mapping.deriv( m - self.mref )
         elif self.mrefInSmooth == False:
-            rDeriv = self.Wy * ( self.mapping.deriv(m) )
+            mD = self.mapping.deriv(m)
 
         if v is not None:
-            return rDeriv.T * ( rDeriv * v )
+            return mD.T * ( self.Wy.T * ( self.Wy * ( mD * v ) ) )
+        rDeriv = self.Wy.tocsr() * mD
         return rDeriv.T * rDeriv
 
     @Utils.timeIt
     def _evalSmoothzDeriv(self, m):
         if self.mrefInSmooth == True:
             r = self.Wz * ( self.mapping * ( m - self.mref ) )
-            return r.T * ( self.Wz * self.mapping.deriv(m - self.mref) )
+            return self.mapping.deriv(m - self.mref).T * ( self.Wz.T * r )
         elif self.mrefInSmooth == False:
             r = self.Wz * ( self.mapping * m )
-            return r.T * ( self.Wz * self.mapping.deriv(m) )
+            return self.mapping.deriv(m).T * ( self.Wz.T * r )
 
     @Utils.timeIt
     def _evalSmoothz2Deriv(self, m, v=None):
         if self.mrefInSmooth == True:
-            rDeriv = self.Wz * ( self.mapping.deriv( m - self.mref ) )
+            mD = self.mapping.deriv( m - self.mref )
         elif self.mrefInSmooth == False:
-            rDeriv = self.Wz * ( self.mapping.deriv(m) )
+            mD = self.mapping.deriv(m)
 
         if v is not None:
-            return rDeriv.T * ( rDeriv * v )
+            return mD.T * ( self.Wz.T * ( self.Wz * ( mD * v ) ) )
+        rDeriv = self.Wz.tocsr() * mD
         return rDeriv.T * rDeriv
 
     @Utils.timeIt
@@ -691,24 +971,24 @@ class Tikhonov(Simple):
     def Wx(self):
         """Regularization matrix Wx"""
         if getattr(self, '_Wx', None) is None:
-            Ave_x_vol = self.regmesh.aveCC2Fx * self.regmesh.vol
-            self._Wx = Utils.sdiag((Ave_x_vol*self.alpha_x)**0.5)*self.regmesh.cellDiffx
+            Ave_x_vol = self.regmesh.aveCC2FVec('x', self.regmesh.vol)
+            self._Wx = self._smoothW('x', (Ave_x_vol*self.alpha_x)**0.5, stencil=False)
         return self._Wx
 
     @property
     def Wy(self):
         """Regularization matrix Wy"""
         if getattr(self, '_Wy', None) is None:
-            Ave_y_vol = self.regmesh.aveCC2Fy * self.regmesh.vol
-            self._Wy = Utils.sdiag((Ave_y_vol*self.alpha_y)**0.5)*self.regmesh.cellDiffy
+            Ave_y_vol = self.regmesh.aveCC2FVec('y', self.regmesh.vol)
+            self._Wy = self._smoothW('y', (Ave_y_vol*self.alpha_y)**0.5, stencil=False)
         return self._Wy
 
     @property
     def Wz(self):
         """Regularization matrix Wz"""
         if getattr(self, '_Wz', None) is None:
-            Ave_z_vol = self.regmesh.aveCC2Fz * self.regmesh.vol
-            self._Wz = Utils.sdiag((Ave_z_vol*self.alpha_z)**0.5)*self.regmesh.cellDiffz
+            Ave_z_vol = self.regmesh.aveCC2FVec('z', self.regmesh.vol)
+            self._Wz = self._smoothW('z', (Ave_z_vol*self.alpha_z)**0.5, stencil=False)
         return self._Wz
 
     @property
@@ -989,20 +1269,18 @@ class Sparse(Simple):
             else:
                 m = self.mapping * (self.model)
 
-            mats = []
+            weights = []
             for imodel in range(self.nModels):
 
                 indl, indu = imodel*self.regmesh.nC, (imodel+1)*self.regmesh.nC
 
                 # Grab the right model parameters
-                f_m = self.regmesh.cellDiffxStencil * m[indl:indu]
+                f_m = self.regmesh.cellDiffVec('x', m[indl:indu], stencil=True)
                 self.rx = self.R( f_m , self.eps_q[imodel], self.norms[1])
 
-                Wx = Utils.sdiag((self.alpha_x*self.gamma*(self.regmesh.aveCC2Fx*self.cell_weights[indl:indu]))**0.5*self.rx)*self.regmesh.cellDiffxStencil
-
-                mats.append(Wx)
+                weights.append((self.alpha_x*self.gamma*(self.regmesh.aveCC2FVec('x', self.cell_weights[indl:indu])))**0.5*self.rx)
 
-            self._Wx = sp.block_diag(mats)
+            self._Wx = self._smoothW('x', np.hstack(weights), nModels=self.nModels)
 
         return self._Wx
 
@@ -1017,20 +1295,18 @@ class Sparse(Simple):
             else:
                 m = self.mapping * (self.model)
 
-            mats = []
+            weights = []
             for imodel in range(self.nModels):
 
                 indl, indu = imodel*self.regmesh.nC, (imodel+1)*self.regmesh.nC
 
                 # Grab the right model parameters
-                f_m = self.regmesh.cellDiffyStencil * m[indl:indu]
+                f_m = self.regmesh.cellDiffVec('y', m[indl:indu], stencil=True)
                 self.ry = self.R( f_m , self.eps_q[imodel], self.norms[2])
 
-                Wy = Utils.sdiag((self.alpha_y*self.gamma*(self.regmesh.aveCC2Fy*self.cell_weights[indl:indu]))**0.5*self.ry)*self.regmesh.cellDiffyStencil
-
-                mats.append(Wy)
+                weights.append((self.alpha_y*self.gamma*(self.regmesh.aveCC2FVec('y', self.cell_weights[indl:indu])))**0.5*self.ry)
 
-            self._Wy = sp.block_diag(mats)
+            self._Wy = self._smoothW('y', np.hstack(weights), nModels=self.nModels)
 
         return self._Wy
 
@@ -1043,20 +1319,18 @@ class Sparse(Simple):
 
             else:
                 m = self.mapping * (self.model)
-            mats = []
+            weights = []
             for imodel in range(self.nModels):
 
                 indl, indu = imodel*self.regmesh.nC, (imodel+1)*self.regmesh.nC
 
                 # Grab the right model parameters
-                f_m = self.regmesh.cellDiffzStencil * m[indl:indu]
+                f_m = self.regmesh.cellDiffVec('z', m[indl:indu], stencil=True)
                 self.rz = self.R( f_m , self.eps_q[imodel], self.norms[3])
 
-                Wz = Utils.sdiag((self.alpha_z*self.gamma*(self.regmesh.aveCC2Fz*self.cell_weights[indl:indu]))**0.5*self.rz)*self.regmesh.cellDiffzStencil
-
-                mats.append(Wz)
+                weights.append((self.alpha_z*self.gamma*(self.regmesh.aveCC2FVec('z', self.cell_weights[indl:indu])))**0.5*self.rz)
 
-            self._Wz = sp.block_diag(mats)
+            self._Wz = self._smoothW('z', np.hstack(weights), nModels=self.nModels)
 
         return self._Wz
 
@@ -5,6 +5,7 @@ import numpy as np
 import scipy.sparse as sp
 import uuid
 import gc
+import weakref
 
 
 class BaseRx(object):
@@ -312,10 +313,26 @@ class BaseSurvey(object):
                 d_\\text{pred} = P(f(m))
 
             Where P is a projection of the fields onto the data space.
+
+            The predicted data for the last fields passed in are kept, so
+            the data misfit, its derivative and the inversion can all ask
+            for dpred(m, f=f) while the fields are projected only once.
+            The cache is dropped when the model of the problem changes.
         """
         if f is None:
             f = self.prob.fields(m)
-        return Utils.mkvc(self.eval(f))
+            return Utils.mkvc(self.eval(f))
+
+        cached = getattr(self, '_dpredCache', None)
+        if cached is not None and cached[0]() is f:
+            return cached[1].copy()
+
+        dpred = Utils.mkvc(self.eval(f))
+        try:
+            self._dpredCache = (weakref.ref(f), dpred.copy())
+        except TypeError:  # the fields can not be weakly referenced
+            self._dpredCache = None
+        return dpred
 
     @Utils.count
     def eval(self, f):
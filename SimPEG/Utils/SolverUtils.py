@@ -1,6 +1,8 @@
 from __future__ import print_function
 import numpy as np, scipy.sparse as sp
 from .matutils import mkvc
+from collections import OrderedDict
+import threading
 import warnings
 
 def _checkAccuracy(A, b, X, accuracyTol):
@@ -14,7 +16,15 @@ def _checkAccuracy(A, b, X, accuracyTol):
         warnings.warn(msg, RuntimeWarning)
 
 
-def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, name=None):
+def _chunks(n, chunkSize):
+    """Column slices of at most chunkSize columns (all columns if None)."""
+    if chunkSize is None or chunkSize >= n:
+        return [slice(0, n)]
+    chunkSize = max(int(chunkSize), 1)
+    return [slice(i, min(i + chunkSize, n)) for i in range(0, n, chunkSize)]
+
+
+def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, chunkSize=None, name=None):
     """
     Wraps a direct Solver.
 
@@ -23,6 +33,9 @@ def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, name=
         Solver   = SolverUtils.SolverWrapD(sp.linalg.spsolve, factorize=False)
         SolverLU = SolverUtils.SolverWrapD(sp.linalg.splu, factorize=True)
 
+    Multiple right hand sides are solved as blocks of at most chunkSize
+    columns (all at once if None), chunkSize can also be given to the
+    solver instance.
     """
 
     def __init__(self, A, **kwargs):
@@ -32,16 +45,31 @@ def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, name=
         if "checkAccuracy" in kwargs: del kwargs["checkAccuracy"]
         self.accuracyTol = kwargs.get("accuracyTol", accuracyTol)
         if "accuracyTol" in kwargs: del kwargs["accuracyTol"]
+        self.chunkSize = kwargs.get("chunkSize", chunkSize)
+        if "chunkSize" in kwargs: del kwargs["chunkSize"]
 
         self.kwargs = kwargs
 
         if factorize:
             self.solver = fun(self.A, **kwargs)
 
-    def __mul__(self, b):
+    def _transposed(self):
+        # A^T for the solves and accuracy checks that need it, built once
+        if getattr(self, '_AT', None) is None:
+            self._AT = self.A.T.tocsc()
+        return self._AT
+
+    def _solve(self, b, transpose=False):
         if type(b) is not np.ndarray:
             raise TypeError('Can only multiply by a numpy array.')
 
+        if not transpose:
+            A = self.A
+        elif not factorize or self.checkAccuracy:
+            A = _transposed(self)
+        else:
+            A = None  # the factorization solves with A^T directly
+
         if len(b.shape) == 1 or b.shape[1] == 1:
             b = b.flatten()
             # Just one RHS
@@ -49,42 +77,67 @@ def SolverWrapD(fun, factorize=True, checkAccuracy=True, accuracyTol=1e-6, name=
             if b.dtype is np.dtype('O'):
                 b = b.astype(type(b[0]))
 
-            if factorize:
-                X = self.solver.solve(b, **self.kwargs)
+            if factorize and transpose:
+                X = self.solver.solve(b, trans='T')
+            elif factorize:
+                X = self.solver.solve(b)
             else:
-                X = fun(self.A, b, **self.kwargs)
-        else: # Multiple RHSs
+                X = fun(A, b, **self.kwargs)
+        else: # Multiple RHSs, solved in blocks
             if b.dtype is np.dtype('O'):
                 b = b.astype(type(b[0,0]))
 
-            X = np.empty_like(b)
+            X = np.empty(b.shape, dtype=np.result_type(self.A.dtype, b.dtype))
 
-            for i in range(b.shape[1]):
-                if factorize:
-                    X[:,i] = self.solver.solve(b[:,i])
+            for cols in _chunks(b.shape[1], self.chunkSize):
+                if factorize and transpose:
+                    X[:, cols] = self.solver.solve(b[:, cols], trans='T')
+                elif factorize:
+                    X[:, cols] = self.solver.solve(b[:, cols])
                 else:
-                    X[:,i] = fun(self.A, b[:,i], **self.kwargs)
+                    X[:, cols] = fun(A, b[:, cols], **self.kwargs).reshape(
+                        (b.shape[0], -1)
+                    )
 
         if self.checkAccuracy:
-            _checkAccuracy(self.A, b, X, self.accuracyTol)
+            _checkAccuracy(A, b, X, self.accuracyTol)
         return X
 
+    def __mul__(self, b):
+        return _solve(self, b)
+
+    def solveT(self, b):
+        """Solve with the transpose of A, reusing the factorization."""
+        return _solve(self, b, transpose=True)
+
     def clean(self):
         if factorize and hasattr(self.solver, 'clean'):
             return self.solver.clean()
 
-    return type(name if name is not None else fun.__name__, (object,), {"__init__": __init__, "clean": clean, "__mul__": __mul__})
+    return type(
+        name if name is not None else fun.__name__, (object,), {
+            "__init__": __init__, "clean": clean, "__mul__": __mul__,
+            "solveT": solveT, "T": property(SolverTranspose),
+            "factorize": factorize
+        }
+    )
 
 
 
-def SolverWrapI(fun, checkAccuracy=True, accuracyTol=1e-5, name=None):
+def SolverWrapI(fun, checkAccuracy=True, accuracyTol=1e-5, blockFun=None, chunkSize=None, name=None):
     """
     Wraps an iterative Solver.
 
     ::
 
-        SolverCG = SolverUtils.SolverWrapI(sp.linalg.cg)
+        SolverCG = SolverUtils.SolverWrapI(sp.linalg.cg, blockFun=blockCG)
+
+    If a blockFun is given, multiple right hand sides are solved together
+    with it, in blocks of at most chunkSize columns (all at once if None).
+    Otherwise fun is called for each column.
 
+    The factorize attribute of the class is False: each product solves the
+    system again.
     """
 
     def __init__(self, A, **kwargs):
@@ -94,27 +147,35 @@ def SolverWrapI(fun, checkAccuracy=True, accuracyTol=1e-5, name=None):
         if "checkAccuracy" in kwargs: del kwargs["checkAccuracy"]
         self.accuracyTol = kwargs.get("accuracyTol", accuracyTol)
         if "accuracyTol" in kwargs: del kwargs["accuracyTol"]
+        self.chunkSize = kwargs.get("chunkSize", chunkSize)
+        if "chunkSize" in kwargs: del kwargs["chunkSize"]
 
         self.kwargs = kwargs
 
-    def __mul__(self, b):
+    def _solve(self, b, transpose=False):
         if type(b) is not np.ndarray:
             raise TypeError('Can only multiply by a numpy array.')
 
+        A = self.A.T if transpose else self.A
+
         if len(b.shape) == 1 or b.shape[1] == 1:
             b = b.flatten()
             # Just one RHS
-            out = fun(self.A, b, **self.kwargs)
+            out = fun(A, b, **self.kwargs)
             if type(out) is tuple and len(out) == 2:
                 # We are dealing with scipy output with an info!
                 X = out[0]
                 self.info = out[1]
             else:
                 X = out
+        elif blockFun is not None: # Multiple RHSs, solved in blocks
+            X = np.empty(b.shape, dtype=np.result_type(A.dtype, b.dtype))
+            for cols in _chunks(b.shape[1], self.chunkSize):
+                X[:, cols], self.info = blockFun(A, b[:, cols], **self.kwargs)
         else: # Multiple RHSs
-            X = np.empty_like(b)
+            X = np.empty(b.shape, dtype=np.result_type(A.dtype, b.dtype))
             for i in range(b.shape[1]):
-                out = fun(self.A, b[:,i], **self.kwargs)
+                out = fun(A, b[:,i], **self.kwargs)
                 if type(out) is tuple and len(out) == 2:
                     # We are dealing with scipy output with an info!
                     X[:,i] = out[0]
@@ -123,20 +184,192 @@ def SolverWrapI(fun, checkAccuracy=True, accuracyTol=1e-5, name=None):
                     X[:,i] = out
 
         if self.checkAccuracy:
-            _checkAccuracy(self.A, b, X, self.accuracyTol)
+            _checkAccuracy(A, b, X, self.accuracyTol)
         return X
 
+    def __mul__(self, b):
+        return _solve(self, b)
+
+    def solveT(self, b):
+        """Solve with the transpose of A."""
+        return _solve(self, b, transpose=True)
+
     def clean(self):
         pass
 
-    return type(name if name is not None else fun.__name__, (object,), {"__init__": __init__, "clean": clean, "__mul__": __mul__})
+    return type(
+        name if name is not None else fun.__name__, (object,), {
+            "__init__": __init__, "clean": clean, "__mul__": __mul__,
+            "solveT": solveT, "T": property(SolverTranspose),
+            "factorize": False
+        }
+    )
+
+
+def _blockKrylovOpts(kwargs):
+    """tolerance, maxiter and preconditioner from scipy style kwargs"""
+    tol = kwargs.get('rtol', kwargs.get('tol', 1e-5))
+    maxiter = kwargs.get('maxiter', None)
+    M = kwargs.get('M', None)
+    if M is None:
+        return tol, maxiter, lambda R: R
+    if not callable(M):
+        M = M.__mul__ if not hasattr(M, 'dot') else M.dot
+    return tol, maxiter, lambda R, M=M: np.reshape(M(R), R.shape)
+
+
+def _blockDot(U, V):
+    """U^H V for blocks of column vectors"""
+    return U.conj().T.dot(V)
+
+
+def _blockLsq(G, H):
+    """Solve the small block system G X = H (least squares if singular)"""
+    return np.linalg.lstsq(G, H, rcond=-1)[0]
+
+
+def blockCG(A, B, **kwargs):
+    """
+    Block preconditioned conjugate gradient for all columns of B together
+    (O'Leary, 1980). Converged columns are deflated by restarting on the
+    remaining columns.
+
+    :param A: Hermitian positive definite matrix or operator
+    :param numpy.ndarray B: right hand sides (n, nRHS)
+    :param float tol: relative tolerance on each column (also rtol)
+    :param int maxiter: maximum number of iterations
+    :param M: preconditioner, matrix or callable
+    :rtype: tuple
+    :return: (X, info), info is 0 if all columns converged
+    """
+    tol, maxiter, M = _blockKrylovOpts(kwargs)
+    n, nrhs = B.shape
+    maxiter = 10*n if maxiter is None else maxiter
+    X = np.zeros(B.shape, dtype=np.result_type(A.dtype, B.dtype))
+    bnorm = np.linalg.norm(B, axis=0)
+    bnorm[bnorm == 0] = 1.
+    active = np.arange(nrhs)
+
+    it = 0
+    while it < maxiter:
+        # (re)start on the columns that have not converged
+        R = B[:, active] - A.dot(X[:, active])
+        done = np.linalg.norm(R, axis=0) <= tol*bnorm[active]
+        active, R = active[~done], R[:, ~done]
+        if active.size == 0:
+            return X, 0
+        Z = M(R)
+        P = Z
+        ZR = _blockDot(Z, R)
+        while it < maxiter:
+            it += 1
+            Q = A.dot(P)
+            alpha = _blockLsq(_blockDot(P, Q), ZR)
+            X[:, active] += P.dot(alpha)
+            R = R - Q.dot(alpha)
+            done = np.linalg.norm(R, axis=0) <= tol*bnorm[active]
+            if np.any(done):
+                break
+            Z = M(R)
+            ZR, ZR_old = _blockDot(Z, R), ZR
+            P = Z + P.dot(_blockLsq(ZR_old, ZR))
+    return X, it
+
+
+def blockBiCGStab(A, B, **kwargs):
+    """
+    Block BiCGStab for all columns of B together (Guennouni, Jbilou and
+    Sadok, 2003), right preconditioned with M. Converged columns are
+    deflated by restarting on the remaining columns.
+
+    :param A: matrix or operator
+    :param numpy.ndarray B: right hand sides (n, nRHS)
+    :param float tol: relative tolerance on each column (also rtol)
+    :param int maxiter: maximum number of iterations
+    :param M: preconditioner, matrix or callable
+    :rtype: tuple
+    :return: (X, info), info is 0 if all columns converged
+    """
+    tol, maxiter, M = _blockKrylovOpts(kwargs)
+    n, nrhs = B.shape
+    maxiter = 10*n if maxiter is None else maxiter
+    X = np.zeros(B.shape, dtype=np.result_type(A.dtype, B.dtype))
+    bnorm = np.linalg.norm(B, axis=0)
+    bnorm[bnorm == 0] = 1.
+    active = np.arange(nrhs)
+
+    it = 0
+    while it < maxiter:
+        # (re)start on the columns that have not converged
+        R = B[:, active] - A.dot(X[:, active])
+        done = np.linalg.norm(R, axis=0) <= tol*bnorm[active]
+        active, R = active[~done], R[:, ~done]
+        if active.size == 0:
+            return X, 0
+        R0 = R.copy()
+        P = R
+        while it < maxiter:
+            it += 1
+            MP = M(P)
+            V = A.dot(MP)
+            R0V = _blockDot(R0, V)
+            alpha = _blockLsq(R0V, _blockDot(R0, R))
+            S = R - V.dot(alpha)
+            MS = M(S)
+            T = A.dot(MS)
+            TT = np.vdot(T, T)
+            omega = np.vdot(T, S)/TT if TT != 0 else 0.
+            X[:, active] += MP.dot(alpha) + omega*MS
+            R = S - omega*T
+            done = np.linalg.norm(R, axis=0) <= tol*bnorm[active]
+            if np.any(done) or omega == 0:
+                break
+            beta = _blockLsq(R0V, -_blockDot(R0, T))
+            P = R + (P - omega*V).dot(beta)
+    return X, it
+
+
+class SolverTranspose(object):
+    """
+    Solves with the transpose of the matrix of a solver instance, sharing
+    its factorization.
+
+    ::
+
+        Ainv = SolverLU(A)
+        x = Ainv.T * b  # solves A.T x = b
+
+    The factorization belongs to the parent solver, clean does nothing.
+    """
+
+    def __init__(self, Ainv):
+        self.Ainv = Ainv
+
+    @property
+    def A(self):
+        return self.Ainv.A.T
+
+    @property
+    def T(self):
+        return self.Ainv
+
+    def __mul__(self, b):
+        return self.Ainv.solveT(b)
+
+    def clean(self):
+        pass
 
 
 from scipy.sparse import linalg
 Solver   = SolverWrapD(linalg.spsolve, factorize=False, name="Solver")
 SolverLU = SolverWrapD(linalg.splu, factorize=True, name="SolverLU")
-SolverCG = SolverWrapI(linalg.cg, name="SolverCG")
-SolverBiCG = SolverWrapI(linalg.bicgstab, name="SolverBiCG")
+SolverCG = SolverWrapI(linalg.cg, blockFun=blockCG, name="SolverCG")
+SolverBiCG = SolverWrapI(linalg.bicgstab, blockFun=blockBiCGStab, name="SolverBiCG")
+#: Incomplete LU factorization, an inexpensive approximate inverse (e.g. as
+#: a preconditioner), so the accuracy of the solves is not checked.
+SolverILU = SolverWrapD(
+    linalg.spilu, factorize=True, checkAccuracy=False, name="SolverILU"
+)
 
 class SolverDiag(object):
     """docstring for SolverDiag"""
@@ -159,6 +392,13 @@ class SolverDiag(object):
         elif nrhs > 1:
             return x.reshape((n,nrhs), order='F')
 
+    def solveT(self, rhs):
+        return self * rhs
+
+    @property
+    def T(self):
+        return self
+
     def _solve1(self, rhs):
         return rhs.flatten()/self._diagonal
 
@@ -169,3 +409,192 @@ class SolverDiag(object):
 
     def clean(self):
         pass
+
+
+def factorMemory(Ainv):
+    """
+    Estimate of the memory (in bytes) held by a solver instance.
+
+    For a wrapped LU factorization this is the size of the factors, from
+    their number of nonzeros (reading the L and U attributes of a SuperLU
+    object would make it keep copies of the factors), otherwise the size of
+    the stored system matrix is used.
+
+    :param Ainv: solver instance, e.g. SolverLU(A)
+    :rtype: int
+    :return: memory in bytes
+    """
+    solver = getattr(Ainv, 'solver', None)
+    A = getattr(Ainv, 'A', None)
+    nnz = getattr(solver, 'nnz', None)
+    if nnz is not None and sp.issparse(A):
+        indexSize = np.dtype(np.intc).itemsize
+        return (
+            int(nnz) * (A.dtype.itemsize + indexSize) +
+            2 * (A.shape[1] + 1) * indexSize
+        )
+    if sp.issparse(A):
+        A = A.tocsc()
+        return A.data.nbytes + A.indices.nbytes + A.indptr.nbytes
+    return 0
+
+
+class FactorCache(object):
+    """
+    Least recently used store of solver instances (factorizations) for a
+    single model. Each solver is stored under the key of the system it
+    solves (e.g. a frequency or a time step) so that it can be shared by
+    fields, Jvec and Jtvec.
+
+    ::
+
+        cache = SolverUtils.FactorCache(maxMemory=4e9)
+        cache.setModel(m)
+        Ainv = cache.get(freq)
+        if Ainv is None:
+            Ainv = SolverLU(A)
+            cache.add(freq, Ainv)
+        u = Ainv * rhs
+        cache.release(freq, Ainv)
+
+    Solvers that do not fit in maxMemory are not stored, :code:`release`
+    cleans them. A maxMemory of None removes the limit. A solver taken with
+    :code:`get` (or :code:`add`) stays valid until it is released, even if
+    the model changes in the meantime. The cache can be shared by threads;
+    it is emptied when pickled.
+    """
+
+    def __init__(self, maxMemory=None):
+        self.maxMemory = maxMemory
+        self.model = None
+        self.modelVersion = 0
+        self.hits = 0
+        self.misses = 0
+        self._solvers = OrderedDict()
+        self._nbytes = {}
+        self._inUse = {}
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        # factorizations can not be pickled (e.g. to worker processes)
+        state = self.__dict__.copy()
+        state.update(
+            _solvers=OrderedDict(), _nbytes={}, _inUse={}, _lock=None
+        )
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._solvers)
+
+    def __contains__(self, key):
+        return key in self._solvers
+
+    @property
+    def nbytes(self):
+        """Memory (in bytes) held by the stored solvers."""
+        return sum(self._nbytes.values())
+
+    def setModel(self, m):
+        """
+        Bind the cache to the model m. If m differs from the current model,
+        all stored solvers are cleaned.
+
+        :param numpy.ndarray m: model
+        :rtype: bool
+        :return: True if the model changed
+        """
+        with self._lock:
+            if m is None and self.model is None:
+                return False
+            if (
+                m is not None and self.model is not None and
+                self.model.shape == np.shape(m) and np.all(self.model == m)
+            ):
+                return False
+            self.clear()
+            self.model = None if m is None else np.array(m, copy=True)
+            self.modelVersion += 1
+            return True
+
+    def get(self, key):
+        """Stored solver for key, None if it is not in the cache."""
+        with self._lock:
+            Ainv = self._solvers.get(key, None)
+            if Ainv is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._solvers.pop(key)
+            self._solvers[key] = Ainv  # most recently used
+            self._inUse[key] += 1
+            return Ainv
+
+    def peek(self, key):
+        """Stored solver for key (or None), without taking it into use."""
+        with self._lock:
+            return self._solvers.get(key, None)
+
+    def add(self, key, Ainv):
+        """
+        Store Ainv under key, evicting the least recently used solvers to
+        stay within maxMemory. Solvers that are in use (not yet released)
+        are not evicted.
+
+        :rtype: bool
+        :return: True if Ainv was stored
+        """
+        with self._lock:
+            if self.maxMemory is not None and self.maxMemory <= 0:
+                return False
+            nbytes = factorMemory(Ainv)
+            if self.maxMemory is not None and nbytes > self.maxMemory:
+                return False
+            if self._inUse.get(key, 0) == 0:
+                self.remove(key)
+            free = [k for k in self._solvers if self._inUse[k] == 0]
+            while (
+                self.maxMemory is not None and len(free) > 0 and
+                self.nbytes + nbytes > self.maxMemory
+            ):
+                self.remove(free.pop(0))
+            if (
+                key in self._solvers or (
+                    self.maxMemory is not None and
+                    self.nbytes + nbytes > self.maxMemory
+                )
+            ):
+                return False
+            self._solvers[key] = Ainv
+            self._nbytes[key] = nbytes
+            self._inUse[key] = 1
+            return True
+
+    def release(self, key, Ainv):
+        """Clean Ainv, unless it is the solver stored under key."""
+        with self._lock:
+            if self._solvers.get(key, None) is not Ainv:
+                Ainv.clean()
+            elif self._inUse[key] > 0:
+                self._inUse[key] -= 1
+
+    def remove(self, key):
+        """
+        Remove the solver stored under key and clean it, unless it is in
+        use: :code:`release` then cleans it.
+        """
+        with self._lock:
+            Ainv = self._solvers.pop(key, None)
+            self._nbytes.pop(key, None)
+            inUse = self._inUse.pop(key, 0)
+            if Ainv is not None and inUse == 0:
+                Ainv.clean()
+
+    def clear(self):
+        """Remove and clean all stored solvers."""
+        with self._lock:
+            for key in list(self._solvers.keys()):
+                self.remove(key)
@@ -3,7 +3,7 @@ from .matutils import (mkvc, sdiag, sdInv, speye, kron3, spzeros, ddx, av,
                        avExtrap, ndgrid, ind2sub, sub2ind, getSubArray,
                        inv3X3BlockDiagonal, inv2X2BlockDiagonal, TensorType,
                        makePropertyTensor, invPropertyTensor, diagEst, Zero,
-                       Identity)
+                       Identity, transposeOperator)
 from .codeutils import (memProfileWrapper, hook, setKwargs,
                         printTitles, printLine, checkStoppers, printStoppers,
                         callHooks, dependentProperty,
@@ -13,6 +13,7 @@ from .meshutils import (exampleLrmGrid, meshTensor, closestPoints,
 from .curvutils import volTetra, faceInfo, indexCube
 from .interputils import interpmat
 from .CounterUtils import Counter, count, timeIt
+from .parallelutils import parallelMap, openPool
 from . import ModelBuilder
 from . import SolverUtils
 from .coordutils import rotatePointsFromNormals, rotationMatrixFromNormals
@@ -178,3 +178,106 @@ def remoteDownload(url, remoteFiles, basePath=None):
 
     print("Download completed!")
     return basePath
+
+
+def readUBCtable(fileName, nHeader=0, countInHeader=False, cache=False,
+                 chunkSize=100000):
+    """
+    Read a whitespace delimited table of numbers (UBC observation or model
+    file) after nHeader header lines.
+
+    The rows are parsed in bulk by numpy.loadtxt, chunkSize rows at a time.
+    Rows with fewer columns than the others are padded with nan.
+
+    If cache, the header and table are also saved next to the file
+    (fileName.npz) and read from there for as long as the file is
+    unchanged, so that the text is parsed only once.
+
+    :param str fileName: file to read
+    :param int nHeader: number of header lines
+    :param bool countInHeader: the last header line starts with the number
+        of rows to read, otherwise all of the rows are read
+    :param bool cache: read from or write to the binary copy
+    :param int chunkSize: number of rows parsed at a time
+    :rtype: tuple
+    :return: header (list of str), table (nRow-by-nCol numpy.ndarray)
+    """
+    import itertools
+    import os
+
+    cacheFile = fileName + '.npz'
+    stamp = np.r_[os.stat(fileName).st_size, os.stat(fileName).st_mtime]
+    if cache and os.path.isfile(cacheFile):
+        with np.load(cacheFile) as stored:
+            if np.array_equal(stored['stamp'], stamp):
+                return list(stored['header']), stored['table']
+
+    with open(fileName, 'r') as fid:
+        header = [fid.readline() for ii in range(nHeader)]
+        nRow = None
+        if countInHeader:
+            nRow = int(float(header[-1].split()[0]))
+
+        chunks = []
+        nRead = 0
+        while nRow is None or nRead < nRow:
+            size = chunkSize if nRow is None else min(chunkSize, nRow - nRead)
+            lines = list(itertools.islice(fid, size))
+            if len(lines) == 0:
+                break
+            lines = [line for line in lines if line.strip()]
+            if len(lines) > 0:
+                chunks.append(_parseRows(lines))
+                nRead += chunks[-1].shape[0]
+
+    nCol = max([chunk.shape[1] for chunk in chunks] + [0])
+    table = np.full((nRead, nCol), np.nan)
+    start = 0
+    for chunk in chunks:
+        table[start:start+chunk.shape[0], :chunk.shape[1]] = chunk
+        start += chunk.shape[0]
+
+    if cache:
+        np.savez(cacheFile, header=np.array(header), table=table, stamp=stamp)
+
+    return header, table
+
+
+def _parseRows(lines):
+    """Parse lines of numbers, padding short rows with nan"""
+    try:
+        return np.loadtxt(lines, ndmin=2)
+    except ValueError:
+        rows = [np.array(line.split(), dtype=float) for line in lines]
+        table = np.full((len(rows), max(len(row) for row in rows)), np.nan)
+        for ii, row in enumerate(rows):
+            table[ii, :len(row)] = row
+        return table
+
+
+def writeUBCtable(fileName, header, table, fmt='%e', cache=False,
+                  chunkSize=100000):
+    """
+    Write a table of numbers (UBC observation or model file) after the
+    header lines, chunkSize rows at a time.
+
+    If cache, the binary copy read by :code:`readUBCtable` is written too.
+
+    :param str fileName: file to write
+    :param list header: header lines (str, ending with a newline)
+    :param numpy.ndarray table: nRow-by-nCol table
+    :param str fmt: format of the numbers
+    :param bool cache: write the binary copy
+    """
+    import os
+
+    with open(fileName, 'w') as fid:
+        fid.write(''.join(header))
+        for start in range(0, table.shape[0], chunkSize):
+            np.savetxt(fid, table[start:start+chunkSize], fmt=fmt,
+                       delimiter=' ', newline='\n')
+
+    if cache:
+        stamp = np.r_[os.stat(fileName).st_size, os.stat(fileName).st_mtime]
+        np.savez(fileName + '.npz', header=np.array(header), table=table,
+                 stamp=stamp)
@@ -1,6 +1,7 @@
 from __future__ import division
 import numpy as np
 import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator
 from discretize.utils import Zero, Identity
 
 
@@ -466,3 +467,23 @@ def diagEst(matFun, n, k=None, approach='Probing'):
     d = Mv/vv
 
     return d
+
+
+def transposeOperator(A):
+    """
+    Transpose of a real LinearOperator A that defines _matvec and
+    _rmatvec, as a LinearOperator. Use it for _transpose and _adjoint of
+    LinearOperator subclasses, as scipy < 1.4 has no default for them::
+
+        def _transpose(self):
+            return Utils.transposeOperator(self)
+        _adjoint = _transpose
+
+    :param LinearOperator A: operator
+    :rtype: scipy.sparse.linalg.LinearOperator
+    :return: A.T
+    """
+    return LinearOperator(
+        (A.shape[1], A.shape[0]), matvec=A._rmatvec, rmatvec=A._matvec,
+        dtype=A.dtype
+    )
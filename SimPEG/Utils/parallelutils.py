@@ -0,0 +1,71 @@
+from __future__ import print_function, division
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+
+def openPool(nWorkers, pool='thread'):
+    """
+        Pool of nWorkers workers, to map over several groups of items
+        with :code:`parallelMap` without starting new workers each time.
+        Close it (close and join) when done.
+
+        :param int nWorkers: number of workers, None uses all cores
+        :param str pool: 'thread' or 'process'
+        :rtype: multiprocessing.pool.Pool
+    """
+    if nWorkers is None:
+        nWorkers = multiprocessing.cpu_count()
+    if pool == 'thread':
+        return ThreadPool(nWorkers)
+    elif pool == 'process':
+        return multiprocessing.Pool(nWorkers)
+    raise ValueError(
+        "pool must be 'thread' or 'process', not {0!s}".format(pool)
+    )
+
+
+def parallelMap(fun, items, nWorkers=1, pool='thread'):
+    """
+        Apply fun to each of the items with a pool of workers and return
+        the results in the order of the items.
+
+        :param callable fun: function of a single item
+        :param list items: items to map over
+        :param int nWorkers: number of workers, None uses all cores and
+            1 runs serially in the calling thread
+        :param pool: 'thread', 'process', or a pool from :code:`openPool`
+            (then nWorkers is ignored and the pool is left open)
+        :rtype: list
+        :return: [fun(item) for item in items]
+
+        Threads share memory (e.g. factorizations of the problem) and pay
+        off when fun spends its time in code that releases the GIL, such
+        as sparse factorizations and solves. With processes, fun and the
+        items are pickled to the workers, so fun must be picklable (a
+        module level function, or a method of a picklable object).
+
+        For example::
+
+            Jv = parallelMap(partial(prob._JvecFreq, v=v, f=f),
+                             prob.survey.freqs, nWorkers=4)
+    """
+    items = list(items)
+    if hasattr(pool, 'map'):
+        return pool.map(fun, items, chunksize=1)
+
+    if nWorkers is None:
+        nWorkers = multiprocessing.cpu_count()
+    nWorkers = min(nWorkers, len(items))
+
+    if nWorkers <= 1:
+        return [fun(item) for item in items]
+
+    workers = openPool(nWorkers, pool)
+    try:
+        out = workers.map(fun, items, chunksize=1)
+    except:
+        workers.terminate()
+        raise
+    workers.close()
+    workers.join()
+    return out
@@ -4,7 +4,7 @@ from SimPEG import Utils
 from SimPEG.Utils import mkvc
 from SimPEG.Utils.SolverUtils import (
     _checkAccuracy, SolverWrapD, SolverWrapI,
-    Solver, SolverCG, SolverDiag, SolverLU, SolverBiCG,
+    Solver, SolverCG, SolverDiag, SolverLU, SolverBiCG, SolverILU,
 )
 
 import discretize as Mesh
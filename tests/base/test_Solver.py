@@ -1,5 +1,5 @@
 import unittest
-from SimPEG import Mesh, Solver, SolverDiag, SolverCG, SolverLU, Utils
+from SimPEG import Mesh, Solver, SolverDiag, SolverCG, SolverBiCG, SolverLU, Utils
 from discretize import TensorMesh
 from SimPEG.Utils import sdiag
 import numpy as np
@@ -53,6 +53,116 @@ class TestSolver(unittest.TestCase):
     def test_iterative_cg_1(self): self.assertLess(dotest(SolverCG, False),TOLI)
     def test_iterative_cg_M(self): self.assertLess(dotest(SolverCG, True),TOLI)
 
+    def test_iterative_bicg_1(self): self.assertLess(dotest(SolverBiCG, False),TOLI)
+    def test_iterative_bicg_M(self): self.assertLess(dotest(SolverBiCG, True),TOLI)
+
+    def test_direct_spsolve_chunk(self): self.assertLess(dotest(Solver, False, chunkSize=2),TOLD)
+    def test_direct_splu_chunk(self): self.assertLess(dotest(SolverLU, False, chunkSize=2),TOLD)
+    def test_iterative_cg_chunk(self): self.assertLess(dotest(SolverCG, False, chunkSize=2),TOLI)
+    def test_iterative_bicg_chunk(self): self.assertLess(dotest(SolverBiCG, False, chunkSize=2),TOLI)
+
+    def test_transpose_splu(self): self.assertLess(dotestT(SolverLU), TOLD)
+    def test_transpose_spsolve(self): self.assertLess(dotestT(Solver), TOLD)
+    def test_transpose_diag(self): self.assertLess(dotestT(SolverDiag, A=Utils.sdiag(np.random.rand(10)+1.0)), TOLD)
+
+    def test_transpose_cached(self):
+        A = sparse.diags([np.ones(9), 4.*np.ones(10), np.ones(8)], [1, 0, -2])
+        b = np.ones(10)
+
+        # the factorization solves with A^T, it is only built to check
+        Ainv = SolverLU(A, checkAccuracy=False)
+        Ainv.solveT(b)
+        self.assertTrue(getattr(Ainv, '_AT', None) is None)
+
+        for Ainv in [SolverLU(A), Solver(A)]:
+            x = Ainv.solveT(b)
+            AT = Ainv._AT
+            self.assertTrue(np.allclose(A.T * x, b))
+            Ainv.solveT(b)
+            self.assertTrue(Ainv._AT is AT)
+
+
+def dotestT(MYSOLVER, A=None):
+    if A is None:
+        M = TensorMesh([np.ones(8)*100., np.ones(8)*100.])
+        A = M.faceDiv*M.getFaceInnerProduct()*M.faceDiv.T
+        A = A + sparse.diags(np.ones(M.nC - 1), 1)  # make A non-symmetric
+    Ainv = MYSOLVER(A)
+    e = np.ones((A.shape[0], numRHS))
+    x = Ainv.T * (A.T * e)
+    Ainv.clean()
+    return np.linalg.norm(e-x, np.inf)
+
+
+class TestFactorCache(unittest.TestCase):
+
+    def setUp(self):
+        M = TensorMesh([np.ones(10)*100., np.ones(10)*100.])
+        A = M.faceDiv*M.getFaceInnerProduct()*M.faceDiv.T
+        A[-1,-1] += 1.
+        self.A = A
+
+    def test_model_invalidates(self):
+        cache = Utils.SolverUtils.FactorCache()
+        cache.setModel(np.ones(4))
+        Ainv = SolverLU(self.A)
+        self.assertTrue(cache.add(0, Ainv))
+        self.assertTrue(cache.get(0) is Ainv)
+        self.assertFalse(cache.setModel(np.ones(4)))
+        self.assertTrue(0 in cache)
+        self.assertTrue(cache.setModel(np.zeros(4)))
+        self.assertEqual(len(cache), 0)
+
+    def test_memory_budget(self):
+        nbytes = Utils.SolverUtils.factorMemory(SolverLU(self.A))
+        self.assertGreater(nbytes, 0)
+        cache = Utils.SolverUtils.FactorCache(maxMemory=1.5*nbytes)
+        for key in range(3):
+            Ainv = SolverLU(self.A)
+            cache.add(key, Ainv)
+            cache.release(key, Ainv)
+        self.assertEqual(len(cache), 1)
+        self.assertTrue(2 in cache)
+        # solvers in use are not evicted
+        Ainv = cache.get(2)
+        self.assertFalse(cache.add(3, SolverLU(self.A)))
+        cache.release(2, Ainv)
+        self.assertTrue(cache.add(3, SolverLU(self.A)))
+        self.assertFalse(Utils.SolverUtils.FactorCache(0).add(0, SolverLU(self.A)))
+
+    def test_factorMemory(self):
+        Ainv = SolverLU(self.A)
+        nnz = Ainv.solver.nnz
+
+        class Factors(object):
+            """SuperLU stand-in whose factors must not be read"""
+            def __init__(self, nnz):
+                self.nnz = nnz
+
+            @property
+            def L(self):
+                raise AssertionError('L read')
+            U = L
+
+        Ainv.solver = Factors(nnz)
+        nbytes = Utils.SolverUtils.factorMemory(Ainv)
+        self.assertGreaterEqual(nbytes, nnz * (8 + 4))
+        self.assertLessEqual(nbytes, nnz * (8 + 4) + 8 * (self.A.shape[0] + 1))
+
+    def test_model_update_in_use(self):
+        cache = Utils.SolverUtils.FactorCache()
+        cache.setModel(np.ones(4))
+        Ainv = SolverLU(self.A)
+        cache.add(0, Ainv)
+        cleaned = []
+        Ainv.clean = lambda: cleaned.append(0)
+        # dropped from the cache, but left to its holder
+        cache.setModel(np.zeros(4))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cleaned, [])
+        cache.release(0, Ainv)
+        self.assertEqual(cleaned, [0])
+
 
 
 if __name__ == '__main__':
@@ -51,6 +51,41 @@ class TestOptimizers(unittest.TestCase):
         print('x_true: ', x_true)
         self.assertTrue(np.linalg.norm(xopt-x_true,2) < TOL, True)
 
+    def test_BFGS_Rosenbrock(self):
+        for dtype in [np.float64, np.float32]:
+            opt = Optimization.BFGS(maxIter=100, bfgsDtype=dtype)
+            xopt = opt.minimize(Rosenbrock, np.array([0., 0.]))
+            x_true = np.array([1., 1.])
+            print('xopt: ', xopt)
+            print('x_true: ', x_true)
+            self.assertTrue(np.linalg.norm(xopt-x_true, 2) < TOL, True)
+
+    def test_bfgs_twoLoop(self):
+        n, nbfgs = 6, 3
+        A = np.random.randn(n, n)
+        A = A.dot(A.T) + n*np.eye(n)
+        opt = Optimization.BFGS(nbfgs=nbfgs)
+        opt.xc = np.random.randn(n)
+        opt._startup_BFGS(opt.xc)
+        opt.iter, opt.g_last = 1, A.dot(opt.xc)
+
+        H = np.eye(n)
+        pairs = []
+        for i in range(5):
+            opt.x_last, opt.xc = opt.xc, opt.xc + np.random.randn(n)
+            opt.g = A.dot(opt.xc)
+            pairs.append((opt.xc - opt.x_last, opt.g - opt.g_last))
+            opt._doEndIteration_BFGS(None)
+
+        # dense BFGS update of the inverse Hessian with the last nbfgs pairs
+        for s, y in pairs[-nbfgs:]:
+            rho = 1./y.dot(s)
+            V = np.eye(n) - rho*np.outer(y, s)
+            H = V.T.dot(H).dot(V) + rho*np.outer(s, s)
+
+        d = np.random.randn(n)
+        self.assertTrue(np.allclose(opt.bfgs(d), H.dot(d)))
+
     def test_NewtonRoot(self):
         fun = lambda x, return_g=True: np.sin(x) if not return_g else ( np.sin(x), sdiag( np.cos(x) ) )
         x = np.array([np.pi-0.3, np.pi+0.1, 0])
@@ -1,6 +1,10 @@
 import unittest
-from SimPEG import Mesh, Problem, Maps
+from SimPEG import Mesh, Problem, Maps, Utils
+from SimPEG import Survey, DataMisfit, Regularization, Optimization
+from SimPEG import InvProblem, SolverLU
 import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg
 
 
 class TestTimeProblem(unittest.TestCase):
@@ -34,5 +38,193 @@ class TestTimeProblem(unittest.TestCase):
             self.prob.mapping = Maps.IdentityMap(self.mesh)
 
 
+class TestFactorCache(unittest.TestCase):
+
+    def setUp(self):
+        mesh = Mesh.TensorMesh([10, 10])
+        self.prob = Problem.BaseProblem(mesh)
+        self.A = Utils.sdiag(np.random.rand(mesh.nC) + 1.0)
+        self.nFactor = 0
+
+    def getA(self):
+        self.nFactor += 1
+        return self.A
+
+    def test_getAinv_reuse(self):
+        self.prob.maxFactorMemory = None
+        Ainv = self.prob.getAinv(1., self.getA)
+        self.prob.cleanAinv(1., Ainv)
+        self.assertTrue(self.prob.getAinv(1., self.getA) is Ainv)
+        self.assertEqual(self.nFactor, 1)
+
+    def test_getAinv_off(self):
+        Ainv = self.prob.getAinv(1., self.getA)
+        self.prob.cleanAinv(1., Ainv)
+        self.prob.getAinv(1., self.getA)
+        self.assertEqual(self.nFactor, 2)
+
+    def test_getAinv_model_update(self):
+        self.prob.maxFactorMemory = None
+        self.prob.model = np.ones(3)
+        Ainv = self.prob.getAinv(1., self.getA)
+        self.prob.cleanAinv(1., Ainv)
+        self.assertTrue(self.prob.factorMemory > 0)
+
+        self.prob.model = np.ones(3)  # same model, keep the factorization
+        self.assertTrue(self.prob.factorCache.peek(1.) is Ainv)
+
+        self.prob.model = np.zeros(3)
+        self.assertTrue(self.prob.factorCache.peek(1.) is None)
+        self.assertEqual(self.prob.factorMemory, 0)
+        self.prob.getAinv(1., self.getA)
+        self.assertEqual(self.nFactor, 2)
+
+
+class CountingSurvey(Survey.LinearSurvey):
+
+    nEval = 0
+
+    def eval(self, f):
+        self.nEval += 1
+        return f
+
+
+class TestDpredCache(unittest.TestCase):
+
+    def setUp(self):
+        mesh = Mesh.TensorMesh([20])
+        G = np.random.randn(5, mesh.nC)
+        self.prob = Problem.LinearProblem(mesh, G=G)
+        self.survey = CountingSurvey()
+        self.survey.pair(self.prob)
+        self.survey.dobs = np.random.randn(5)
+        self.survey.std = 0.05
+        self.dmis = DataMisfit.l2_DataMisfit(self.survey)
+        reg = Regularization.Tikhonov(mesh)
+        reg.mref = np.zeros(mesh.nC)
+        opt = Optimization.InexactGaussNewton(maxIter=1)
+        self.invProb = InvProblem.BaseInvProblem(self.dmis, reg, opt)
+
+    def test_evalFunction_single_eval(self):
+        m = np.random.rand(self.prob.mesh.nC)
+        self.invProb.startup(m)
+        phi, g, H = self.invProb.evalFunction(m)
+        self.assertEqual(self.survey.nEval, 1)
+
+        R = self.dmis.Wd * (self.prob.G.dot(m) - self.survey.dobs)
+        self.assertTrue(np.allclose(self.invProb.dpred, self.prob.G.dot(m)))
+        self.assertTrue(np.allclose(self.invProb.phi_d, 0.5*R.dot(R)))
+        self.assertTrue(np.allclose(
+            g - self.invProb.beta * self.invProb.reg.evalDeriv(m),
+            self.prob.G.T.dot(self.dmis.Wd * R)
+        ))
+
+    def test_model_update(self):
+        m = np.random.rand(self.prob.mesh.nC)
+        f = self.prob.fields(m)
+        d = self.survey.dpred(m, f=f)
+        d[:] = 0.  # callers get a copy of the cached data
+        self.assertTrue(np.allclose(self.survey.dpred(m, f=f), f))
+        self.assertEqual(self.survey.nEval, 1)
+
+        self.prob.model = m
+        self.survey.dpred(m, f=f)
+        self.assertEqual(self.survey.nEval, 2)
+
+        self.survey.dpred(m, f=self.prob.fields(m))
+        self.assertEqual(self.survey.nEval, 3)
+
+
+class TestBfgsH0(unittest.TestCase):
+
+    def setUp(self):
+        mesh = Mesh.TensorMesh([10, 10])
+        prob = Problem.LinearProblem(mesh, G=np.random.randn(5, mesh.nC))
+        survey = Survey.LinearSurvey()
+        survey.pair(prob)
+        survey.dobs = np.random.randn(5)
+        self.reg = Regularization.Tikhonov(mesh)
+        opt = Optimization.InexactGaussNewton(maxIter=1)
+        dmis = DataMisfit.l2_DataMisfit(survey)
+        self.invProb = InvProblem.BaseInvProblem(dmis, self.reg, opt)
+        self.invProb.bfgsH0Solver = self.Solver
+        self.nFactor = 0
+
+    def Solver(self, A, **kwargs):
+        self.nFactor += 1
+        return SolverLU(A, **kwargs)
+
+    def test_reuse(self):
+        m0 = np.random.rand(self.reg.mapping.nP)
+        self.invProb.startup(m0)
+        self.assertEqual(self.nFactor, 0)  # built when first used
+        H0 = self.invProb.opt.bfgsH0
+        self.assertEqual(self.nFactor, 1)
+
+        H = self.reg.eval2Deriv(m0)
+        v = np.random.rand(m0.size)
+        self.assertTrue(np.allclose(H * (H0 * v), v))
+
+        self.invProb.beta = 1e-3  # the Hessian is independent of beta
+        self.invProb.updateBfgsH0()
+        self.assertTrue(self.invProb.opt.bfgsH0 is H0)
+        self.assertEqual(self.nFactor, 1)
+
+        self.reg.alpha_s = 10.
+        self.invProb.updateBfgsH0()
+        self.assertEqual(self.nFactor, 1)
+        H = self.reg.eval2Deriv(m0)
+        self.assertTrue(np.allclose(H * (self.invProb.opt.bfgsH0 * v), v))
+        self.assertEqual(self.nFactor, 2)
+
+    def test_approxHinv(self):
+        m0 = np.random.rand(self.reg.mapping.nP)
+        self.invProb.startup(m0)
+        H0 = self.invProb.opt.bfgsH0
+
+        # bfgsH0 is not used with approxHinv, so it is not updated
+        self.invProb.opt.approxHinv = sp.identity(m0.size)
+        self.reg.alpha_s = 10.
+        self.invProb.updateBfgsH0()
+        self.assertTrue(self.invProb.opt.bfgsH0 is H0)
+        self.assertEqual(self.nFactor, 1)
+
+    def test_problemSolver(self):
+        m0 = np.random.rand(self.reg.mapping.nP)
+        self.invProb.bfgsH0Solver = None
+        self.invProb.startup(m0)
+
+        # the Solver of the problem does not factorize: SolverLU is used
+        self.assertFalse(self.invProb.prob.Solver.factorize)
+        self.assertTrue(isinstance(self.invProb.opt.bfgsH0, SolverLU))
+
+        # a factorizing Solver of the problem is used
+        self.invProb.prob.Solver = Utils.SolverUtils.SolverILU
+        self.reg.alpha_s = 10.
+        self.invProb.updateBfgsH0()
+        self.assertTrue(isinstance(
+            self.invProb.opt.bfgsH0, Utils.SolverUtils.SolverILU
+        ))
+
+    def test_defaultNoResolve(self):
+        nSolve = []
+
+        def spsolve(A, b):
+            nSolve.append(1)
+            return sp.linalg.spsolve(A, b)
+
+        m0 = np.random.rand(self.reg.mapping.nP)
+        self.invProb.bfgsH0Solver = None
+        self.invProb.prob.Solver = Utils.SolverUtils.SolverWrapD(
+            spsolve, factorize=False
+        )
+        self.invProb.startup(m0)
+
+        H = self.reg.eval2Deriv(m0)
+        for _ in range(3):
+            v = np.random.rand(m0.size)
+            self.assertTrue(np.allclose(H * (self.invProb.opt.bfgsH0 * v), v))
+        self.assertEqual(len(nSolve), 0)
+
 if __name__ == '__main__':
     unittest.main()
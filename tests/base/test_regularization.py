@@ -113,6 +113,75 @@ class RegularizationTests(unittest.TestCase):
 
                 assert (regmesh.vol == mesh.vol[indAct]).all()
 
+        def test_regularizationMesh_cache(self):
+
+            mesh = self.meshlist[2]
+            indAct = Utils.mkvc(mesh.gridCC[:,-1] <= 0.5)
+            regmesh = Regularization.RegularizationMesh(mesh, indActive=indAct)
+
+            Dx = regmesh.cellDiffx
+            self.assertEqual(Dx.format, 'csr')
+            nMiss = regmesh.cacheMisses  # cellDiffx, _Pafx and _Pac
+            self.assertEqual(nMiss, 3)
+
+            self.assertTrue(regmesh.cellDiffx is Dx)
+            regmesh.aveCC2Fx
+            self.assertEqual(regmesh.cacheMisses, nMiss + 2)
+            self.assertTrue(regmesh.cacheHits >= 3)
+
+            regmesh.indActive = None
+            self.assertEqual(regmesh.nC, mesh.nC)
+            self.assertEqual(regmesh.cellDiffx.shape, (mesh.nFx, mesh.nC))
+
+        def test_regularizationMesh_stencils(self):
+
+            for mesh in self.meshlist:
+                indAct = np.random.rand(mesh.nC) > 0.3
+                for ind in [None, indAct]:
+                    regmesh = Regularization.RegularizationMesh(mesh, indActive=ind)
+                    v = np.random.rand(regmesh.nC)
+                    for comp in 'xyz'[:mesh.dim]:
+                        for stencil in [True, False]:
+                            D = getattr(regmesh, 'cellDiff' + comp + ('Stencil' if stencil else ''))
+                            w = np.random.rand(D.shape[0])
+                            self.assertTrue(np.allclose(
+                                regmesh.cellDiffVec(comp, v, stencil=stencil), D*v
+                            ))
+                            self.assertTrue(np.allclose(
+                                regmesh.cellDiffVec(comp, w, stencil=stencil, adjoint=True), D.T*w
+                            ))
+                        A = getattr(regmesh, 'aveCC2F' + comp)
+                        self.assertTrue(np.allclose(regmesh.aveCC2FVec(comp, v), A*v))
+
+        def test_matrixFree(self):
+
+            mesh = self.meshlist[2]
+            indAct = np.random.rand(mesh.nC) > 0.3
+            nC = indAct.sum()
+            model = np.random.rand(nC)
+            for R in ['Simple', 'Tikhonov', 'Sparse']:
+                regs = []
+                for matrixFree in [False, True]:
+                    reg = getattr(Regularization, R)(mesh, indActive=indAct, matrixFree=matrixFree)
+                    reg.mref = np.zeros(nC)
+                    if R == 'Sparse':
+                        reg.norms = [0., 1., 1., 1.]
+                        reg.model = model
+                    regs.append(reg)
+                reg, regFree = regs
+                self.assertTrue(isinstance(regFree.Wx, Regularization.CellDifferenceOperator))
+
+                m = np.random.rand(nC)
+                v = np.random.rand(nC)
+                print('Check matrix-free:', R)
+                self.assertTrue(np.allclose(reg.eval(m), regFree.eval(m)))
+                self.assertTrue(np.allclose(reg.evalDeriv(m), regFree.evalDeriv(m)))
+                self.assertTrue(np.allclose(reg.eval2Deriv(m, v=v), regFree.eval2Deriv(m, v=v)))
+                self.assertTrue(np.allclose(
+                    (reg.eval2Deriv(m) - regFree.eval2Deriv(m)).data, 0.
+                ))
+                self.assertTrue(np.allclose((reg.W - regFree.W).data, 0.))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,14 +1,19 @@
 from __future__ import print_function
+import os
+import shutil
+import tempfile
 import unittest
 import numpy as np
 import scipy.sparse as sp
 from SimPEG.Utils import (
     sdiag, sub2ind, ndgrid, mkvc, inv2X2BlockDiagonal,
     inv3X3BlockDiagonal, invPropertyTensor, makePropertyTensor, indexCube,
-    ind2sub, asArray_N_x_Dim, TensorType, diagEst, count, timeIt, Counter
+    ind2sub, asArray_N_x_Dim, TensorType, diagEst, count, timeIt, Counter,
+    parallelMap, openPool
 )
 from SimPEG import Mesh
 from SimPEG.Tests import checkDerivative
+from SimPEG.Utils import io_utils
 
 TOL = 1e-8
 
@@ -303,5 +308,68 @@ class TestDiagEst(unittest.TestCase):
         self.assertTrue(err < TOL)
 
 
+class TestParallelMap(unittest.TestCase):
+
+    def test_order(self):
+        items = np.random.rand(17)
+        for nWorkers in [1, 4, None]:
+            out = parallelMap(np.sqrt, items, nWorkers=nWorkers)
+            self.assertTrue(np.all(np.r_[out] == np.sqrt(items)))
+
+    def test_process(self):
+        out = parallelMap(abs, [-1, 2, -3], nWorkers=2, pool='process')
+        self.assertEqual(out, [1, 2, 3])
+        with self.assertRaises(ValueError):
+            parallelMap(abs, [-1, 2], nWorkers=2, pool='gpu')
+
+    def test_openPool(self):
+        workers = openPool(2)
+        try:
+            for items in [[-1, 2, -3], [4, -5]]:
+                out = parallelMap(abs, items, pool=workers)
+                self.assertEqual(out, [abs(i) for i in items])
+        finally:
+            workers.close()
+            workers.join()
+
+
+
+class TestUBCtable(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fileName = os.path.join(self.tmpdir, 'data.obs')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_roundtrip(self):
+        table = np.random.rand(25, 5)
+        header = ['60. 270. 50000.\n', '25\n']
+        io_utils.writeUBCtable(self.fileName, header, table, chunkSize=7)
+
+        head, out = io_utils.readUBCtable(self.fileName, nHeader=2,
+                                          countInHeader=True, chunkSize=4)
+        self.assertEqual(head, header)
+        self.assertTrue(np.allclose(out, table, rtol=1e-6))
+
+        # binary copy, used while the file is unchanged
+        io_utils.readUBCtable(self.fileName, nHeader=2, cache=True)
+        self.assertTrue(os.path.isfile(self.fileName + '.npz'))
+        head, cached = io_utils.readUBCtable(self.fileName, nHeader=2,
+                                             cache=True)
+        self.assertEqual(head, header)
+        self.assertTrue(np.all(cached == out))
+
+    def test_ragged(self):
+        with open(self.fileName, 'w') as fid:
+            fid.write('3\n1 2 3 4 5\n1 2 3\n4 5 6 7\n')
+        _, out = io_utils.readUBCtable(self.fileName, nHeader=1,
+                                       countInHeader=True)
+        self.assertEqual(out.shape, (3, 5))
+        self.assertTrue(np.all(np.isnan(out[1, 3:])))
+        self.assertEqual(out[2, 3], 7.)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+from __future__ import print_function
+import unittest
+import numpy as np
+from SimPEG import Mesh, Maps
+from SimPEG import EM
+
+
+def setUpProblem(**kwargs):
+    cs = 10.
+    npad = 4
+    hx = [(cs, npad, -1.3), (cs, 2), (cs, npad, 1.3)]
+    mesh = Mesh.TensorMesh([hx, hx, hx], 'CCC')
+
+    rxLocs = np.array([[20., 0., 5.], [-20., 10., 5.]])
+    srcList = [
+        EM.FDEM.Src.MagDipole(
+            [EM.FDEM.Rx.Point_bSecondary(rxLocs, 'z', 'real'),
+             EM.FDEM.Rx.Point_bSecondary(rxLocs, 'z', 'imag')],
+            freq=freq, loc=np.r_[0., 0., 0.]
+        )
+        for freq in [1e-1, 1., 10.]
+    ]
+    survey = EM.FDEM.Survey(srcList)
+    prb = EM.FDEM.Problem3D_b(mesh, sigmaMap=Maps.ExpMap(mesh), **kwargs)
+    prb.pair(survey)
+    return prb
+
+
+class FDEM_ParallelTests(unittest.TestCase):
+
+    def parallelTest(self, workerPool):
+        np.random.seed(3)
+        prb = setUpProblem()
+        m = np.log(1e-2) + 0.1*np.random.randn(prb.mesh.nC)
+        v = np.random.rand(prb.survey.nD)
+        w = np.random.rand(prb.mesh.nC)
+        f = prb.fields(m)
+        b = f[prb.survey.srcList, 'b']
+        Jv = prb.Jvec(m, w, f=f)
+        Jtv = prb.Jtvec(m, v, f=f)
+
+        prb = setUpProblem(nWorkers=3, workerPool=workerPool)
+        f = prb.fields(m)
+        self.assertTrue(np.allclose(f[prb.survey.srcList, 'b'], b))
+        self.assertTrue(np.allclose(prb.Jvec(m, w, f=f), Jv))
+        self.assertTrue(np.allclose(prb.Jtvec(m, v, f=f), Jtv))
+
+    def test_thread(self):
+        self.parallelTest('thread')
+
+    def test_process(self):
+        self.parallelTest('process')
+
+
+if __name__ == '__main__':
+    unittest.main()
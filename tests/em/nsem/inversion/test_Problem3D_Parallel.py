@@ -0,0 +1,43 @@
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+
+import numpy as np
+import unittest
+from SimPEG.EM import NSEM
+
+
+def parallelTest(workerPool):
+    inputSetup = NSEM.Utils.testUtils.halfSpace(1e-2)
+    survey, problem = NSEM.Utils.testUtils.setupSimpegNSEM_ePrimSec(
+        inputSetup, comp='xy'
+    )
+    m = np.log(inputSetup[2])
+    np.random.seed(1983)
+    v = np.random.rand(survey.nD)
+    w = np.random.rand(problem.mesh.nC)
+
+    out = []
+    for nWorkers, pool in [(1, 'thread'), (3, workerPool)]:
+        problem.nWorkers = nWorkers
+        problem.workerPool = pool
+        f = problem.fields(m)
+        out.append([
+            f[survey.srcList, 'e_pxSolution'],
+            f[survey.srcList, 'e_pySolution'],
+            problem.Jvec(m, w, f=f),
+            problem.Jtvec(m, v, f=f)
+        ])
+    return all([np.allclose(a, b) for a, b in zip(*out)])
+
+
+class NSEM_3D_ParallelTests(unittest.TestCase):
+
+    def test_thread(self):
+        self.assertTrue(parallelTest('thread'))
+
+    def test_process(self):
+        self.assertTrue(parallelTest('process'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+from __future__ import print_function
+import unittest
+import numpy as np
+from SimPEG import Mesh, Maps, Utils
+import SimPEG.EM.Static.DC as DC
+
+
+def setUpProblem(Problem, **kwargs):
+    cs = 12.5
+    hx = [(cs, 7, -1.3), (cs, 61), (cs, 7, 1.3)]
+    hy = [(cs, 7, -1.3), (cs, 20)]
+    mesh = Mesh.TensorMesh([hx, hy], x0="CN")
+    x = np.linspace(-135, 250., 20)
+    M = Utils.ndgrid(x-12.5, np.r_[0.])
+    N = Utils.ndgrid(x+12.5, np.r_[0.])
+    rx = DC.Rx.Dipole_ky(M, N)
+    src0 = DC.Src.Pole([rx], np.r_[-150, 0.])
+    src1 = DC.Src.Pole([rx], np.r_[-130, 0.])
+    survey = DC.Survey_ky([src0, src1])
+    problem = Problem(mesh, rhoMap=Maps.IdentityMap(mesh), **kwargs)
+    problem.pair(survey)
+    return problem
+
+
+class DCProblem_2DParallelTests(unittest.TestCase):
+
+    def parallelTest(self, Problem):
+        np.random.seed(41)
+        problem = setUpProblem(Problem)
+        mesh, survey = problem.mesh, problem.survey
+        m = 1. + 0.1*np.random.rand(mesh.nC)
+        v = np.random.rand(mesh.nC)
+        w = np.random.rand(survey.nD)
+        d = survey.dpred(m)
+        Jv = problem.Jvec(m, v)
+        Jtw = problem.Jtvec(m, w)
+
+        # the wavenumbers are solved by two workers
+        problem = setUpProblem(Problem, nWorkers=2)
+        survey = problem.survey
+        f = problem.fields(m)
+        self.assertTrue(np.allclose(survey.dpred(m, f=f), d))
+        self.assertTrue(np.allclose(problem.Jvec(m, v, f=f), Jv))
+        self.assertTrue(np.allclose(problem.Jtvec(m, w, f=f), Jtw))
+
+    def test_Problem2D_CC(self):
+        self.parallelTest(DC.Problem2D_CC)
+
+    def test_Problem2D_N(self):
+        self.parallelTest(DC.Problem2D_N)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -297,5 +297,76 @@ class TDEM_DerivTests(unittest.TestCase):
         def test_Jvec_adjoint_j_dhdtz(self):
             self.JvecVsJtvecTest('j', 'dhdtz')
 
+
+class TDEM_FactorCacheTests(unittest.TestCase):
+
+    def test_factors_per_dt(self):
+        prb, m, mesh = setUp_TDEM('b', 'bz')
+        v = np.random.rand(prb.survey.nD)
+        f = prb.fields(m)
+        Jtv = prb.Jtvec(m, v, f=f)
+
+        prb.maxFactorMemory = None
+        f = prb.fields(m)
+        # one factorization per distinct time step
+        self.assertEqual(len(prb.factorCache), 3)
+        self.assertTrue(prb.factorMemory > 0)
+        nMisses = prb.factorCache.misses
+        self.assertTrue(np.allclose(prb.Jtvec(m, v, f=f), Jtv))
+        self.assertEqual(prb.factorCache.misses, nMisses)
+
+        prb.model = m + 1e-3
+        self.assertEqual(len(prb.factorCache), 0)
+
+
+class TDEM_FieldsStorageTests(unittest.TestCase):
+
+    def storageTest(self, fieldsStorage):
+        prb, m, mesh = setUp_TDEM('b', 'bz')
+        v = np.random.rand(prb.survey.nD)
+        dm = np.random.rand(prb.sigmaMap.nP)
+        f = prb.fields(m)
+        d = prb.survey.dpred(m, f=f)
+        Jv = prb.Jvec(m, dm, f=f)
+        Jtv = prb.Jtvec(m, v, f=f)
+
+        prb.maxFieldsMemory = 15 * mesh.nF * 8
+        prb.fieldsStorage = fieldsStorage
+        f = prb.fields(m)
+        self.assertTrue(np.allclose(prb.survey.dpred(m, f=f), d))
+        self.assertTrue(np.allclose(prb.Jvec(m, dm, f=f), Jv))
+        self.assertTrue(np.allclose(prb.Jtvec(m, v, f=f), Jtv))
+        return f
+
+    def test_checkpoint(self):
+        f = self.storageTest('checkpoint')
+        storage = f._fields['bSolution']
+        self.assertTrue(storage.nbytes <= 15 * f.mesh.nF * 8)
+
+        # The data recompute each interval at most once, and none of the
+        # intervals after the last receiver time
+        recompute = storage._recompute
+        segments = []
+
+        def countRecompute(segment):
+            segments.append(segment)
+            recompute(segment)
+
+        storage._recompute = countRecompute
+        f.survey.eval(f)
+        self.assertEqual(len(segments), len(set(segments)))
+        self.assertTrue(len(segments) < len(storage.segments))
+
+        # Reading the whole history does not keep a copy of it
+        nbytes = storage.nbytes
+        history = storage[:, 0, :]
+        self.assertEqual(history.shape, (f.mesh.nF, storage.shape[2]))
+        self.assertEqual(storage.nbytes, nbytes)
+        self.assertTrue(np.allclose(storage[:, 0, 1:3], history[:, 1:3]))
+
+    def test_memmap(self):
+        f = self.storageTest('memmap')
+        self.assertTrue(isinstance(f._fields['bSolution'], np.memmap))
+
 if __name__ == '__main__':
     unittest.main()
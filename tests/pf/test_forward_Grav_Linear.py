@@ -1,6 +1,10 @@
+import os
+import shutil
+import tempfile
 import unittest
 from SimPEG import Mesh, Utils, PF, Maps
 import numpy as np
+import scipy.sparse as sp
 
 
 class GravFwdProblemTests(unittest.TestCase):
@@ -81,6 +85,207 @@ class GravFwdProblemTests(unittest.TestCase):
 
         self.assertTrue(err_xyz < 0.005 and err_tmi < 0.005)
 
+    def test_geometry(self):
+
+        mesh = self.prob_z.mesh
+        geometry = self.prob_z.geometry
+
+        # Shared by the problems (and drivers) on the same active cells
+        self.assertTrue(self.prob_xyz.geometry is geometry)
+        inds = np.where(self.prob_z.actInd)[0]
+        self.assertTrue(PF.BasePF.activeGeometry(mesh, inds) is geometry)
+
+        self.assertTrue(np.all(geometry.inds == inds))
+        self.assertTrue(np.allclose(geometry.xyz, mesh.gridCC[inds, :]))
+        self.assertTrue(np.allclose(
+            np.prod(geometry.h, axis=1), mesh.vol[inds]
+        ))
+
+    def test_blocks(self):
+
+        # Forward only data
+        self.survey.pair(self.prob_xyz)
+        d = self.prob_xyz.fields(self.model)
+
+        # G computed in blocks of receivers by two workers
+        prob = PF.Gravity.GravityIntegral(self.prob_xyz.mesh,
+                                          rhoMap=self.prob_xyz.rhoMap,
+                                          actInd=self.prob_xyz.actInd,
+                                          chunkSize=7, nWorkers=2)
+        self.survey.pair(prob)
+        G = prob.Intrgl_Fwr_Op('xyz')
+
+        self.assertTrue(np.allclose(G.dot(self.model), d))
+
+        # Blocks of 7 receivers sized by memory, one pool for all of them
+        nC = len(self.model)
+        prob = PF.Gravity.GravityIntegral(self.prob_xyz.mesh,
+                                          rhoMap=self.prob_xyz.rhoMap,
+                                          actInd=self.prob_xyz.actInd,
+                                          maxBlockMemory=7*16*8*nC,
+                                          nWorkers=2)
+        self.survey.pair(prob)
+        blocks = prob._rxBlocks(self.locXyz.shape[0], nC)
+        self.assertTrue(len(blocks[0]) == 7)
+        G = prob.Intrgl_Fwr_Op('xyz')
+
+        self.assertTrue(np.allclose(G.dot(self.model), d))
+
+    def test_forwardOnly_streamed(self):
+
+        self.survey.pair(self.prob_z)
+        d = self.prob_z.fields(self.model)
+
+        # Several models at once, progress reported through a callback
+        calls = []
+        prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                          rhoMap=self.prob_z.rhoMap,
+                                          actInd=self.prob_z.actInd,
+                                          forwardOnly=True, chunkSize=50,
+                                          progressCallback=lambda *a: calls.append(a))
+        self.survey.pair(prob)
+        D = prob.Intrgl_Fwr_Op('z', m=np.c_[self.model, 2.*self.model])
+
+        self.assertTrue(D.shape == (self.survey.nD, 2))
+        self.assertTrue(np.allclose(D[:, 0], d))
+        self.assertTrue(np.allclose(D[:, 1], 2.*d))
+        self.assertTrue(calls[-1] == (self.survey.nD, self.survey.nD))
+
+    def test_Gfile(self):
+
+        # G held in memory
+        prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                          rhoMap=self.prob_z.rhoMap,
+                                          actInd=self.prob_z.actInd)
+        self.survey.pair(prob)
+        Gv = prob.Gvec(self.model)
+        v = np.random.randn(self.survey.nD)
+        Gtv = prob.Gtvec(v)
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            # G memory-mapped on disk, streamed over blocks of 100 rows
+            Gfile = os.path.join(tmpdir, 'G.npy')
+            prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                              rhoMap=self.prob_z.rhoMap,
+                                              actInd=self.prob_z.actInd,
+                                              Gfile=Gfile,
+                                              maxBlockMemory=100*8*len(self.model))
+            self.survey.pair(prob)
+            self.assertTrue(isinstance(prob.G, np.memmap))
+            self.assertTrue(np.allclose(prob.Gvec(self.model), Gv))
+            self.assertTrue(np.allclose(prob.Gtvec(v), Gtv))
+
+            # A new problem reopens the stored G
+            prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                              rhoMap=self.prob_z.rhoMap,
+                                              actInd=self.prob_z.actInd,
+                                              Gfile=Gfile)
+            self.survey.pair(prob)
+            inds = np.where(prob.actInd)[0]
+            key = prob._GKey(inds, self.survey.srcField.rxList[0].locs, 'z')
+            self.assertTrue(prob._loadG(key) is not None)
+            self.assertTrue(np.allclose(prob.Gvec(self.model), Gv))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_cutoff(self):
+
+        # G held in memory
+        prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                          rhoMap=self.prob_z.rhoMap,
+                                          actInd=self.prob_z.actInd)
+        self.survey.pair(prob)
+        G = prob.G
+        Gm = G.dot(self.model)
+
+        # Radius beyond the survey: sparse, but all of the cells
+        prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                          rhoMap=self.prob_z.rhoMap,
+                                          actInd=self.prob_z.actInd,
+                                          cutoffRadius=100.)
+        self.survey.pair(prob)
+        self.assertTrue(sp.isspmatrix_csr(prob.G))
+        self.assertTrue(np.allclose(prob.G.toarray(), G))
+
+        # Near field within 5 m, far field aggregated over 1 m cells
+        prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                          rhoMap=self.prob_z.rhoMap,
+                                          actInd=self.prob_z.actInd,
+                                          cutoffRadius=5., farFieldSize=1.)
+        self.survey.pair(prob)
+        err = np.linalg.norm(prob.Gvec(self.model) - Gm)/np.linalg.norm(Gm)
+        self.assertTrue(err < 1e-2)
+
+        GtG = prob.GtGdiag()
+        self.assertTrue(np.allclose(
+            GtG, np.sum(prob.G.dot(np.eye(G.shape[1]))**2., axis=0)
+        ))
+        Gtv = prob.G.T.dot(Gm)
+
+        # The same blocks, evaluated by a pool of processes
+        prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                          rhoMap=self.prob_z.rhoMap,
+                                          actInd=self.prob_z.actInd,
+                                          cutoffRadius=5., farFieldSize=1.,
+                                          chunkSize=7, nWorkers=2,
+                                          workerPool='process')
+        self.survey.pair(prob)
+        self.assertTrue(np.allclose(prob.G.T.dot(Gm), Gtv))
+
+    def test_convolution(self):
+
+        # G held in memory
+        prob = PF.Gravity.GravityIntegral(self.prob_xyz.mesh,
+                                          rhoMap=self.prob_xyz.rhoMap,
+                                          actInd=self.prob_xyz.actInd)
+        self.survey.pair(prob)
+        G = prob.Intrgl_Fwr_Op('xyz')
+
+        # Uniform cells and receivers on a grid of 10 cells: FFT products
+        prob = PF.Gravity.GravityIntegral(self.prob_xyz.mesh,
+                                          rhoMap=self.prob_xyz.rhoMap,
+                                          actInd=self.prob_xyz.actInd,
+                                          convolution=True)
+        self.survey.pair(prob)
+        Gconv = prob.Intrgl_Fwr_Op('xyz')
+        self.assertTrue(isinstance(Gconv, PF.BasePF.ToeplitzG))
+
+        v = np.random.randn(G.shape[0])
+        self.assertTrue(np.allclose(Gconv.dot(self.model), G.dot(self.model)))
+        self.assertTrue(np.allclose(Gconv.T.dot(v), G.T.dot(v)))
+        self.assertTrue(np.allclose(Gconv.colNorm2(), np.sum(G**2., axis=0)))
+
+    def test_compressed(self):
+
+        # G held in memory
+        prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                          rhoMap=self.prob_z.rhoMap,
+                                          actInd=self.prob_z.actInd)
+        self.survey.pair(prob)
+        G = prob.G
+        v = np.random.randn(self.survey.nD)
+
+        # wavelet-compressed G, rows accurate to 1%
+        prob = PF.Gravity.GravityIntegral(self.prob_z.mesh,
+                                          rhoMap=self.prob_z.rhoMap,
+                                          actInd=self.prob_z.actInd,
+                                          compressTol=1e-2)
+        self.survey.pair(prob)
+        self.assertTrue(isinstance(prob.G, PF.BasePF.CompressedG))
+
+        Gm = G.dot(self.model)
+        err = np.linalg.norm(prob.Gvec(self.model) - Gm)/np.linalg.norm(Gm)
+        self.assertTrue(err < 1e-2)
+
+        Gtv = G.T.dot(v)
+        err = np.linalg.norm(prob.Gtvec(v) - Gtv)/np.linalg.norm(Gtv)
+        self.assertTrue(err < 5e-2)
+
+        GtG = np.sum(G**2., axis=0)
+        err = np.linalg.norm(prob.GtGdiag() - GtG)/np.linalg.norm(GtG)
+        self.assertTrue(err < 5e-2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -87,6 +87,65 @@ class MagFwdProblemTests(unittest.TestCase):
         err_tmi = np.linalg.norm(dtmi-btmi)/np.linalg.norm(btmi)
         self.assertTrue(err_xyz < 0.005 and err_tmi < 0.005)
 
+    def test_blocks(self):
+
+        # Forward only data
+        self.survey.pair(self.prob_tmi)
+        d = self.prob_tmi.fields(self.model)
+
+        # G computed in blocks of receivers by two workers
+        prob = PF.Magnetics.MagneticIntegral(self.prob_tmi.mesh,
+                                             chiMap=self.prob_tmi.chiMap,
+                                             actInd=self.prob_tmi.actInd,
+                                             chunkSize=7, nWorkers=2)
+        self.survey.pair(prob)
+
+        self.assertTrue(np.allclose(prob.fields(self.model), d))
+
+    def test_float32(self):
+
+        # G in double precision
+        prob = PF.Magnetics.MagneticIntegral(self.prob_tmi.mesh,
+                                             chiMap=self.prob_tmi.chiMap,
+                                             actInd=self.prob_tmi.actInd)
+        self.survey.pair(prob)
+        d = prob.fields(self.model)
+        v = np.random.randn(self.survey.nD)
+        Gtv = prob.Jtvec(self.model, v)
+        GtG = prob.GtGdiag()
+
+        # G in single precision
+        prob = PF.Magnetics.MagneticIntegral(self.prob_tmi.mesh,
+                                             chiMap=self.prob_tmi.chiMap,
+                                             actInd=self.prob_tmi.actInd,
+                                             dtype=np.float32)
+        self.survey.pair(prob)
+        self.assertTrue(prob.G.dtype == np.float32)
+
+        d32 = prob.fields(self.model)
+        self.assertTrue(d32.dtype == np.float64)
+        self.assertTrue(np.linalg.norm(d32 - d)/np.linalg.norm(d) < 1e-5)
+
+        Gtv32 = prob.Jtvec(self.model, v)
+        self.assertTrue(np.linalg.norm(Gtv32 - Gtv)/np.linalg.norm(Gtv) < 1e-5)
+
+        GtG32 = prob.GtGdiag()
+        self.assertTrue(np.linalg.norm(GtG32 - GtG)/np.linalg.norm(GtG) < 1e-5)
+
+    def test_distWgt(self):
+
+        self.survey.pair(self.prob_tmi)
+        mesh = self.prob_tmi.mesh
+        wr = PF.Magnetics.get_dist_wgt(mesh, self.locXyz,
+                                       self.prob_tmi.actInd, 3., 0.05)
+
+        # blocked over the receivers by two workers, cached on the problem
+        self.prob_tmi.nWorkers = 2
+        wr_prob = self.prob_tmi.distWgt(3., 0.05)
+        self.assertTrue(np.allclose(wr_prob, wr))
+        self.assertTrue(self.prob_tmi.distWgt(3., 0.05) is wr_prob)
+        self.assertTrue(self.prob_tmi.distWgt(2., 0.05) is not wr_prob)
+
 
 if __name__ == '__main__':
     unittest.main()